@@ -0,0 +1,71 @@
+"""Benchmark blog listing parser backends over synthetic Quarto listings
+
+Usage:
+    python benchmarks/bench_blog_parser.py [--sizes 10 1000 10000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blog_parser import available_backends, parse_posts
+
+
+POST_TEMPLATE = """
+  <div class="quarto-post image-right" data-index="{i}" data-listing-date-sort="{i}">
+    <div class="thumbnail"><a href="./posts/post-{i}/index.html"><img src="./posts/post-{i}/cover.png"></a></div>
+    <div class="metadata">
+      <h3 class="no-anchor listing-title"><a href="./posts/post-{i}/index.html">Post number {i}: regression notes</a></h3>
+      <div class="listing-subtitle">Some subtitle text for post {i}</div>
+      <div class="listing-categories">
+        <div class="listing-category" onclick="window.quartoListingCategory('bayes'); return false;">bayes</div>
+        <div class="listing-category" onclick="window.quartoListingCategory('regression'); return false;">regression</div>
+      </div>
+      <div class="listing-description"><a href="./posts/post-{i}/index.html">{description}</a></div>
+    </div>
+  </div>"""
+
+
+def synthetic_listing(count):
+    """Build a Quarto-style listing page with count posts"""
+    description = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4
+    posts = "".join(POST_TEMPLATE.format(i=i, description=description) for i in range(count))
+    return f"<html><head><title>Listing</title></head><body><div class='quarto-listing'>{posts}</div></body></html>"
+
+
+def time_backend(backend, html, repeat):
+    """Return the best wall time in seconds over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_posts(html, base_url="https://example.com/", backend=backend)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    print(f"{'posts':>8}  " + "  ".join(f"{name:>12}" for name in backends) + "  (ms, speedup vs bs4)")
+    for size in args.sizes:
+        html = synthetic_listing(size).encode()
+        timings = {name: time_backend(name, html, args.repeat) for name in backends}
+        reference = timings.get("bs4")
+        cells = []
+        for name in backends:
+            cell = f"{timings[name] * 1000:.1f}"
+            if reference:
+                cell += f" x{reference / timings[name]:.1f}"
+            cells.append(f"{cell:>12}")
+        print(f"{size:>8}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
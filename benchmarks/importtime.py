@@ -0,0 +1,80 @@
+"""Track cold start: module import cost and time to the first command response
+
+Each measurement runs in a fresh interpreter. The interpreter's own startup
+(python -c pass) is subtracted so only sigterm's work is reported.
+
+Usage:
+    python benchmarks/importtime.py [--runs 5] [--top 15] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Snippets timed from process start to exit
+SCENARIOS = {
+    "import_commands": "import commands",
+    "first_ls": "from commands import process_command; process_command('ls')",
+    "first_cat": "from commands import process_command; process_command('cat about')",
+    "first_cd_blog": "from commands import process_command; process_command('cd blog')",
+}
+
+
+def wall_time(code, runs):
+    """Median wall time in seconds of running code in a fresh interpreter"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def import_profile(code, top):
+    """Return the modules with the largest cumulative import time (microseconds)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        rows.append((name.strip(), int(cumulative_us)))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    baseline = wall_time("pass", args.runs)
+    results = {
+        "python": sys.version.split()[0],
+        "interpreter_ms": round(baseline * 1000, 2),
+        "scenarios_ms": {
+            name: round((wall_time(code, args.runs) - baseline) * 1000, 2)
+            for name, code in SCENARIOS.items()
+        },
+        "slowest_imports_us": dict(import_profile(SCENARIOS["first_cd_blog"], args.top)),
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Latency, throughput and memory benchmarks for the command engine
+
+The blog feed is served from a local stub server with a synthetic listing,
+so results do not depend on the network. Results are printed (or written)
+as JSON; pass --baseline to compare against an earlier run and exit non-zero
+on regressions.
+
+Usage:
+    python benchmarks/run.py [--quick] [--output results.json] [--baseline old.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_blog_parser import synthetic_listing
+
+
+# Commands timed individually
+LATENCY_COMMANDS = [
+    ("help", "~"),
+    ("whoami", "~"),
+    ("pwd", "blog"),
+    ("ls", "~"),
+    ("ls ..", "blog"),
+    ("cat about", "~"),
+    ("echo hello world", "~"),
+    ("grep bayes blog", "~"),
+    ("cd blog", "~"),
+    ("nonexistent", "~"),
+]
+
+# Mix replayed by concurrent sessions in the throughput test
+SESSION_MIX = ["help", "ls", "cat about", "cd blog", "pwd", "cd ..", "whoami", "echo hi"]
+
+# Relative slowdown reported as a regression when comparing with a baseline
+REGRESSION_THRESHOLD = 0.25
+
+
+def start_blog_stub(posts):
+    """Serve a synthetic Quarto listing locally and point the blog page at it"""
+    body = synthetic_listing(posts).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    os.environ["SIGTERM_BLOG_URL"] = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+    os.environ["SIGTERM_CACHE_DIR"] = tempfile.mkdtemp(prefix="sigterm-bench-")
+    return server
+
+
+def summarize(samples):
+    """Return latency percentiles in microseconds"""
+    samples = sorted(samples)
+    def pct(p):
+        return samples[min(len(samples) - 1, int(p * len(samples)))] * 1e6
+    return {
+        "n": len(samples),
+        "p50_us": round(pct(0.50), 2),
+        "p99_us": round(pct(0.99), 2),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 2),
+    }
+
+
+def bench_latency(iterations):
+    """Per-command latency with the result cache warm and cleared"""
+    from commands import process_command, clear_result_cache
+
+    results = {}
+    for cmd, cwd in LATENCY_COMMANDS:
+        process_command(cmd, cwd)
+        warm, cold = [], []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            process_command(cmd, cwd)
+            warm.append(time.perf_counter() - start)
+        for _ in range(iterations):
+            clear_result_cache()
+            start = time.perf_counter()
+            process_command(cmd, cwd)
+            cold.append(time.perf_counter() - start)
+        results[f"{cmd} @{cwd}"] = {"cached": summarize(warm), "uncached": summarize(cold)}
+    return results
+
+
+def bench_throughput(sessions, commands_per_session, workers):
+    """Commands per second for concurrent sessions on a thread pool"""
+    from engine import Session
+
+    def run_session(index):
+        session = Session(f"bench-{index}", rate_limits=None)
+        for i in range(commands_per_session):
+            session.run(SESSION_MIX[(index + i) % len(SESSION_MIX)])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run_session, range(sessions)))
+    elapsed = time.perf_counter() - start
+    total = sessions * commands_per_session
+    return {
+        "sessions": sessions,
+        "workers": workers,
+        "commands": total,
+        "seconds": round(elapsed, 4),
+        "commands_per_s": round(total / elapsed, 1),
+    }
+
+
+def bench_memory(commands):
+    """Traced memory growth over many commands in long-lived sessions"""
+    from engine import Session
+
+    sessions = [Session(f"mem-{i}", rate_limits=None) for i in range(10)]
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    for i in range(commands):
+        sessions[i % len(sessions)].run(SESSION_MIX[i % len(SESSION_MIX)])
+    current, peak = tracemalloc.get_traced_memory()
+    growth = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename"))
+    tracemalloc.stop()
+    return {
+        "commands": commands,
+        "growth_bytes": growth,
+        "peak_bytes": peak,
+        "history_bytes": sum(session.history.nbytes() for session in sessions),
+    }
+
+
+def bench_load_page(iterations):
+    """Cold (module exec) versus warm (registry hit) load_page timings"""
+    from page_loader import load_page, clear_page_cache
+
+    cold, warm = [], []
+    for _ in range(iterations):
+        clear_page_cache()
+        start = time.perf_counter()
+        load_page("blog")
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        load_page("blog")
+        warm.append(time.perf_counter() - start)
+    return {"cold": summarize(cold), "warm": summarize(warm)}
+
+
+def bench_blog_render(iterations):
+    """First (fetch + parse) versus cached blog render through the text shim"""
+    from engine import render_text
+    from commands import process_command
+
+    result = process_command("cd blog")
+    start = time.perf_counter()
+    render_text(result)
+    first = time.perf_counter() - start
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render_text(result)
+        samples.append(time.perf_counter() - start)
+    return {"first_ms": round(first * 1000, 3), "cached": summarize(samples)}
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """List p50 latencies that regressed by more than threshold"""
+    regressions = []
+
+    def walk(current, previous, path):
+        for key, value in current.items():
+            if key not in previous:
+                continue
+            if isinstance(value, dict):
+                walk(value, previous[key], path + [key])
+            elif key == "p50_us" and previous[key] > 0 and value > previous[key] * (1 + threshold):
+                regressions.append({"metric": "/".join(path + [key]), "baseline": previous[key], "current": value})
+
+    walk(results["benchmarks"], baseline.get("benchmarks", {}), [])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="small iteration counts for smoke runs")
+    parser.add_argument("--posts", type=int, default=500, help="posts in the stubbed blog feed")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="earlier results to compare p50 latencies against")
+    args = parser.parse_args()
+
+    scale = 0.1 if args.quick else 1
+    server = start_blog_stub(args.posts)
+    try:
+        benchmarks = {
+            "load_page": bench_load_page(max(int(20 * scale), 2)),
+            "blog_render": bench_blog_render(max(int(50 * scale), 5)),
+            "latency": bench_latency(max(int(1000 * scale), 10)),
+            "throughput": bench_throughput(50, max(int(200 * scale), 10), workers=8),
+            "memory": bench_memory(max(int(5000 * scale), 100)),
+        }
+    finally:
+        server.shutdown()
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "benchmarks": benchmarks,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["regressions"] = compare(results, json.load(f))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 1 if results.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
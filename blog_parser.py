@@ -0,0 +1,266 @@
+"""Extract posts from Quarto listing pages with pluggable HTML parser backends
+
+Backends, fastest first:
+    selectolax: Lexbor-based CSS selection (if selectolax is installed)
+    lxml: libxml2 tree with XPath (if lxml is installed)
+    stream: Standard library tokenizer that only tracks div.quarto-post state
+    bs4: BeautifulSoup with html.parser, kept as the reference implementation
+
+The default is the first installed backend out of selectolax, lxml and
+stream; set SIGTERM_HTML_PARSER to force one.
+"""
+
+import importlib.util
+import os
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+
+# Backends tried in order when none is requested
+PREFERRED_BACKENDS = ("selectolax", "lxml", "stream")
+
+# Size of the chunks fed to the streaming tokenizer
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _absolute_url(url, base_url):
+    """Make ./relative and /rooted links absolute, leave others untouched"""
+    if base_url and (url.startswith("./") or url.startswith("/")):
+        return urljoin(base_url, url)
+    return url
+
+
+def _as_text(html):
+    """Decode bytes input for parsers that need str"""
+    if isinstance(html, bytes):
+        return html.decode("utf-8", errors="replace")
+    return html
+
+
+def _parse_bs4(html, base_url):
+    """Reference parser: full BeautifulSoup tree with html.parser"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    posts = []
+    for container in soup.find_all("div", class_="quarto-post"):
+        # Extract title and link from h3 > a
+        title_elem = container.find("h3", class_="listing-title")
+        if not title_elem:
+            continue
+        link_elem = title_elem.find("a")
+        if not link_elem:
+            continue
+
+        # Extract categories/tags
+        categories_elem = container.find("div", class_="listing-categories")
+        tags = []
+        if categories_elem:
+            tag_elems = categories_elem.find_all("div", class_="listing-category")
+            tags = [tag.get_text(strip=True) for tag in tag_elems]
+
+        posts.append({
+            "title": link_elem.get_text(strip=True),
+            "url": _absolute_url(link_elem.get("href", "#"), base_url),
+            "tags": tags,
+        })
+    return posts
+
+
+def _parse_selectolax(html, base_url):
+    """Parse with selectolax's Lexbor engine"""
+    try:
+        from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    except ImportError:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+
+    tree = SelectolaxParser(_as_text(html))
+    posts = []
+    for container in tree.css("div.quarto-post"):
+        title_elem = container.css_first("h3.listing-title")
+        if title_elem is None:
+            continue
+        link_elem = title_elem.css_first("a")
+        if link_elem is None:
+            continue
+        categories_elem = container.css_first("div.listing-categories")
+        tags = []
+        if categories_elem is not None:
+            tags = [tag.text(strip=True) for tag in categories_elem.css("div.listing-category")]
+        href = link_elem.attributes.get("href")
+        posts.append({
+            "title": link_elem.text(strip=True),
+            "url": _absolute_url("#" if href is None else href, base_url),
+            "tags": tags,
+        })
+    return posts
+
+
+def _has_class(name):
+    """XPath predicate matching elements whose class list contains name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _parse_lxml(html, base_url):
+    """Parse with lxml's libxml2 HTML parser"""
+    import lxml.html
+
+    tree = lxml.html.fromstring(html)
+    posts = []
+    for container in tree.xpath(f"//div[{_has_class('quarto-post')}]"):
+        titles = container.xpath(f".//h3[{_has_class('listing-title')}]")
+        if not titles:
+            continue
+        links = titles[0].xpath(".//a")
+        if not links:
+            continue
+        categories = container.xpath(f".//div[{_has_class('listing-categories')}]")
+        tags = []
+        if categories:
+            tags = [
+                "".join(text.strip() for text in tag.itertext())
+                for tag in categories[0].xpath(f".//div[{_has_class('listing-category')}]")
+            ]
+        posts.append({
+            "title": "".join(text.strip() for text in links[0].itertext()),
+            "url": _absolute_url(links[0].get("href", "#"), base_url),
+            "tags": tags,
+        })
+    return posts
+
+
+class _PostStream(HTMLParser):
+    """Tokenizer callbacks that collect posts without building a DOM
+
+    Only the state needed for the current div.quarto-post is kept: nesting
+    depth, whether we are inside the title link or a category, and the text
+    collected so far. Everything outside a post container is skipped.
+    """
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.posts = []
+        self._post = None
+
+    def _start_post(self):
+        self._post = {"title": None, "url": None, "tags": []}
+        self._depth = 1
+        self._title_seen = False
+        self._in_title = False
+        self._link_seen = False
+        self._in_link = False
+        self._title_parts = []
+        self._categories_seen = False
+        self._categories_depth = 0
+        self._tag_depth = 0
+        self._tag_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "div":
+            classes = (dict(attrs).get("class") or "").split()
+            if self._post is None:
+                if "quarto-post" in classes:
+                    self._start_post()
+                return
+            self._depth += 1
+            if "listing-categories" in classes and not self._categories_seen:
+                self._categories_seen = True
+                self._categories_depth = self._depth
+            elif "listing-category" in classes and self._categories_depth and not self._tag_depth:
+                self._tag_depth = self._depth
+                self._tag_parts = []
+        elif self._post is None:
+            return
+        elif tag == "h3" and not self._title_seen:
+            if "listing-title" in (dict(attrs).get("class") or "").split():
+                self._title_seen = True
+                self._in_title = True
+        elif tag == "a" and self._in_title and not self._link_seen:
+            self._link_seen = True
+            self._in_link = True
+            href = dict(attrs).get("href", "#")
+            self._post["url"] = _absolute_url("" if href is None else href, self.base_url)
+
+    def handle_endtag(self, tag):
+        if self._post is None:
+            return
+        if tag == "div":
+            if self._tag_depth == self._depth:
+                self._post["tags"].append("".join(self._tag_parts))
+                self._tag_depth = 0
+            if self._categories_depth == self._depth:
+                self._categories_depth = 0
+            self._depth -= 1
+            if self._depth == 0:
+                if self._link_seen:
+                    self._post["title"] = "".join(self._title_parts)
+                    self.posts.append(self._post)
+                self._post = None
+        elif tag == "h3":
+            self._in_title = False
+        elif tag == "a":
+            self._in_link = False
+
+    def handle_data(self, data):
+        if self._post is None:
+            return
+        text = data.strip()
+        if not text:
+            return
+        if self._in_link:
+            self._title_parts.append(text)
+        if self._tag_depth:
+            self._tag_parts.append(text)
+
+
+def _parse_stream(html, base_url):
+    """Parse by streaming chunks through the standard library tokenizer"""
+    parser = _PostStream(base_url)
+    html = _as_text(html)
+    for start in range(0, len(html), STREAM_CHUNK_SIZE):
+        parser.feed(html[start:start + STREAM_CHUNK_SIZE])
+    parser.close()
+    return parser.posts
+
+
+BACKENDS = {
+    "selectolax": _parse_selectolax,
+    "lxml": _parse_lxml,
+    "stream": _parse_stream,
+    "bs4": _parse_bs4,
+}
+
+# Module each backend needs, checked without importing it
+_BACKEND_MODULES = {"selectolax": "selectolax", "lxml": "lxml", "bs4": "bs4"}
+
+
+def available_backends():
+    """Return the names of backends whose dependencies are installed"""
+    return [
+        name for name in BACKENDS
+        if name not in _BACKEND_MODULES or importlib.util.find_spec(_BACKEND_MODULES[name])
+    ]
+
+
+def default_backend():
+    """Return the backend used when none is requested"""
+    requested = os.environ.get("SIGTERM_HTML_PARSER")
+    available = available_backends()
+    if requested in available:
+        return requested
+    return next(name for name in PREFERRED_BACKENDS if name in available)
+
+
+def parse_posts(html, base_url=None, backend=None):
+    """Extract posts from a Quarto listing page
+
+    Args:
+        html: Page content (bytes or str)
+        base_url: URL of the listing, used to make relative links absolute
+        backend: Backend name, defaults to default_backend()
+
+    Returns:
+        list: List of blog post dictionaries with title, url, tags
+    """
+    return BACKENDS[backend or default_backend()](html, base_url)
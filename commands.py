@@ -1,22 +1,43 @@
 """Command processing module for the terminal emulator"""
 
+import difflib
+import functools
+import itertools
 import os
-from page_loader import load_page
+import re
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from functools import lru_cache
+import feed_service
+import metrics
+from content_store import PAGE_LINES
+from singleflight import SingleFlight
+from snapshot import load_site
+from sources import FeedSource, open_source
 
 
-# Filesystem structure configuration
-# .py files are directories (accessible via cd)
-py_files = {
-    "blog": "blog.py",
-}
+# Filesystem tree built once from the pages directory (or the site snapshot
+# or frozen manifest, which also seed file contents and feeds)
+pages_dir = os.path.join(os.path.dirname(__file__), "pages")
+manifest_path = os.path.join(os.path.dirname(__file__), "pages_manifest.json")
+filesystem = load_site(pages_dir, manifest_path)
 
-# .txt and .md files are text files (readable via cat)
-txt_files = {
-    "about": "about.txt",
-}
+# Extra sources mounted into the tree: "mount point=directory, archive or feed:NAME,..."
+for _mount in filter(None, os.environ.get("SIGTERM_MOUNTS", "").split(",")):
+    _point, _, _location = _mount.partition("=")
+    filesystem.mount(_point.strip(), open_source(_location.strip()))
 
-# Root directory listing
-home_contents = "about.txt\nblog/"
+
+def remount_feed(feed):
+    """Rescan the mounts generated from a feed after it stored a new copy"""
+    for point, source in list(filesystem.mounts.items()):
+        if isinstance(source, FeedSource) and source.name == feed.name:
+            filesystem.mount(point, source)
+
+
+feed_service.listeners.append(remount_feed)
 
 
 # Simple command functions
@@ -24,14 +45,11 @@ home_contents = "about.txt\nblog/"
 
 def cmd_help():
     """Show available commands"""
-    help_text = """help              Show available commands
-ls                List directory contents
-echo              Display text
-whoami            Show current user
-pwd               Print working directory
-clear             Clear screen
-cd                Change directory
-cat               Display file contents"""
+    help_text = "\n".join(
+        f"{command.name:<18}{command.summary}"
+        for command in registry.values()
+        if not command.hidden
+    )
     return ("text", help_text, None)
 
 
@@ -45,6 +63,11 @@ def cmd_clear():
     return ("text", "", None)
 
 
+def cmd_stats():
+    """Show the slowest operations and cache hit ratios"""
+    return ("text", metrics.summary(), None)
+
+
 def cmd_pwd(current_dir):
     """Print working directory"""
     if current_dir == "~":
@@ -58,70 +81,198 @@ def cmd_pwd(current_dir):
 
 
 def cmd_ls(target, current_dir):
-    """List directory contents with optional target argument"""
+    """List directory contents with optional target argument
+
+    Searchable pages accept --tag TAG to list their entries carrying that tag.
+    Large directories are listed a page at a time; --offset N and --limit N
+    select the entries.
+    """
+    try:
+        target, options = parse_options(target, {"tag": str, "offset": int, "limit": positive})
+    except ValueError as e:
+        return ("text", f"ls: {e}", None)
+
     if target is None:
         # ls without arguments - list current directory
-        if current_dir == "~":
-            return ("text", home_contents, None)
-        else:
-            # Inside a directory, show parent (..)
-            return ("text", "..", None)
-
-    # Check if ls has a target argument
-    if target == "..":
-        # List parent directory
-        if current_dir == "~":
-            return ("text", "ls: ..: No such file or directory", None)
-        else:
-            return ("text", home_contents, None)
-    elif target == "~" or target == "." or target == "/home":
-        # List root/home directory
-        return ("text", home_contents, None)
+        node = filesystem.lookup(current_dir)
+        target = "."
     else:
+        node = filesystem.resolve(target.strip(), current_dir)
+    if node is None:
         return ("text", f"ls: {target}: No such file or directory", None)
 
+    if "tag" in options:
+        try:
+            lines = search_page(node, tag=options["tag"])
+        except LookupError:
+            return ("text", f"ls: {target}: --tag is not supported here", None)
+        if lines is None:
+            return ("text", f"ls: {target}: Content unavailable, please try again later", None)
+        return ("text", "\n".join(lines), None)
+    return ("text", listing_page(node, f"ls {target}", options.get("offset"), options.get("limit")), None)
+
+
+def listing_page(node, more, offset=None, limit=None):
+    """Return a node's ls output, one page at a time for large directories
+
+    Args:
+        node: Node to list
+        more: Command shown (with --offset N) to fetch the next page
+        offset: First entry to list, None for the start of an unpaged listing
+        limit: Entries per page (PAGE_LINES when None)
+    """
+    if offset is None and limit is None and len(node.names) <= PAGE_LINES:
+        return node.listing
+    content, next_offset = node.list_page(offset or 0, PAGE_LINES if limit is None else limit)
+    if next_offset is not None:
+        content += f"\n-- more: {more} --offset {next_offset} --"
+    return content
+
+
+def stream_ls(args, current_dir, lines):
+    """ls as a pipeline stage: every entry, unpaged, so "ls big | grep x" sees them all"""
+    target, options = parse_options(args, {"tag": str, "offset": int, "limit": positive})
+    node = filesystem.lookup(current_dir) if target is None else filesystem.resolve(target.strip(), current_dir)
+    if options or node is None:
+        # Tag searches, explicit pages and errors behave as they do without a pipe
+        content = cmd_ls(args, current_dir)[1]
+        if content.startswith("ls: "):
+            raise ValueError(content[len("ls: "):])
+        return iter(content.splitlines())
+    return node.iter_labels()
+
+
+class positive(int):
+    """parse_options type for counts that must be at least 1, such as --limit"""
+
+
+def parse_options(args, options):
+    """Split --name VALUE options out of an argument string
+
+    Args:
+        args: Raw argument string (or None)
+        options: {name: type} of accepted options, without the leading --;
+            int options only accept digits, positive options digits from 1 up
+
+    Returns:
+        tuple: (remaining argument string or None, {name: value})
+
+    Raises:
+        ValueError: If an option is missing its value or an int value is not a number
+    """
+    if args is None or "--" not in args:
+        return args, {}
+    rest, values = [], {}
+    tokens = iter(args.split())
+    for token in tokens:
+        kind = options.get(token[2:]) if token.startswith("--") else None
+        if kind is None:
+            rest.append(token)
+            continue
+        value = next(tokens, None)
+        if kind is int:
+            if value is None or not value.isdigit():
+                raise ValueError(f"option {token} requires a number")
+            values[token[2:]] = int(value)
+        elif kind is positive:
+            if value is None or not value.isdigit() or int(value) < 1:
+                raise ValueError(f"option {token} requires a positive number")
+            values[token[2:]] = int(value)
+        else:
+            if value is None:
+                raise ValueError(f"option {token} requires a value")
+            values[token[2:]] = value
+    return (" ".join(rest) or None), values
+
+
+def search_page(node, **query):
+    """Run a page module's search hook
+
+    Returns:
+        list: Result lines, or None if the page cannot be searched right now
+
+    Raises:
+        LookupError: If the page does not support searching
+    """
+    if node.kind != "page":
+        raise LookupError(node.name)
+    try:
+        module = node.source.load_module(node.path, node.key)
+    except Exception:
+        return None
+    hook = getattr(module, "search", None)
+    if hook is None:
+        raise LookupError(node.name)
+    return hook(**query)
+
+
+def cmd_cat(target, current_dir="~"):
+    """Display file contents (.txt or .md files)
+
+    Large files are shown a page at a time; --offset N and --limit N select the lines.
+    """
+    try:
+        target, options = parse_options(target, {"offset": int, "limit": positive})
+    except ValueError as e:
+        return ("text", f"cat: {e}", None)
 
-def cmd_cat(target):
-    """Display file contents (.txt or .md files)"""
     if target is None:
         # cat without arguments
         return ("text", "cat: missing file argument\nUsage: cat <file>", None)
 
-    # Check if trying to cat a .py file (directory)
-    if target in py_files or target.endswith(".py"):
-        target_base = target.replace(".py", "") if target.endswith(".py") else target
-        if target_base in py_files:
-            return ("text", f"cat: {target}: Is a directory\nUse 'cd {target_base}' to explore it", None)
-
-    # Check if target is a .txt or .md file (remove extension if provided)
-    if target.endswith(".txt"):
-        target_base = target[:-4]
-    elif target.endswith(".md"):
-        target_base = target[:-3]
-    else:
-        target_base = target
-        # Try to determine file type from txt_files mapping
-        if target_base not in txt_files:
-            target = f"{target}.txt"
-
-    if target_base in txt_files:
-        pages_dir = os.path.join(os.path.dirname(__file__), "pages")
-        file_path = os.path.join(pages_dir, txt_files[target_base])
-        try:
-            with open(file_path, "r") as f:
-                content = f.read()
-            # Check if file is markdown
-            if txt_files[target_base].endswith(".md"):
-                return ("markdown", content, None)
-            else:
-                return ("text", content, None)
-        except FileNotFoundError:
-            return ("text", f"cat: {target}: No such file or directory", None)
-        except Exception as e:
-            return ("text", f"cat: Error reading {target}: {str(e)}", None)
-    else:
+    target = target.strip()
+    node = filesystem.resolve(target, current_dir)
+    if node is None:
         return ("text", f"cat: {target}: No such file or directory", None)
 
+    # Pages and directories are explored with cd
+    if node.is_dir:
+        cd_target = target[:-3] if node.kind == "page" and target.endswith(".py") else target
+        return ("text", f"cat: {target}: Is a directory\nUse 'cd {cd_target}' to explore it", None)
+
+    try:
+        if options or node.source.is_large(node.path):
+            offset = options.get("offset", 0)
+            content, next_offset = node.source.read_lines(node.path, offset, options.get("limit", PAGE_LINES))
+            if next_offset is not None:
+                content += f"\n-- more: cat {target} --offset {next_offset} --"
+            return ("text", content, None)
+        return (*node.source.read(node.path), None)
+    except FileNotFoundError:
+        return ("text", f"cat: {target}: No such file or directory", None)
+    except Exception as e:
+        return ("text", f"cat: Error reading {target}: {str(e)}", None)
+
+
+def cmd_grep(args, current_dir):
+    """Search a text file's lines or a searchable page's entries"""
+    if args is None or not args.strip():
+        return ("text", "grep: missing pattern\nUsage: grep <pattern> [path]", None)
+
+    parts = args.split(maxsplit=1)
+    pattern = parts[0]
+    target = parts[1].strip() if len(parts) > 1 else "."
+    node = filesystem.resolve(target, current_dir)
+    if node is None:
+        return ("text", f"grep: {target}: No such file or directory", None)
+
+    if node.kind == "file":
+        try:
+            return ("text", "\n".join(line for line in node.source.iter_lines(node.path) if pattern in line), None)
+        except OSError as e:
+            return ("text", f"grep: Error reading {target}: {str(e)}", None)
+
+    # Plain directories and pages without a search hook have nothing to grep
+    if node.kind != "page":
+        return ("text", f"grep: {target}: Is a directory", None)
+    try:
+        lines = search_page(node, pattern=pattern)
+    except LookupError:
+        return ("text", f"grep: {target}: Is a directory", None)
+    if lines is None:
+        return ("text", f"grep: {target}: Content unavailable, please try again later", None)
+    return ("text", "\n".join(lines), None)
+
 
 def cmd_echo(text):
     """Echo text back to user"""
@@ -131,15 +282,25 @@ def cmd_echo(text):
 
 
 def cmd_cd(target, current_dir):
-    """Change directory with navigation logic"""
-    if target is None:
+    """Change directory with navigation logic
+
+    Pages accept --page N and --limit N, which are passed on to their render function.
+    """
+    try:
+        target, options = parse_options(target, {"page": positive, "limit": positive})
+    except ValueError as e:
+        return ("text", f"cd: {e}", None)
+
+    if target is None or not target.strip():
         # cd without arguments
         return ("text", "cd: missing directory argument\nUsage: cd <directory>", None)
 
+    target = target.strip()
     if target == "..":
-        # Navigate back to root/parent
+        # Navigate back to parent
         if current_dir != "~":
-            return ("text", home_contents, "~")
+            parent = filesystem.resolve("..", current_dir) or filesystem.root
+            return ("text", listing_page(parent, "ls"), parent.cwd)
         else:
             return ("text", "Already at root directory", None)
     elif target == "~":
@@ -148,23 +309,482 @@ def cmd_cd(target, current_dir):
             return ("text", "Navigated to home", "~")
         else:
             return ("text", "Already at home", None)
-    elif target:
-        # Check if trying to cd into a .txt file
-        if target in txt_files or target.endswith(".txt"):
-            target_base = target.replace(".txt", "") if target.endswith(".txt") else target
-            if target_base in txt_files:
-                return ("text", f"cd: {target}: Is a text file\nUse 'cat {target_base}' to view its contents", None)
-
-        # Check if it's a .py file (directory)
-        if target in py_files:
-            # Load the .py file content
-            content_file = py_files[target].replace(".py", "")
-            page_result = load_page(content_file)
-            if page_result:
-                return (page_result[0], page_result[1], target)
+
+    node = filesystem.resolve(target, current_dir)
+    if node is None:
         return ("text", f"cd: {target}: No such file or directory", None)
-    else:
-        return ("text", "cd: missing directory argument", None)
+
+    # Text files are read with cat
+    if node.kind == "file":
+        ext = os.path.splitext(node.name)[1]
+        cat_target = target[:-len(ext)] if target.endswith(ext) else target
+        return ("text", f"cd: {target}: Is a text file\nUse 'cat {cat_target}' to view its contents", None)
+
+    if node.kind == "page":
+        # Load the .py page module from its source
+        try:
+            with metrics.timed("load_page", "total"):
+                module = node.source.load_module(node.path, node.key)
+        except Exception as e:
+            return ("text", f"Error loading page: {str(e)}", node.cwd)
+        if module is not None and hasattr(module, "render"):
+            content = functools.partial(module.render, **options) if options else module.render
+            return ("streamlit", content, node.cwd)
+        return ("text", f"cd: {target}: No such file or directory", None)
+
+    return ("text", listing_page(node, "ls"), node.cwd)
+
+
+# Streaming commands
+#
+# A stream function takes (args, current_dir, lines), where lines is the
+# previous pipeline stage's output as an iterator (None for the first stage),
+# and returns an iterator of output lines. Stages are chained lazily, so
+# "cat bigfile | head -5" stops reading after five lines. Stream functions
+# raise ValueError with a message for bad arguments.
+
+
+def file_lines(target, current_dir):
+    """Return a lazy iterator over a text file's lines
+
+    Raises:
+        ValueError: If target is not a text file
+    """
+    target = target.strip()
+    node = filesystem.resolve(target, current_dir)
+    if node is None:
+        raise ValueError(f"{target}: No such file or directory")
+    if node.is_dir:
+        raise ValueError(f"{target}: Is a directory")
+    return node.source.iter_lines(node.path)
+
+
+def input_lines(args, current_dir, lines):
+    """Lines from a file argument if one is given, else from the previous stage"""
+    if args is not None:
+        return file_lines(args, current_dir)
+    if lines is None:
+        raise ValueError("missing file argument")
+    return lines
+
+
+def parse_count(args, default=10):
+    """Split a leading line count (-n N or -N) from an argument string
+
+    Returns:
+        tuple: (count, remaining argument string or None)
+
+    Raises:
+        ValueError: If the count is not a number
+    """
+    tokens = args.split() if args else []
+    count = default
+    if tokens and tokens[0] == "-n":
+        if len(tokens) < 2 or not tokens[1].isdigit():
+            raise ValueError("option -n requires a number")
+        count, tokens = int(tokens[1]), tokens[2:]
+    elif tokens and tokens[0][:1] == "-" and tokens[0][1:].isdigit():
+        count, tokens = int(tokens[0][1:]), tokens[1:]
+    return count, (" ".join(tokens) or None)
+
+
+def stream_cat(args, current_dir, lines):
+    """Pass the previous stage through, or read a file lazily"""
+    if args is None and lines is not None:
+        return lines
+    if args is not None and "--" in args:
+        # Paged reads keep their footer, so run the regular command
+        return iter(cmd_cat(args, current_dir)[1].splitlines())
+    return input_lines(args, current_dir, lines)
+
+
+def stream_grep(args, current_dir, lines):
+    """Filter the previous stage's lines; with a path (or no input) run the grep command"""
+    if lines is None or (args is not None and len(args.split(maxsplit=1)) > 1):
+        return iter(cmd_grep(args, current_dir)[1].splitlines())
+    if args is None or not args.strip():
+        raise ValueError("missing pattern")
+    pattern = args.strip()
+    return (line for line in lines if pattern in line)
+
+
+def stream_head(args, current_dir, lines):
+    """First N lines (default 10)"""
+    count, target = parse_count(args)
+    return itertools.islice(input_lines(target, current_dir, lines), count)
+
+
+def stream_tail(args, current_dir, lines):
+    """Last N lines (default 10)"""
+    count, target = parse_count(args)
+    source = input_lines(target, current_dir, lines)
+    return iter(deque(source, maxlen=count)) if count else iter(())
+
+
+def stream_wc(args, current_dir, lines):
+    """Count lines, words and characters (-l, -w, -c select columns)"""
+    tokens = args.split() if args else []
+    flags = ""
+    while tokens and tokens[0] in ("-l", "-w", "-c"):
+        flags += tokens.pop(0)[1]
+    source = input_lines(" ".join(tokens) or None, current_dir, lines)
+    counts = {"l": 0, "w": 0, "c": 0}
+    for line in source:
+        counts["l"] += 1
+        counts["w"] += len(line.split())
+        counts["c"] += len(line) + 1
+    return iter([" ".join(str(counts[flag]) for flag in flags or "lwc")])
+
+
+def run_pipeline(stages, current_dir):
+    """Run (Command, args) stages, feeding each one's lines into the next
+
+    Commands without a stream function run normally; their text output
+    becomes the next stage's input and their own input is ignored.
+
+    Returns:
+        tuple: ("text", joined output of the last stage, None)
+    """
+    lines = None
+    command = stages[0][0]
+    try:
+        for command, args in stages:
+            if command.stream is not None:
+                lines = command.stream(args, current_dir, lines)
+                continue
+            values = {"args": args, "current_dir": current_dir}
+            result_type, content, _ = command.handler(*(values[param] for param in command.params))
+            if result_type == "streamlit":
+                raise ValueError("output cannot be piped")
+            lines = iter(content.splitlines())
+        return ("text", "\n".join(lines), None)
+    except ValueError as e:
+        return ("text", f"{command.name}: {e}", None)
+    except OSError as e:
+        return ("text", f"{command.name}: Error reading input: {e.strerror or e}", None)
+
+
+# Command registry
+
+
+class Command:
+    """A registered terminal command
+
+    Attributes:
+        name: Name typed by the user
+        handler: Function returning (result_type, content, new_directory)
+        params: Arguments passed to handler, in order ("args" and/or "current_dir")
+        summary: One-line description shown by help
+        pure: Result depends only on the command line, directory and filesystem
+            tree (not on file contents)
+        hidden: Leave the command out of help
+        stream: Function (args, current_dir, lines) -> iterator of lines used
+            when the command is a pipeline stage, None to run handler instead
+        rate_class: Rate limit bucket charged per use (see ratelimit), or a
+            function (args, current_dir, piped) -> bucket for commands whose
+            cost depends on their target
+    """
+
+    def __init__(self, name, handler, params=(), summary="", pure=False, hidden=False, stream=None,
+                 rate_class="default"):
+        self.name = name
+        self.handler = handler
+        self.params = tuple(params)
+        self.summary = summary
+        self.pure = pure
+        self.hidden = hidden
+        self.stream = stream
+        self.rate_class = rate_class
+
+    def rate_class_for(self, args, current_dir="~", piped=False):
+        """Return the bucket charged for running the command with args in current_dir
+
+        piped is True when the command reads the previous pipeline stage.
+        """
+        if callable(self.rate_class):
+            return self.rate_class(args, current_dir, piped)
+        return self.rate_class
+
+
+registry = {}
+
+
+# Concurrent identical pure commands share one computation
+_flight = SingleFlight("commands")
+
+# Result cache for pure commands:
+# {(cmd, current_dir, filesystem version, feed generation): result}
+RESULT_CACHE_SIZE = 1024
+
+# Total characters of cached output; larger results are not cached
+RESULT_CACHE_BYTES = 4 * 1024 * 1024
+
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+_result_cache_bytes = 0
+cache_stats = {"hits": 0, "misses": 0}
+metrics.register_cache("results", cache_stats)
+
+# Times each registered command was run, whether or not its result was cached
+usage = Counter()
+
+
+def result_size(result):
+    """Approximate size of a result's content, counted against RESULT_CACHE_BYTES"""
+    content = result[1]
+    return len(content) if isinstance(content, str) else sys.getsizeof(content)
+
+
+def clear_result_cache():
+    """Drop all cached command results"""
+    global _result_cache_bytes
+    with _result_cache_lock:
+        _result_cache.clear()
+        _result_cache_bytes = 0
+
+
+def register_command(name, handler, params=(), summary="", pure=False, hidden=False, stream=None,
+                     rate_class="default"):
+    """Register (or replace) a command handler
+
+    Args:
+        name: Command name
+        handler: Function returning (result_type, content, new_directory), or
+            None to run the stream function as a one-stage pipeline
+        params: Arguments passed to handler, any of "args" and "current_dir"
+        summary: One-line description shown by help
+        pure: Allow results to be cached per (cmd, current_dir) until pages or
+            feeds change; commands reading file contents must not be pure, as
+            edits to a file do not change the filesystem version
+        hidden: Leave the command out of help
+        stream: Function used when the command is a pipeline stage
+        rate_class: Rate limit bucket charged per use ("default", "search", "page", ...),
+            or a function (args, current_dir, piped) returning one
+
+    Returns:
+        Command: The registered command
+    """
+    if handler is None:
+        def handler(args, current_dir):
+            return run_pipeline([(command, args)], current_dir)
+
+        params = ("args", "current_dir")
+    command = Command(name, handler, params, summary, pure, hidden, stream, rate_class)
+    registry[name] = command
+    clear_result_cache()
+    return command
+
+
+# Rate classes of commands whose cost depends on their target: only loading
+# a page or running a page's search hook is expensive
+
+
+def ls_rate_class(args, current_dir, piped):
+    """ls is cheap unless it searches a page with --tag"""
+    return "search" if args is not None and "--tag" in args.split() else "default"
+
+
+def cd_rate_class(args, current_dir, piped):
+    """cd only loads something when it enters a page"""
+    try:
+        target, _ = parse_options(args, {"page": positive, "limit": positive})
+    except ValueError:
+        return "default"
+    if target is None or target.strip() in ("..", "~"):
+        return "default"
+    node = filesystem.resolve(target.strip(), current_dir)
+    return "page" if node is not None and node.kind == "page" else "default"
+
+
+def grep_rate_class(args, current_dir, piped):
+    """grep runs a page's search hook when its target is a page, otherwise reads a file or its input"""
+    parts = args.split(maxsplit=1) if args else []
+    if len(parts) < 2 and piped:
+        return "default"
+    node = filesystem.resolve(parts[1].strip() if len(parts) > 1 else ".", current_dir)
+    return "search" if node is not None and node.kind == "page" else "default"
+
+
+register_command("help", cmd_help, summary="Show available commands", pure=True)
+register_command("ls", cmd_ls, ("args", "current_dir"), "List directory contents", pure=True, stream=stream_ls,
+                 rate_class=ls_rate_class)
+register_command("echo", cmd_echo, ("args",), "Display text")
+register_command("whoami", cmd_whoami, summary="Show current user", pure=True)
+register_command("pwd", cmd_pwd, ("current_dir",), "Print working directory", pure=True)
+register_command("clear", cmd_clear, summary="Clear screen")
+register_command("cd", cmd_cd, ("args", "current_dir"), "Change directory", rate_class=cd_rate_class)
+# Commands reading file contents go through the content store on every call,
+# which revalidates against the file's mtime and size
+register_command("cat", cmd_cat, ("args", "current_dir"), "Display file contents", stream=stream_cat)
+register_command("grep", cmd_grep, ("args", "current_dir"), "Search files and pages", stream=stream_grep,
+                 rate_class=grep_rate_class)
+register_command("head", None, summary="Show the first lines (-n N)", stream=stream_head)
+register_command("tail", None, summary="Show the last lines (-n N)", stream=stream_tail)
+register_command("wc", None, summary="Count lines, words and characters", stream=stream_wc)
+register_command("stats", cmd_stats, hidden=True)
+
+
+@lru_cache(maxsize=1024)
+def parse_command(cmd):
+    """Split a command line into (command, args), args is None when absent"""
+    parts = cmd.split(maxsplit=1)
+    command = parts[0] if parts else ""
+    args = parts[1] if len(parts) > 1 else None
+    return command, args
+
+
+def suggest(name, current_dir="~"):
+    """Return "did you mean" suggestions for an unknown command name
+
+    A name matching a file or page suggests cat or cd; otherwise the closest
+    command names are suggested.
+    """
+    node = filesystem.resolve(name, current_dir)
+    if node is not None and node.key:
+        return [f"{'cd' if node.is_dir else 'cat'} {name}"]
+    names = [command.name for command in registry.values() if not command.hidden]
+    return difflib.get_close_matches(name.lower(), names, n=3, cutoff=0.6)
+
+
+def not_found(name, cmd, current_dir="~"):
+    """Result for an unknown command, with suggestions when there are any"""
+    message = f"command not found: {cmd}"
+    suggestions = suggest(name, current_dir) if name else []
+    if suggestions:
+        message += f"\nDid you mean: {', '.join(suggestions)}?"
+    return ("text", message, None)
+
+
+def rate_classes(cmd, current_dir="~"):
+    """Return the rate class of every pipeline stage of a command line run in current_dir"""
+    classes = []
+    for index, part in enumerate(cmd.split("|")):
+        name, args = parse_command(part.strip())
+        entry = registry.get(name)
+        classes.append(entry.rate_class_for(args, current_dir, index > 0) if entry is not None else "default")
+    return classes
+
+
+def check_rate(limiter, cmd, current_dir="~"):
+    """Charge a command line to a session's rate limiter
+
+    Every pipeline stage takes a token from its command's rate class.
+
+    Returns:
+        tuple: A "rate limited" result if a bucket is empty, otherwise None
+    """
+    return _charge(limiter, rate_classes(cmd, current_dir))
+
+
+def check_batch_rate(limiter, steps, current_dir="~"):
+    """Charge a whole batch of split_batch() steps to a session's rate limiter at once
+
+    A batch takes one token from each rate class its commands use, however
+    many commands it has, so scripts are limited per request like a single
+    command rather than failing partway through. Classes are determined in
+    the directory the batch starts in. A single command line is charged like
+    check_rate.
+
+    Returns:
+        tuple: A "rate limited" result if a bucket is empty, otherwise None
+    """
+    if len(steps) == 1:
+        return check_rate(limiter, steps[0][0], current_dir)
+    classes = {rate_class for cmd, _ in steps for rate_class in rate_classes(cmd, current_dir)}
+    return _charge(limiter, sorted(classes))
+
+
+def _charge(limiter, classes):
+    wait = limiter.acquire(classes)
+    if wait:
+        return ("text", f"rate limited: too many commands, try again in {wait:.1f}s", None)
+    return None
+
+
+def parse_pipeline(cmd):
+    """Split a command line on | into (Command, args) stages
+
+    Raises:
+        ValueError: If a stage is empty
+        LookupError: If a stage names an unknown command
+    """
+    stages = []
+    for part in cmd.split("|"):
+        name, args = parse_command(part.strip())
+        if not name:
+            raise ValueError("syntax error near unexpected token `|'")
+        if name not in registry:
+            raise LookupError(name)
+        stages.append((registry[name], args))
+    return stages
+
+
+def split_batch(script):
+    """Split a command list or script into (cmd, condition) steps
+
+    Commands are separated by ;, && or newlines. condition is "&&" when the
+    command only runs if the one before it succeeded, otherwise None. Blank
+    lines and lines starting with # (including a #! line) are skipped.
+
+    Raises:
+        ValueError: If && is missing a command on either side
+    """
+    steps = []
+    for line in script.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = re.split(r"(&&|;)", line)
+        for index in range(0, len(parts), 2):
+            cmd = parts[index].strip()
+            before = parts[index - 1] if index else None
+            if not cmd:
+                if "&&" in (before, parts[index + 1] if index + 1 < len(parts) else None):
+                    raise ValueError("syntax error near unexpected token `&&'")
+                continue
+            steps.append((cmd, "&&" if before == "&&" else None))
+    return steps
+
+
+# Results that report an error without naming the command
+ERROR_PREFIXES = ("command not found:", "rate limited:", "Error loading page:", "syntax error")
+
+
+def failed(cmd, result):
+    """Return True if a command line's result reports an error
+
+    Stands in for an exit status when deciding whether && continues. Errors
+    are text results prefixed with the name of one of the line's commands
+    ("cat: x: No such file or directory"), or one of ERROR_PREFIXES.
+    """
+    content_type, content, _ = result
+    if content_type != "text" or not isinstance(content, str):
+        return False
+    if content.startswith(ERROR_PREFIXES):
+        return True
+    names = (parse_command(part.strip())[0] for part in cmd.split("|"))
+    return any(name and content.startswith(f"{name}: ") for name in names)
+
+
+def run_batch(steps, run, errexit=False):
+    """Run split_batch() steps with run(cmd), yielding (cmd, result) as each finishes
+
+    A && step is skipped when the command before it failed or was skipped.
+
+    Args:
+        steps: (cmd, condition) pairs
+        run: Function running one command line and returning its result
+        errexit: Stop at the first failed command, like sh -e
+    """
+    ok = True
+    for cmd, condition in steps:
+        if condition == "&&" and not ok:
+            continue
+        result = run(cmd)
+        ok = not failed(cmd, result)
+        yield cmd, result
+        if errexit and not ok:
+            return
 
 
 # Command dispatcher
@@ -177,30 +797,74 @@ def process_command(cmd, current_dir="~"):
         cmd: Command string to process
         current_dir: Current directory context (~ for root, or directory name)
 
+    Commands that run are timed into the ("command", name) histograms and
+    results served from the result cache into ("command_cached", name), so
+    together they count every command a user ran.
+
     Returns:
         tuple: (result_type, content, new_directory) where new_directory is None if unchanged
     """
-    # Parse command and arguments
-    parts = cmd.split(maxsplit=1)
-    command = parts[0] if parts else ""
-    args = parts[1] if len(parts) > 1 else None
-
-    # Route to appropriate command function
-    if command == "help":
-        return cmd_help()
-    elif command == "whoami":
-        return cmd_whoami()
-    elif command == "clear":
-        return cmd_clear()
-    elif command == "pwd":
-        return cmd_pwd(current_dir)
-    elif command == "ls":
-        return cmd_ls(args, current_dir)
-    elif command == "cat":
-        return cmd_cat(args)
-    elif command == "echo":
-        return cmd_echo(args)
-    elif command == "cd":
-        return cmd_cd(args, current_dir)
-    else:
-        return ("text", f"command not found: {cmd}", None)
+    started = time.perf_counter()
+    key = (cmd, current_dir, filesystem.version, feed_service.generation)
+    with _result_cache_lock:
+        usage.update(command_names(cmd))
+        result = _result_cache.get(key)
+        if result is not None:
+            _result_cache.move_to_end(key)
+            cache_stats["hits"] += 1
+    if result is not None:
+        name = "pipeline" if "|" in cmd else parse_command(cmd)[0]
+        metrics.observe("command_cached", name, time.perf_counter() - started)
+        return result
+
+    # Identical commands running concurrently (e.g. many sessions entering
+    # cd blog at once) share one computation
+    result, pure = _flight.do(key, _execute, cmd, current_dir)
+    if pure:
+        _cache_result(key, result)
+    return result
+
+
+def command_names(cmd):
+    """Return the registered command name of every pipeline stage of a command line"""
+    names = (parse_command(part.strip())[0] for part in cmd.split("|"))
+    return [name for name in names if name in registry]
+
+
+def _cache_result(key, result):
+    """Store a pure result, evicting the least recently used beyond the size and byte limits"""
+    global _result_cache_bytes
+    size = result_size(result)
+    with _result_cache_lock:
+        cache_stats["misses"] += 1
+        if size > RESULT_CACHE_BYTES or key in _result_cache:
+            return
+        _result_cache[key] = result
+        _result_cache_bytes += size
+        while len(_result_cache) > RESULT_CACHE_SIZE or _result_cache_bytes > RESULT_CACHE_BYTES:
+            _, evicted = _result_cache.popitem(last=False)
+            _result_cache_bytes -= result_size(evicted)
+
+
+def _execute(cmd, current_dir):
+    """Run a command line, returning (result, whether the result may be cached)"""
+    if "|" in cmd:
+        try:
+            stages = parse_pipeline(cmd)
+        except ValueError as e:
+            return ("text", str(e), None), False
+        except LookupError as e:
+            return not_found(e.args[0], e.args[0], current_dir), False
+        with metrics.timed("command", "pipeline"):
+            result = run_pipeline(stages, current_dir)
+        return result, all(command.pure for command, _ in stages)
+
+    command, args = parse_command(cmd)
+    entry = registry.get(command)
+    if entry is None:
+        return not_found(command, cmd, current_dir), False
+
+    values = {"args": args, "current_dir": current_dir}
+    with metrics.timed("command", command):
+        result = entry.handler(*(values[param] for param in entry.params))
+    return result, entry.pure
@@ -0,0 +1,174 @@
+"""Tab completion for command names and virtual filesystem paths
+
+Completions come from prefix tries that are rebuilt only when the command
+registry changes or a different filesystem is installed; entries added to or
+removed from the filesystem are applied to the path trie one by one. A
+lookup walks just the typed prefix and the matching entries.
+"""
+
+import threading
+
+import commands
+import metrics
+
+
+# Completions returned when no limit is given
+COMPLETION_LIMIT = 20
+
+
+class PrefixTrie:
+    """Map of words to values supporting ordered prefix lookups
+
+    Args:
+        separator: Character at which completion stops descending (e.g. "/"
+            so completing a directory prefix does not list its descendants)
+    """
+
+    def __init__(self, separator=None):
+        self.separator = separator
+        self.root = {}
+        self.size = 0
+
+    def insert(self, word, value=None):
+        """Add word, storing value for it (the word itself when None)"""
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        if "" not in node:
+            self.size += 1
+        node[""] = word if value is None else value
+
+    def remove(self, word, value=None):
+        """Remove word (only if it stores value, when given), pruning empty branches"""
+        path = [self.root]
+        for char in word:
+            node = path[-1].get(char)
+            if node is None:
+                return
+            path.append(node)
+        if "" not in path[-1] or value is not None and path[-1][""] is not value:
+            return
+        del path[-1][""]
+        self.size -= 1
+        for depth in range(len(word), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][word[depth - 1]]
+
+    def complete(self, prefix, limit=COMPLETION_LIMIT):
+        """Return values of words starting with prefix, in sorted word order"""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        results = []
+        # Depth-first in character order yields words in sorted order
+        stack = [node]
+        while stack and len(results) < limit:
+            node = stack.pop()
+            if "" in node:
+                results.append(node[""])
+            for char in sorted((c for c in node if c), reverse=True):
+                if char != self.separator:
+                    stack.append(node[char])
+        return results
+
+
+class Completer:
+    """Complete the last word of a command line
+
+    The first word of each pipeline stage completes to a command name;
+    later words complete to paths relative to the current directory, with
+    directories and pages shown with a trailing slash.
+    """
+
+    def __init__(self):
+        self._commands = None
+        self._commands_key = None
+        self._paths = None
+        self._paths_key = None
+        self._lock = threading.Lock()
+
+    def _command_trie(self):
+        key = tuple(commands.registry)
+        if self._commands_key != key:
+            trie = PrefixTrie()
+            for command in commands.registry.values():
+                if not command.hidden:
+                    trie.insert(command.name)
+            self._commands, self._commands_key = trie, key
+        return self._commands
+
+    def _path_trie(self):
+        filesystem = commands.filesystem
+        key = (id(filesystem), filesystem.version)
+        if self._paths_key == key:
+            return self._paths
+        changes = None
+        if self._paths_key is not None and self._paths_key[0] == key[0]:
+            changes = filesystem.changes_since(self._paths_key[1])
+        if changes is not None:
+            for op, node in changes:
+                if op == "add":
+                    self._paths.insert(node.key, node)
+                else:
+                    self._paths.remove(node.key, node)
+        else:
+            trie = PrefixTrie(separator="/")
+            for path, node in list(filesystem.index.items()):
+                # Skip aliases (about -> about.txt) so each entry appears once
+                if node.key == path and path:
+                    trie.insert(node.key, node)
+            self._paths = trie
+        self._paths_key = key
+        return self._paths
+
+    def complete(self, line, current_dir="~", limit=COMPLETION_LIMIT):
+        """Return full command lines completing the last word of line
+
+        Args:
+            line: Partial command line as typed
+            current_dir: Directory paths are relative to
+            limit: Maximum number of completions
+
+        Returns:
+            list: Completed lines, commands ranked by use then name, paths by name
+        """
+        with metrics.timed("complete", "lookup"), self._lock:
+            head, _, stage = line.rpartition("|")
+            if head:
+                head += "| "
+            stage = stage.lstrip()
+            words = stage.split(" ")
+            if len(words) == 1:
+                return [head + name for name in self._rank(self._command_trie().complete(words[0], limit=10000), limit)]
+            prefix = head + " ".join(words[:-1]) + " "
+            return [prefix + path for path in self._complete_path(words[-1], current_dir, limit)]
+
+    def _rank(self, names, limit):
+        """Order command names by how often they ran, then alphabetically"""
+        usage = commands.usage
+        return sorted(names, key=lambda name: (-usage.get(name, 0), name))[:limit]
+
+    def _complete_path(self, word, current_dir, limit):
+        """Complete a path word, keeping the directory part as typed"""
+        directory, slash, partial = word.rpartition("/")
+        if slash:
+            base = commands.filesystem.resolve(directory, current_dir) if directory else None
+        else:
+            base = commands.filesystem.lookup(current_dir)
+        if base is None or not base.is_dir:
+            return []
+        key_prefix = f"{base.key}/{partial}" if base.key else partial
+        typed = directory + slash
+        return [typed + node.label for node in self._path_trie().complete(key_prefix, limit)]
+
+
+# Completer shared by all sessions
+completer = Completer()
+
+
+def complete(line, current_dir="~", limit=COMPLETION_LIMIT):
+    """Return completions for a partial command line (see Completer.complete)"""
+    return completer.complete(line, current_dir, limit)
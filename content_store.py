@@ -0,0 +1,185 @@
+"""In-memory content cache for text pages with mtime-based revalidation"""
+
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+
+
+# Total bytes of decoded page text kept in memory
+CACHE_BYTES = 8 * 1024 * 1024
+
+# Files larger than this are paged through mmap instead of being cached
+MMAP_THRESHOLD = 1024 * 1024
+
+# Lines served per page for large files
+PAGE_LINES = 200
+
+
+def content_type_for(path):
+    """Return the result type used to display a file ("markdown" or "text")"""
+    return "markdown" if path.endswith(".md") else "text"
+
+
+class ContentStore:
+    """LRU cache of decoded file contents bounded by a byte budget
+
+    Entries are revalidated against os.stat mtime and size on every read, so
+    edits on disk are picked up without re-reading unchanged files.
+    """
+
+    def __init__(self, max_bytes=CACHE_BYTES, mmap_threshold=MMAP_THRESHOLD):
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self.nbytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # {path: (mtime_ns, size, content_type, text)}
+        self._entries = OrderedDict()
+        # Reference-counted shared outputs: {key: [text, refcount]}
+        self._blobs = {}
+        self._lock = threading.Lock()
+
+    def is_large(self, path):
+        """Return True if path is served through mmap paging"""
+        return os.stat(path).st_size > self.mmap_threshold
+
+    def read(self, path):
+        """Return (content_type, text) for a file, reading it only when changed
+
+        Raises:
+            OSError: If the file cannot be stat'ed or read
+        """
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self._entries.move_to_end(path)
+                self.stats["hits"] += 1
+                return entry[2], entry[3]
+
+        with metrics.timed("content", "read"), open(path, "r") as f:
+            text = f.read()
+        content_type = content_type_for(path)
+
+        with self._lock:
+            self.stats["misses"] += 1
+            if st.st_size <= self.mmap_threshold:
+                self._store(path, (st.st_mtime_ns, st.st_size, content_type, text))
+        return content_type, text
+
+    def preload(self, path, mtime_ns, size, content_type, text):
+        """Seed the cache with contents read earlier (e.g. from a snapshot)
+
+        The entry is revalidated like any other, so a file changed since it
+        was recorded is simply read again. Existing entries are kept.
+        """
+        with self._lock:
+            if path not in self._entries and size <= self.mmap_threshold:
+                self._store(path, (mtime_ns, size, content_type, text))
+
+    def _store(self, path, entry):
+        """Insert an entry and evict least recently used ones over budget"""
+        old = self._entries.pop(path, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        self._entries[path] = entry
+        self.nbytes += entry[1]
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted[1]
+            self.stats["evictions"] += 1
+
+    @metrics.timed("content", "read_lines")
+    def read_lines(self, path, offset=0, limit=PAGE_LINES):
+        """Return a page of lines from a file without loading all of it
+
+        Args:
+            path: File path
+            offset: Number of lines to skip
+            limit: Maximum number of lines to return
+
+        Returns:
+            tuple: (text, next_offset) where next_offset is None at end of file
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return "", None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = len(mm)
+                start = 0
+                for _ in range(offset):
+                    newline = mm.find(b"\n", start)
+                    if newline == -1:
+                        return "", None
+                    start = newline + 1
+                end = start
+                for _ in range(limit):
+                    newline = mm.find(b"\n", end)
+                    if newline == -1:
+                        end = size
+                        break
+                    end = newline + 1
+                text = mm[start:end].decode("utf-8", errors="replace")
+        next_offset = offset + limit if end < size else None
+        return text.rstrip("\n"), next_offset
+
+    def iter_lines(self, path):
+        """Yield a file's lines without line endings
+
+        Small files come from the cache. Large files are read from disk only as
+        far as the consumer advances, so piping into head reads just the start.
+
+        Raises:
+            OSError: If the file cannot be stat'ed or read (on first iteration)
+        """
+        if not self.is_large(path):
+            yield from self.read(path)[1].splitlines()
+            return
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                yield line.rstrip("\r\n")
+
+    def retain(self, text):
+        """Store text once for all holders and return a key referencing it"""
+        key = hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            blob = self._blobs.get(key)
+            if blob is None:
+                self._blobs[key] = [text, 1]
+            else:
+                blob[1] += 1
+        return key
+
+    def release(self, key):
+        """Drop one reference taken by retain(), freeing the text with the last one"""
+        with self._lock:
+            blob = self._blobs.get(key)
+            if blob is not None:
+                blob[1] -= 1
+                if blob[1] <= 0:
+                    del self._blobs[key]
+
+    def resolve(self, key):
+        """Return the text stored under a retain() key"""
+        return self._blobs[key][0]
+
+    def discard(self, path):
+        """Drop the cached entry for a file (e.g. one deleted on disk)"""
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self.nbytes -= entry[1]
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+# Store shared by all sessions in this process
+store = ContentStore()
+metrics.register_cache("content", store.stats)
@@ -0,0 +1,194 @@
+"""Headless command engine for driving the terminal without Streamlit"""
+
+import asyncio
+import contextlib
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from commands import process_command, check_batch_rate, check_rate, run_batch, split_batch
+from completion import complete, COMPLETION_LIMIT
+from history import History, HISTORY_SIZE
+from page_runner import render_page
+from ratelimit import RateLimiter, RATE_LIMITS
+from workload import recorder as default_recorder
+
+
+# Threads running commands for async callers
+EXECUTOR_WORKERS = int(os.environ.get("SIGTERM_ENGINE_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="sigterm-engine")
+
+
+class Session:
+    """A terminal session: working directory plus command history
+
+    Args:
+        session_id: Identifier, generated when omitted
+        history_size: Number of history entries kept
+        rate_limits: {command class: (rate, burst)} for this session, None
+            to run commands without limits
+        recorder: workload.Recorder logging every command (the SIGTERM_RECORD
+            log by default), None to not record
+    """
+
+    def __init__(self, session_id=None, history_size=HISTORY_SIZE, rate_limits=RATE_LIMITS,
+                 recorder=default_recorder):
+        self.id = session_id or uuid.uuid4().hex
+        self.cwd = "~"
+        self.history = History(history_size)
+        self.limiter = RateLimiter(rate_limits) if rate_limits is not None else None
+        self.recorder = recorder
+        # Commands of one session run one at a time so cwd stays consistent
+        self._lock = threading.Lock()
+
+    def run(self, cmd):
+        """Run a command synchronously, updating cwd and history
+
+        Returns:
+            tuple: (result_type, content, new_directory) as returned by process_command
+        """
+        with self._lock:
+            return self._run(cmd)
+
+    def _run(self, cmd, charge=True):
+        if cmd == "clear":
+            self.history.clear()
+            return ("text", "", None)
+        started = time.perf_counter()
+        result = check_rate(self.limiter, cmd, self.cwd) if charge and self.limiter is not None else None
+        if result is None:
+            result = process_command(cmd, self.cwd)
+        if self.recorder is not None:
+            self.recorder.record(self.id, cmd, self.cwd, time.perf_counter() - started)
+        self.history.append(cmd, result[0], result[1])
+        if result[2] is not None:
+            self.cwd = result[2]
+        return result
+
+    def run_batch(self, script, errexit=False):
+        """Run a ;/&&-separated command list or a multi-line script in one pass
+
+        The commands share this session's directory and history, and no other
+        command of the session runs in between. The batch is charged to the
+        rate limiter once (see commands.check_batch_rate).
+
+        Returns:
+            list: (cmd, result) for every command that ran; a syntax error or
+            an exhausted rate limit is reported as a single result for the
+            whole script
+        """
+        try:
+            steps = split_batch(script)
+        except ValueError as e:
+            return [(script, ("text", str(e), None))]
+        with self._lock:
+            limited = check_batch_rate(self.limiter, steps, self.cwd) if self.limiter is not None else None
+            if limited is not None:
+                return [(script, limited)]
+            return list(run_batch(steps, lambda cmd: self._run(cmd, charge=False), errexit))
+
+    def complete(self, line, limit=COMPLETION_LIMIT):
+        """Return completions for a partial command line in this session's directory"""
+        return complete(line, self.cwd, limit)
+
+    async def execute(self, cmd):
+        """Run a command on the engine thread pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, self.run, cmd)
+
+    async def execute_text(self, cmd):
+        """Run a command and render its output as plain text, off the event loop
+
+        Returns:
+            tuple: (result, text) where result is the process_command tuple
+        """
+        def run_and_render():
+            result = self.run(cmd)
+            return result, render_text(result)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, run_and_render)
+
+    async def execute_batch_text(self, script):
+        """Run a command list or script off the event loop, rendering each output as text
+
+        Returns:
+            list: (cmd, result, text) for every command that ran
+        """
+        def run_and_render():
+            return [(cmd, result, render_text(result)) for cmd, result in self.run_batch(script)]
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, run_and_render)
+
+
+class _SessionState(dict):
+    """Dict that also supports attribute access, like st.session_state"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+class TextStreamlit:
+    """Minimal stand-in for the streamlit module that records output as text
+
+    Lets streamlit pages render for text-only clients. Text-producing calls
+    are collected; widgets are inert and unknown calls are ignored.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.session_state = _SessionState()
+
+    def _write(self, body, *args, **kwargs):
+        self.lines.append(str(body))
+
+    markdown = caption = code = text = write = warning = error = info = success = _write
+
+    def divider(self):
+        self.lines.append("---")
+
+    def spinner(self, *args, **kwargs):
+        return contextlib.nullcontext()
+
+    def container(self, *args, **kwargs):
+        return contextlib.nullcontext()
+
+    def button(self, *args, **kwargs):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def getvalue(self):
+        """Return everything written so far"""
+        return "\n\n".join(self.lines)
+
+
+def render_text(result):
+    """Render a process_command result as plain terminal text"""
+    content_type, content, _ = result
+    if content_type != "streamlit":
+        return content
+    st = TextStreamlit()
+    try:
+        render_page(content, st)
+    except TimeoutError:
+        st.lines.append("Page timed out, please try again")
+    except Exception as e:
+        st.lines.append(f"Error rendering page: {str(e)}")
+    return st.getvalue()
+
+
+def transcript(outputs):
+    """Format (cmd, text) pairs as a terminal transcript of prompts and outputs"""
+    return "\n".join(f"$ {cmd}\n{text}" if text else f"$ {cmd}" for cmd, text in outputs)
@@ -0,0 +1,333 @@
+"""Stale-while-revalidate cache for remote feeds used by pages"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+import metrics
+
+
+# Directory holding on-disk feed snapshots
+CACHE_DIR = os.environ.get("SIGTERM_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".cache"))
+
+# Seconds a worker waits for another worker's fetch before giving up
+LEASE_WAIT = 10.0
+
+# Bumped whenever any feed stores new data, so result caches can key on it
+generation = 0
+
+# Functions called with a FeedService after it stores a new copy, fetched by
+# this worker or adopted from the shared cache
+listeners = []
+
+# Copies restored (e.g. from the site snapshot) before their service exists:
+# {name: (fetched_at, data)}, taken by the service instead of its JSON snapshot
+_seeds = {}
+
+
+class NotModified(Exception):
+    """Raised by a fetch function when upstream reports the feed is unchanged"""
+
+
+class FeedService:
+    """Serve the last good copy of a feed while refreshing it in the background
+
+    The fetch function is called with no arguments and returns the parsed feed;
+    raising NotModified keeps the current copy as fresh and raising anything
+    else marks the attempt as failed. Failures are negative-cached with
+    exponential backoff so an upstream outage does not make every reader wait.
+
+    Args:
+        name: Feed name, used for the snapshot file name
+        fetch: Function returning the parsed feed data
+        ttl: Seconds a fetched copy is considered fresh
+        refresh_ahead: Seconds before expiry at which a background refresh starts
+        backoff: Seconds to wait after the first failure, doubled per failure
+        max_backoff: Upper bound for the failure backoff
+        snapshot_path: JSON file used for instant cold starts (None disables it)
+        indexer: Function building derived lookup structures from the data,
+            run once per refresh and exposed as the index attribute
+        shared: SharedCache used to exchange the feed with other worker
+            processes, so only one worker per host fetches it (None disables it)
+        clock: Time source, replaceable in tests
+    """
+
+    def __init__(self, name, fetch, ttl=3600, refresh_ahead=300, backoff=30,
+                 max_backoff=1800, snapshot_path=None, indexer=None, shared=None, clock=time.time):
+        self.name = name
+        self.fetch = fetch
+        self.indexer = indexer
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.snapshot_path = snapshot_path
+        self.shared = shared
+        self.clock = clock
+
+        self.data = None
+        self.index = None
+        self.fetched_at = 0.0
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_error = None
+        self.stats = {"hits": 0, "refreshes": 0, "not_modified": 0, "failures": 0, "shared": 0}
+
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._snapshot_loaded = False
+
+    def get(self):
+        """Return the freshest available data, or None if nothing was ever fetched
+
+        Fresh data is returned immediately. Data close to or past expiry is
+        still returned while a background thread fetches a new copy. Only the
+        very first load (no snapshot, nothing in memory) blocks on the network.
+        """
+        if not self._snapshot_loaded:
+            self.load_snapshot()
+
+        if self.data is None:
+            if self.clock() < self.retry_at:
+                return None
+            self.refresh()
+            return self.data
+
+        self.stats["hits"] += 1
+        if self.clock() >= self.fetched_at + self.ttl - self.refresh_ahead:
+            self.refresh_in_background()
+        return self.data
+
+    def prefetch(self):
+        """Start loading the feed in the background if it is missing or due for refresh"""
+        if not self._snapshot_loaded:
+            self.load_snapshot()
+        if self.data is None or self.clock() >= self.fetched_at + self.ttl - self.refresh_ahead:
+            self.refresh_in_background()
+
+    def refresh(self):
+        """Fetch the feed now, keeping the previous copy on failure
+
+        Returns:
+            bool: True if new data was stored
+        """
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self.data is not None and self.clock() < self.fetched_at + self.ttl - self.refresh_ahead:
+                return False
+            if self.clock() < self.retry_at:
+                return False
+            if self.shared is not None:
+                # Another worker may already have fetched a newer copy
+                if self._adopt_shared():
+                    return True
+                if not self.shared.acquire_lease(self._shared_key, LEASE_WAIT):
+                    # Another worker is fetching; wait for it only if we have nothing to serve
+                    return self.data is None and self._wait_for_shared()
+            try:
+                return self._fetch()
+            finally:
+                if self.shared is not None:
+                    self.shared.release_lease(self._shared_key)
+
+    def _fetch(self):
+        """Call the fetch function and store its result (caller holds the lock)"""
+        try:
+            with metrics.timed("feed", self.name):
+                data = self.fetch()
+        except NotModified:
+            if self.data is not None:
+                self.fetched_at = self.clock()
+                self.failures = 0
+                self.retry_at = 0.0
+                self.stats["not_modified"] += 1
+                if self.shared is not None:
+                    self.shared.touch(self._shared_key, self.fetched_at)
+                return False
+            self._record_failure("not modified but no copy cached")
+            return False
+        except Exception as e:
+            self._record_failure(str(e))
+            return False
+
+        self._store(data)
+        self.fetched_at = self.clock()
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_error = None
+        self.stats["refreshes"] += 1
+        if self.shared is not None:
+            self.shared.set(self._shared_key, data, self.fetched_at)
+        self.save_snapshot()
+        self._notify()
+        return True
+
+    @property
+    def _shared_key(self):
+        return f"feed:{self.name}"
+
+    def _adopt_shared(self):
+        """Take a fresh copy another worker put in the shared cache, if there is one"""
+        entry = self.shared.get(self._shared_key)
+        if entry is None:
+            return False
+        data, stored_at = entry
+        if stored_at <= self.fetched_at or self.clock() >= stored_at + self.ttl - self.refresh_ahead:
+            return False
+        self._store(data)
+        self.fetched_at = stored_at
+        self.failures = 0
+        self.retry_at = 0.0
+        self.stats["shared"] += 1
+        self._notify()
+        return True
+
+    def _wait_for_shared(self, timeout=LEASE_WAIT, interval=0.1):
+        """Poll the shared cache until the worker holding the lease stores its copy"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            if self._adopt_shared():
+                return True
+        return False
+
+    def _store(self, data):
+        """Replace the current copy and rebuild its index"""
+        global generation
+        self.index = self.indexer(data) if self.indexer is not None else None
+        self.data = data
+        generation += 1
+
+    def _notify(self):
+        """Tell the listeners a new copy was stored"""
+        for listener in listeners:
+            listener(self)
+
+    def _record_failure(self, error):
+        """Count a failed fetch and schedule the next retry with exponential backoff"""
+        self.failures += 1
+        self.stats["failures"] += 1
+        self.last_error = error
+        delay = min(self.backoff * 2 ** (self.failures - 1), self.max_backoff)
+        self.retry_at = self.clock() + delay
+
+    def refresh_in_background(self):
+        """Start a daemon thread running refresh() unless one is already running"""
+        with self._lock:
+            if self._refreshing or self.clock() < self.retry_at:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name=f"feed-refresh-{self.name}", daemon=True).start()
+
+    def load_snapshot(self):
+        """Load the last good copy from disk if there is one"""
+        self._snapshot_loaded = True
+        if self.data is not None:
+            return
+        seeded = _seeds.pop(self.name, None)
+        if seeded is not None:
+            self._store(seeded[1])
+            self.fetched_at = seeded[0]
+            return
+        if self.snapshot_path is None:
+            return
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            self._store(snapshot["data"])
+            self.fetched_at = snapshot["fetched_at"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def save_snapshot(self):
+        """Atomically write the current copy to disk"""
+        if self.snapshot_path is None:
+            return
+        directory = os.path.dirname(self.snapshot_path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".feed-")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"fetched_at": self.fetched_at, "data": self.data}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except (OSError, TypeError, ValueError):
+            os.unlink(tmp_path)
+
+
+# Feed services shared across page reloads: {name: FeedService}
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def seed(name, data, fetched_at):
+    """Provide a copy of a feed for its service to start from
+
+    Used for cold starts: the service created by get_feed() serves it
+    instead of reading its own snapshot. Ignored if the feed already has data.
+    """
+    with _feeds_lock:
+        feed = _feeds.get(name)
+        if feed is None:
+            _seeds[name] = (fetched_at, data)
+        elif feed.data is None:
+            _seeds[name] = (fetched_at, data)
+            feed._snapshot_loaded = False
+
+
+def cached(name):
+    """Return the last good copy of a feed without fetching, None if there is none
+
+    Looks at the running service, then a seeded copy, then the feed's JSON
+    snapshot, so it also works before the page owning the feed has loaded.
+    """
+    with _feeds_lock:
+        feed = _feeds.get(name)
+        seeded = _seeds.get(name)
+    if feed is not None:
+        if not feed._snapshot_loaded:
+            feed.load_snapshot()
+        if feed.data is not None:
+            return feed.data
+    if seeded is not None:
+        return seeded[1]
+    try:
+        with open(os.path.join(CACHE_DIR, f"{name}.json"), "r") as f:
+            return json.load(f)["data"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def get_feed(name, fetch, **kwargs):
+    """Return the shared FeedService for name, creating it on first use
+
+    The snapshot defaults to CACHE_DIR/<name>.json and the shared cache to
+    the host-wide SQLite cache (see shared_cache). The fetch and indexer
+    functions of an existing service are updated so reloaded page modules use
+    their new code.
+    """
+    with _feeds_lock:
+        feed = _feeds.get(name)
+        if feed is None:
+            kwargs.setdefault("snapshot_path", os.path.join(CACHE_DIR, f"{name}.json"))
+            if "shared" not in kwargs:
+                from shared_cache import default_cache
+
+                kwargs["shared"] = default_cache()
+            feed = FeedService(name, fetch, **kwargs)
+            _feeds[name] = feed
+        else:
+            feed.fetch = fetch
+            feed.indexer = kwargs.get("indexer", feed.indexer)
+        return feed
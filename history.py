@@ -0,0 +1,140 @@
+"""Bounded per-session command history"""
+
+import os
+import sys
+import threading
+import weakref
+from collections import deque
+
+import metrics
+from content_store import store as shared_store
+
+
+# Entries kept per session
+HISTORY_SIZE = int(os.environ.get("SIGTERM_HISTORY_SIZE", "50"))
+
+# Text outputs whose UTF-8 encoding is larger than this are kept once in the
+# shared content store
+INLINE_BYTES = 4096
+
+
+def is_large(text):
+    """Return True if text encodes to more than INLINE_BYTES bytes"""
+    # A character takes 1 to 4 bytes, so only text in between is encoded
+    if len(text) > INLINE_BYTES:
+        return True
+    if len(text) * 4 <= INLINE_BYTES:
+        return False
+    return len(text.encode("utf-8", errors="surrogatepass")) > INLINE_BYTES
+
+
+class HistoryEntry:
+    """One command and its output
+
+    Large text outputs are held as a key into the shared content store so
+    sessions showing the same file share a single copy. render_key caches the
+    entry's render cache key once it has been displayed.
+    """
+
+    __slots__ = ("cmd", "type", "render_key", "_content", "_ref", "_store")
+
+    def __init__(self, cmd, content_type, content, store):
+        self.cmd = cmd
+        self.type = content_type
+        self.render_key = None
+        self._store = store
+        if isinstance(content, str) and is_large(content):
+            self._content = None
+            self._ref = store.retain(content)
+        else:
+            self._content = content
+            self._ref = None
+
+    @property
+    def content(self):
+        """The output, resolved from the shared store if held by reference"""
+        if self._ref is not None:
+            return self._store.resolve(self._ref)
+        return self._content
+
+    def release(self):
+        """Give back the shared store reference, if any"""
+        if self._ref is not None:
+            self._store.release(self._ref)
+            self._ref = None
+
+    def nbytes(self):
+        """Bytes owned by this entry (shared outputs count only their key)"""
+        size = sys.getsizeof(self) + sys.getsizeof(self.cmd) + sys.getsizeof(self.type)
+        if self._ref is not None:
+            return size + sys.getsizeof(self._ref)
+        if isinstance(self._content, str):
+            return size + sys.getsizeof(self._content)
+        return size
+
+
+def _release_all(entries):
+    """Release every entry's shared reference"""
+    for entry in entries:
+        entry.release()
+    entries.clear()
+
+
+class History:
+    """Ring buffer of the most recent commands of a session
+
+    Args:
+        maxlen: Number of entries kept, older ones are dropped
+        store: ContentStore holding large outputs
+    """
+
+    def __init__(self, maxlen=HISTORY_SIZE, store=shared_store):
+        self.maxlen = maxlen
+        self.store = store
+        self._entries = deque()
+        # Shared references are released when the session's history is dropped
+        self._finalizer = weakref.finalize(self, _release_all, self._entries)
+        with _histories_lock:
+            _histories.add(self)
+
+    def append(self, cmd, content_type, content):
+        """Record a command and its output, evicting the oldest entry when full"""
+        while len(self._entries) >= self.maxlen:
+            self._entries.popleft().release()
+        self._entries.append(HistoryEntry(cmd, content_type, content, self.store))
+
+    def last(self):
+        """Return the most recent entry, or None if empty"""
+        return self._entries[-1] if self._entries else None
+
+    def clear(self):
+        """Forget all entries"""
+        _release_all(self._entries)
+
+    def nbytes(self):
+        """Approximate bytes of memory owned by this session's history"""
+        return sys.getsizeof(self._entries) + sum(entry.nbytes() for entry in self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+
+# Every live session's history, sampled by the gauges below
+_histories = weakref.WeakSet()
+_histories_lock = threading.Lock()
+
+
+def history_bytes():
+    """Return (sessions, total bytes, largest session's bytes) over live histories"""
+    with _histories_lock:
+        histories = list(_histories)
+    sizes = [history.nbytes() for history in histories]
+    return len(sizes), sum(sizes), max(sizes, default=0)
+
+
+metrics.register_gauge("history_sessions", lambda: history_bytes()[0], "Sessions holding a command history")
+metrics.register_gauge("history_bytes", lambda: history_bytes()[1], "Bytes owned by all session histories")
+metrics.register_gauge("history_bytes_max", lambda: history_bytes()[2], "Bytes owned by the largest session history")
@@ -0,0 +1,104 @@
+"""Shared HTTP client for remote-backed pages"""
+
+import importlib.util
+import threading
+from urllib.parse import urlsplit
+
+import metrics
+
+
+# Concurrent requests allowed to a single host
+MAX_PER_HOST = 4
+
+# Keep-alive connections kept per host by the session pool
+POOL_SIZE = 10
+
+
+def accept_encoding():
+    """Encodings to advertise; brotli only when urllib3 can decode it"""
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        return "gzip, deflate, br"
+    return "gzip, deflate"
+
+
+class HttpClient:
+    """Pooled requests.Session with conditional GETs and per-host limits
+
+    Validators (ETag / Last-Modified) from the last 200 response of each URL
+    are sent back on the next request, so an unchanged resource costs a 304
+    with no body instead of a full download.
+    """
+
+    def __init__(self, max_per_host=MAX_PER_HOST, pool_size=POOL_SIZE):
+        self.max_per_host = max_per_host
+        self.pool_size = pool_size
+        self.stats = {"requests": 0, "not_modified": 0, "bytes": 0}
+        # {url: {"If-None-Match": ..., "If-Modified-Since": ...}}
+        self._validators = {}
+        self._host_limits = {}
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The shared keep-alive session, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers["Accept-Encoding"] = accept_encoding()
+                    self._session = session
+        return self._session
+
+    def _host_limit(self, url):
+        """Semaphore bounding concurrent requests to the URL's host"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            limit = self._host_limits.get(host)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self.max_per_host)
+                self._host_limits[host] = limit
+        return limit
+
+    def fetch(self, url, timeout=10, conditional=True):
+        """GET a URL, returning its body or None if unchanged since the last fetch
+
+        Args:
+            url: URL to fetch
+            timeout: Request timeout in seconds
+            conditional: Send validators from the previous response
+
+        Returns:
+            bytes: Response body, or None on 304 Not Modified
+
+        Raises:
+            requests.RequestException: On connection errors and HTTP error statuses
+        """
+        headers = self._validators.get(url, {}) if conditional else {}
+        with self._host_limit(url), metrics.timed("http", urlsplit(url).netloc):
+            response = self.session.get(url, headers=headers, timeout=timeout)
+        self.stats["requests"] += 1
+
+        if response.status_code == 304:
+            self.stats["not_modified"] += 1
+            return None
+        response.raise_for_status()
+
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        self._validators[url] = validators
+        self.stats["bytes"] += len(response.content)
+        return response.content
+
+
+# Client shared by all pages in this process
+client = HttpClient()
@@ -0,0 +1,209 @@
+"""In-process timing histograms, cache counters and gauges with Prometheus export"""
+
+import bisect
+import functools
+import threading
+import time
+
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """Cumulative-style latency histogram for one operation"""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+
+# {(kind, name): Histogram}, e.g. ("command", "ls") or ("load_page", "exec")
+histograms = {}
+
+# Cache counter dicts registered by modules: {cache name: {"hits": n, "misses": n, ...}}
+caches = {}
+
+# Gauges registered by modules: {gauge name: (function returning the current value, help text)}
+gauges = {}
+
+_lock = threading.Lock()
+
+
+def observe(kind, name, seconds):
+    """Record one duration for an operation"""
+    with _lock:
+        histogram = histograms.get((kind, name))
+        if histogram is None:
+            histogram = histograms[(kind, name)] = Histogram()
+        histogram.observe(seconds)
+
+
+class timed:
+    """Time a block or function into the (kind, name) histogram
+
+    Usable as a context manager:
+        with timed("load_page", "exec"):
+            ...
+    or as a decorator:
+        @timed("feed", "fetch")
+        def fetch(): ...
+    """
+
+    __slots__ = ("kind", "name", "_start")
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.kind, self.name, time.perf_counter() - self._start)
+        return False
+
+    def __call__(self, func):
+        kind, name = self.kind, self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(kind, name, time.perf_counter() - start)
+
+        return wrapper
+
+
+def register_cache(name, stats):
+    """Expose a module's cache counter dict (with "hits" and "misses") as name"""
+    caches[name] = stats
+
+
+def register_gauge(name, read, help=""):
+    """Expose a value sampled on every export, e.g. memory held by a module, as name
+
+    read is called with no arguments whenever metrics are rendered.
+    """
+    gauges[name] = (read, help)
+
+
+def sample_gauges():
+    """Return {gauge name: current value}"""
+    return {name: read() for name, (read, _) in sorted(gauges.items())}
+
+
+def reset():
+    """Forget all recorded timings"""
+    with _lock:
+        histograms.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus():
+    """Return all metrics in the Prometheus text exposition format"""
+    lines = [
+        "# HELP sigterm_duration_seconds Time spent in commands and loader stages",
+        "# TYPE sigterm_duration_seconds histogram",
+    ]
+    with _lock:
+        items = sorted((key, (list(h.counts), h.count, h.sum)) for key, h in histograms.items())
+    for (kind, name), (counts, count, total) in items:
+        labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+        cumulative = 0
+        for bound, bucket_count in zip(BUCKETS, counts):
+            cumulative += bucket_count
+            lines.append(f'sigterm_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'sigterm_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f"sigterm_duration_seconds_sum{{{labels}}} {total}")
+        lines.append(f"sigterm_duration_seconds_count{{{labels}}} {count}")
+
+    lines += [
+        "# HELP sigterm_cache_events_total Cache lookups by outcome",
+        "# TYPE sigterm_cache_events_total counter",
+    ]
+    for cache, stats in sorted(caches.items()):
+        for event, value in sorted(stats.items()):
+            lines.append(f'sigterm_cache_events_total{{cache="{_escape(cache)}",event="{_escape(event)}"}} {value}')
+
+    for name, value in sample_gauges().items():
+        lines += [
+            f"# HELP sigterm_{name} {gauges[name][1] or name}",
+            f"# TYPE sigterm_{name} gauge",
+            f"sigterm_{name} {value}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def summary(limit=10):
+    """Return a terminal report of the slowest operations, cache hit ratios and gauges"""
+    with _lock:
+        rows = sorted(histograms.items(), key=lambda item: item[1].mean, reverse=True)[:limit]
+        rows = [(f"{kind}:{name}", h.mean, h.max, h.count) for (kind, name), h in rows]
+    lines = [f"{'operation':<28}{'mean':>10}{'max':>10}{'calls':>8}"]
+    for label, mean, worst, count in rows:
+        lines.append(f"{label:<28}{mean * 1000:>8.2f}ms{worst * 1000:>8.2f}ms{count:>8}")
+    if not rows:
+        lines.append("(no timings recorded yet)")
+
+    lines.append("")
+    lines.append(f"{'cache':<28}{'hit ratio':>10}{'hits':>10}{'misses':>8}")
+    for cache, stats in sorted(caches.items()):
+        hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+        ratio = f"{hits / (hits + misses):.1%}" if hits + misses else "-"
+        lines.append(f"{cache:<28}{ratio:>10}{hits:>10}{misses:>8}")
+
+    values = sample_gauges()
+    if values:
+        lines.append("")
+        lines.append(f"{'gauge':<28}{'value':>10}")
+        for name, value in values.items():
+            lines.append(f"{name:<28}{value:>10}")
+    return "\n".join(lines)
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serve /metrics from a daemon thread, returning the server"""
+    # http.server is only needed when the endpoint is enabled
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="sigterm-metrics", daemon=True).start()
+    return server
@@ -4,25 +4,92 @@ import os
 import importlib.util
 import sys
 
+import metrics
+from singleflight import SingleFlight
 
-def load_page(page_name):
+
+# Loaded page modules keyed by file path: {path: (mtime, module)}
+_module_cache = {}
+
+# Registry hit/miss counters
+cache_stats = {"hits": 0, "misses": 0}
+metrics.register_cache("page_modules", cache_stats)
+
+# Concurrent first loads of a page execute it once
+_flight = SingleFlight("page_modules")
+
+
+def _import_page(page_name, py_path):
+    """Import a page module, reusing the cached module if the file is unchanged"""
+    mtime = os.stat(py_path).st_mtime_ns
+    cached = _module_cache.get(py_path)
+    if cached is not None and cached[0] == mtime:
+        cache_stats["hits"] += 1
+        return cached[1]
+
+    return _flight.do(py_path, _exec_page, page_name, py_path, mtime)
+
+
+def _exec_page(page_name, py_path, mtime):
+    """Execute a page file as a fresh module and cache it"""
+    cached = _module_cache.get(py_path)
+    if cached is not None and cached[0] == mtime:
+        # Loaded by a call that finished while this one was starting
+        cache_stats["hits"] += 1
+        return cached[1]
+
+    cache_stats["misses"] += 1
+    spec = importlib.util.spec_from_file_location(f"page_{page_name}", py_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[f"page_{page_name}"] = module
+    try:
+        with metrics.timed("load_page", "exec"):
+            spec.loader.exec_module(module)
+    except Exception:
+        # Drop the half-initialised module so the next load retries the import
+        sys.modules.pop(f"page_{page_name}", None)
+        _module_cache.pop(py_path, None)
+        raise
+    _module_cache[py_path] = (mtime, module)
+    return module
+
+
+def clear_page_cache():
+    """Forget all loaded page modules and reset the hit/miss counters"""
+    _module_cache.clear()
+    cache_stats["hits"] = 0
+    cache_stats["misses"] = 0
+
+
+def load_page_module(page_name, pages_dir=None):
+    """Return the module of a .py page, or None if the page does not exist
+
+    Raises:
+        Exception: Whatever the page module raises while being imported
+    """
+    if pages_dir is None:
+        pages_dir = os.path.join(os.path.dirname(__file__), "pages")
+    py_path = os.path.join(pages_dir, f"{page_name}.py")
+    if not os.path.exists(py_path):
+        return None
+    return _import_page(page_name, py_path)
+
+
+@metrics.timed("load_page", "total")
+def load_page(page_name, pages_dir=None):
     """Load page content from pages directory
     Returns: (content_type, content) where content_type is 'text' or 'streamlit'
     """
-    pages_dir = os.path.join(os.path.dirname(__file__), "pages")
+    if pages_dir is None:
+        pages_dir = os.path.join(os.path.dirname(__file__), "pages")
 
     # Try .py file first (Streamlit pages)
-    py_path = os.path.join(pages_dir, f"{page_name}.py")
-    if os.path.exists(py_path):
-        try:
-            spec = importlib.util.spec_from_file_location(f"page_{page_name}", py_path)
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[f"page_{page_name}"] = module
-            spec.loader.exec_module(module)
-            if hasattr(module, "render"):
-                return ("streamlit", module.render)
-        except Exception as e:
-            return ("text", f"Error loading page: {str(e)}")
+    try:
+        module = load_page_module(page_name, pages_dir)
+        if module is not None and hasattr(module, "render"):
+            return ("streamlit", module.render)
+    except Exception as e:
+        return ("text", f"Error loading page: {str(e)}")
 
     # Try .txt file (text pages)
     txt_path = os.path.join(pages_dir, f"{page_name}.txt")
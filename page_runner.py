@@ -0,0 +1,89 @@
+"""Deferred page rendering on a shared thread pool
+
+A page's render(st, ...) may draw everything at once, or draw what it can
+immediately and return a pending body: a concurrent.futures.Future or an
+awaitable resolving to a draw(st) callable. The slow part (typically a
+network fetch) then runs on the shared pool while the app keeps the prompt
+responsive, and the body is drawn once it is ready:
+
+    def render(st):
+        st.markdown("### Title")
+        return deferred(fetch_items, draw_items)   # draw_items(st, items)
+"""
+
+import asyncio
+import inspect
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import metrics
+
+
+# Threads running deferred page work, shared by all sessions
+RENDER_WORKERS = int(os.environ.get("SIGTERM_RENDER_WORKERS", "8"))
+
+# Seconds a deferred page body may take before it is reported as timed out
+RENDER_TIMEOUT = float(os.environ.get("SIGTERM_RENDER_TIMEOUT", "10"))
+
+# Seconds to wait inline before falling back to drawing the body later
+INLINE_WAIT = 0.05
+
+_pool = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="sigterm-render")
+
+
+def submit(fn, *args, **kwargs):
+    """Run fn on the shared pool (coroutine functions in their own event loop)
+
+    All deferred page work goes through here.
+    """
+    if inspect.iscoroutinefunction(fn):
+        return _pool.submit(asyncio.run, fn(*args, **kwargs))
+    return _pool.submit(fn, *args, **kwargs)
+
+
+def deferred(fetch, draw):
+    """Run fetch() on the pool and return a Future of a callable drawing its result
+
+    Args:
+        fetch: Slow function (or coroutine function) without Streamlit calls
+        draw: Function draw(st, result) run in the script thread
+    """
+    def run():
+        with metrics.timed("render", "deferred"):
+            result = asyncio.run(fetch()) if inspect.iscoroutinefunction(fetch) else fetch()
+        return lambda st: draw(st, result)
+
+    return submit(run)
+
+
+def is_pending(value):
+    """True if a render function returned a body still to be drawn"""
+    return isinstance(value, Future) or inspect.isawaitable(value)
+
+
+def as_future(value):
+    """Return a Future for a pending body (awaitables are run on the pool)"""
+    if isinstance(value, Future):
+        return value
+    return submit(_await, value)
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def render_page(render, st, timeout=None, **options):
+    """Call a page's render function and draw its pending body, waiting up to timeout
+
+    Used by clients that cannot draw later (text sessions, tests). timeout
+    defaults to RENDER_TIMEOUT.
+
+    Raises:
+        TimeoutError: If the pending body is not ready in time
+    """
+    pending = render(st, **options)
+    if is_pending(pending):
+        draw = as_future(pending).result(timeout=RENDER_TIMEOUT if timeout is None else timeout)
+        if draw is not None:
+            draw(st)
+
@@ -1,86 +1,138 @@
 """Dynamic blog page that fetches posts from Regression Room"""
 
-import requests
-from bs4 import BeautifulSoup
-import streamlit as st
+import functools
+import os
+import metrics
+from blog_parser import parse_posts
+from feed_service import get_feed, NotModified
+from http_client import client
+from page_runner import deferred
+from post_index import PostIndex
+
+# Listing page scraped for posts (overridable to point at a local stub)
+BLOG_URL = os.environ.get("SIGTERM_BLOG_URL", "https://prteek.github.io/regression_room/index.html")
+
+# Relative post links are resolved against the public site
+SITE_URL = "https://prteek.github.io/regression_room/"
+
+# Posts shown per page (and per "Load more" batch)
+PAGE_SIZE = 20
+
+
+def parse_blog_posts(html):
+    """Extract posts from the Regression Room listing page
+
+    Args:
+        html: Page content (bytes or str)
+
+    Returns:
+        list: List of blog post dictionaries with title, url, tags
+    """
+    return parse_posts(html, base_url=SITE_URL)
+
+
+def download_blog_posts():
+    """Download and parse the blog listing, raising on failure or an empty feed
+
+    Raises:
+        NotModified: If the listing is unchanged since the cached copy was fetched
+    """
+    html = client.fetch(BLOG_URL, timeout=10, conditional=feed.data is not None)
+    if html is None:
+        raise NotModified()
+    with metrics.timed("blog", "parse"):
+        posts = parse_blog_posts(html)
+    if not posts:
+        raise ValueError("no posts found")
+    return posts
+
+
+# Refreshed in the background before the 1 hour TTL expires; the tag and
+# title indexes are rebuilt once per refresh
+feed = get_feed("blog", download_blog_posts, ttl=3600, indexer=PostIndex)
+
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def fetch_blog_posts():
     """Fetch blog posts from Regression Room website
 
     Returns:
         list: List of blog post dictionaries with title, url, description, tags
     """
-    try:
-        url = "https://prteek.github.io/regression_room/index.html"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Find all post containers (quarto-post elements)
-        posts = []
-        post_containers = soup.find_all('div', class_='quarto-post')
-
-        for container in post_containers:
-            # Extract title and link from h3 > a
-            title_elem = container.find('h3', class_='listing-title')
-            if not title_elem:
-                continue
-
-            link_elem = title_elem.find('a')
-            if not link_elem:
-                continue
-
-            title = link_elem.get_text(strip=True)
-            url = link_elem.get('href', '#')
-
-            # Make relative URLs absolute
-            if url.startswith('./'):
-                url = "https://prteek.github.io/regression_room/" + url[2:]
-            elif url.startswith('/'):
-                url = "https://prteek.github.io" + url
-
-            # Extract categories/tags
-            categories_elem = container.find('div', class_='listing-categories')
-            tags = []
-            if categories_elem:
-                tag_elems = categories_elem.find_all('div', class_='listing-category')
-                tags = [tag.get_text(strip=True) for tag in tag_elems]
-
-            posts.append({
-                'title': title,
-                'url': url,
-                'tags': tags
-            })
-
-        return posts if posts else None
-
-    except Exception as e:
+    return feed.get()
+
+
+def prewarm():
+    """Load the feed at worker startup (from the shared cache if another worker fetched it)"""
+    feed.get()
+
+
+def search(pattern=None, tag=None):
+    """Find posts for grep (title/tag words) or ls --tag
+
+    Returns:
+        list: One "title  url" line per matching post, or None if the feed is unavailable
+    """
+    if fetch_blog_posts() is None or feed.index is None:
         return None
+    posts = feed.index.by_tag(tag) if tag is not None else feed.index.search(pattern)
+    return [f"{post['title']}  {post['url']}" for post in posts]
+
 
+def format_posts(posts):
+    """Format posts as one markdown block, separated by horizontal rules"""
+    blocks = []
+    for post in posts:
+        block = f"**[{post['title']}]({post['url']})**"
+        if post['tags']:
+            block += "\n\n" + " · ".join([f"`{tag}`" for tag in post['tags']])
+        blocks.append(block)
+    return "\n\n---\n\n".join(blocks)
 
-def render(st):
+
+def render(st, page=1, limit=PAGE_SIZE):
     """Render the dynamic blog page
 
+    With the feed in memory the posts are drawn at once; on a cold start the
+    download runs on the shared render pool and the posts are drawn when ready.
+
     Args:
         st: Streamlit module
+        page: 1-based page number (cd blog --page N)
+        limit: Posts per page (cd blog --limit N)
     """
     st.markdown("### 📝 Blog Posts")
     st.markdown("Statistical analysis and regression modeling from [Regression Room](https://prteek.github.io/regression_room/)")
     st.divider()
 
-    with st.spinner("Loading blog posts..."):
-        posts = fetch_blog_posts()
-
-    if posts:
-        for post in posts:
-            st.markdown(f"**[{post['title']}]({post['url']})**")
+    draw = functools.partial(render_posts, page=page, limit=limit)
+    if feed.data is not None:
+        draw(st, fetch_blog_posts())
+        return None
+    return deferred(fetch_blog_posts, draw)
 
-            if post['tags']:
-                tag_str = " · ".join([f"`{tag}`" for tag in post['tags']])
-                st.markdown(tag_str)
 
-            st.divider()
-    else:
+def render_posts(st, posts, page=1, limit=PAGE_SIZE):
+    """Draw one page of posts with a "Load more" button"""
+    if not posts:
         st.warning("Could not fetch blog posts. Please try again later.")
+        return
+
+    limit = max(limit, 1)
+    page_count = (len(posts) + limit - 1) // limit
+    page = min(max(page, 1), page_count)
+    start = (page - 1) * limit
+
+    # "Load more" extends the current page by another batch of posts
+    more_key = f"blog_batches_{page}_{limit}"
+    batches = st.session_state.get(more_key, 1)
+    end = min(start + limit * batches, len(posts))
+
+    st.markdown(format_posts(posts[start:end]))
+    st.divider()
+    st.caption(f"Posts {start + 1}-{end} of {len(posts)} · page {page}/{page_count} · cd blog --page N --limit N")
+
+    if end < len(posts):
+        def load_more():
+            st.session_state[more_key] = batches + 1
+
+        st.button("Load more", key=more_key + "_button", on_click=load_more)
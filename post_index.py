@@ -0,0 +1,79 @@
+"""Inverted indexes over blog posts for tag filtering and title search"""
+
+import bisect
+import re
+
+
+# Query results memoized per index before the memo is reset
+MAX_CACHED_QUERIES = 1024
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class PostIndex:
+    """Tag and title token indexes built once per feed refresh
+
+    Args:
+        posts: List of post dictionaries with title, url, tags
+    """
+
+    def __init__(self, posts):
+        self.posts = list(posts or [])
+        # {tag: [post ids]} and {token: [post ids]}, ids in feed order
+        self.tags = {}
+        self.tokens = {}
+        for post_id, post in enumerate(self.posts):
+            for tag in post.get("tags", []):
+                ids = self.tags.setdefault(tag.lower(), [])
+                if not ids or ids[-1] != post_id:
+                    ids.append(post_id)
+            words = tokenize(post.get("title", "")) + [t for tag in post.get("tags", []) for t in tokenize(tag)]
+            for token in words:
+                ids = self.tokens.setdefault(token, [])
+                if not ids or ids[-1] != post_id:
+                    ids.append(post_id)
+        self._sorted_tokens = sorted(self.tokens)
+        self._results = {}
+
+    def _memo(self, key, compute):
+        """Return a cached query result, computing it on first use"""
+        result = self._results.get(key)
+        if result is None:
+            if len(self._results) >= MAX_CACHED_QUERIES:
+                self._results.clear()
+            result = compute()
+            self._results[key] = result
+        return result
+
+    def by_tag(self, tag):
+        """Return posts carrying tag (case-insensitive)"""
+        return self._memo(("tag", tag.lower()), lambda: [self.posts[i] for i in self.tags.get(tag.lower(), [])])
+
+    def _prefix_ids(self, prefix):
+        """Return ids of posts with any token starting with prefix"""
+        ids = set()
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            ids.update(self.tokens[token])
+        return ids
+
+    def search(self, query):
+        """Return posts whose title or tags contain a word starting with every query term"""
+        terms = tokenize(query)
+
+        def compute():
+            if not terms:
+                return []
+            ids = self._prefix_ids(terms[0])
+            for term in terms[1:]:
+                ids &= self._prefix_ids(term)
+            return [self.posts[i] for i in sorted(ids)]
+
+        return self._memo(("search", tuple(terms)), compute)
@@ -0,0 +1,118 @@
+"""Per-session token-bucket rate limiting by command class
+
+Each command is charged to a class (Command.rate_class, which may depend on
+the command's target: cd only costs a "page" token when it enters a page);
+every session has one bucket per class. Limits are "class=rate:burst" pairs, e.g.
+
+    SIGTERM_RATE_LIMITS="default=10:30,search=2:10,page=1:5"
+
+where rate is tokens refilled per second and burst is the bucket size. Set
+SIGTERM_RATE_LIMITS=off to disable limiting.
+"""
+
+import os
+import threading
+import time
+
+
+# {class: (tokens per second, burst)}; classes without an entry use "default"
+DEFAULT_RATE_LIMITS = {"default": (10.0, 30), "search": (2.0, 10), "page": (1.0, 5)}
+
+
+def parse_limits(spec):
+    """Parse "class=rate:burst,..." into a limits dict, None for "off"
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    if spec.strip().lower() == "off":
+        return None
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        try:
+            limits[name.strip()] = (float(rate), int(burst or max(1, float(rate))))
+        except ValueError:
+            raise ValueError(f"invalid rate limit {item!r}, expected class=rate:burst")
+    return limits
+
+
+RATE_LIMITS = parse_limits(os.environ["SIGTERM_RATE_LIMITS"]) if "SIGTERM_RATE_LIMITS" in os.environ else DEFAULT_RATE_LIMITS
+
+
+class TokenBucket:
+    """Bucket of up to burst tokens refilled at rate tokens per second"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "clock")
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost=1):
+        """Seconds until cost tokens are available (0 if they are now)"""
+        self._refill()
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, cost=1):
+        """Take cost tokens if available, returning True on success"""
+        if self.wait_time(cost):
+            return False
+        self.tokens -= cost
+        return True
+
+
+class RateLimiter:
+    """Buckets of one session, keyed by command class
+
+    Args:
+        limits: {class: (rate, burst)}, must contain "default"
+        clock: Time source, replaceable in tests
+    """
+
+    def __init__(self, limits=DEFAULT_RATE_LIMITS, clock=time.monotonic):
+        self.limits = limits
+        self.clock = clock
+        self.buckets = {}
+        self.stats = {"allowed": 0, "limited": 0}
+        self._lock = threading.Lock()
+
+    def _bucket(self, rate_class):
+        bucket = self.buckets.get(rate_class)
+        if bucket is None:
+            rate, burst = self.limits.get(rate_class, self.limits["default"])
+            bucket = self.buckets[rate_class] = TokenBucket(rate, burst, self.clock)
+        return bucket
+
+    def acquire(self, rate_classes):
+        """Take one token per listed class, or none at all if any bucket is short
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until the command would be
+        """
+        costs = {}
+        for rate_class in rate_classes:
+            costs[rate_class] = costs.get(rate_class, 0) + 1
+        with self._lock:
+            # A command can never cost more than a full bucket
+            charges = [(bucket, min(cost, bucket.burst))
+                       for bucket, cost in ((self._bucket(name), cost) for name, cost in costs.items())]
+            wait = max((bucket.wait_time(cost) for bucket, cost in charges), default=0.0)
+            if wait:
+                self.stats["limited"] += 1
+                return wait
+            for bucket, cost in charges:
+                bucket.take(cost)
+            self.stats["allowed"] += 1
+            return 0.0
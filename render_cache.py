@@ -0,0 +1,108 @@
+"""HTML rendered once per distinct output, shared by all sessions
+
+Text output becomes an escaped <pre> block and markdown is converted with the
+markdown package from requirements.txt (should it be missing, markdown is
+left to st.markdown). Entries are keyed by a hash of the content type and text, so
+an edited page gets a new entry and an unchanged one is never re-rendered.
+"""
+
+import hashlib
+import html
+import threading
+from collections import OrderedDict
+
+import metrics
+
+
+# Total bytes of rendered HTML kept in memory
+RENDER_CACHE_BYTES = 16 * 1024 * 1024
+
+# Extensions passed to markdown.markdown
+MARKDOWN_EXTENSIONS = ("fenced_code", "tables")
+
+
+def render_text(text):
+    """Return terminal text as an escaped preformatted HTML block"""
+    return f'<pre class="terminal-output"><code>{html.escape(text)}</code></pre>'
+
+
+def render_markdown(text):
+    """Return markdown converted to HTML, or None if markdown is not installed"""
+    try:
+        import markdown
+    except ImportError:
+        return None
+    return f'<div class="terminal-markdown">{markdown.markdown(text, extensions=list(MARKDOWN_EXTENSIONS))}</div>'
+
+
+RENDERERS = {"text": render_text, "markdown": render_markdown}
+
+
+class RenderCache:
+    """LRU of rendered HTML keyed by content hash, bounded by a byte budget"""
+
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # {key: html}, html is None when the type cannot be pre-rendered
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content_type, text):
+        """Hash identifying one version of an output"""
+        digest = hashlib.blake2b(content_type.encode(), digest_size=16)
+        digest.update(text.encode("utf-8", errors="surrogatepass"))
+        return digest.digest()
+
+    def render(self, content_type, text, key=None):
+        """Return HTML for an output, rendering it only the first time
+
+        Args:
+            content_type: "text" or "markdown"
+            text: Output to render
+            key: Precomputed key(content_type, text), if the caller has one
+
+        Returns:
+            str: HTML, or None if this type cannot be pre-rendered
+        """
+        if key is None:
+            key = self.key(content_type, text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._entries[key]
+
+        renderer = RENDERERS.get(content_type)
+        with metrics.timed("render_cache", content_type):
+            rendered = renderer(text) if renderer is not None else None
+
+        with self._lock:
+            self.stats["misses"] += 1
+            if key not in self._entries:
+                self._entries[key] = rendered
+                self.nbytes += len(rendered) if rendered else 0
+                while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.nbytes -= len(evicted) if evicted else 0
+                    self.stats["evictions"] += 1
+        return rendered
+
+    def render_entry(self, entry):
+        """Return HTML for a history entry, hashing its content only once"""
+        if entry.render_key is None:
+            entry.render_key = self.key(entry.type, entry.content)
+        return self.render(entry.type, entry.content, entry.render_key)
+
+    def clear(self):
+        """Drop all rendered HTML"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+# Cache shared by all sessions in this process
+render_cache = RenderCache()
+metrics.register_cache("render", render_cache.stats)
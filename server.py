@@ -0,0 +1,209 @@
+"""Lightweight asyncio HTTP server exposing the headless command engine
+
+Endpoints:
+    POST /sessions                  Create a session, returns {"id": ...}
+    POST /sessions/<id>/execute     Run the request body as a command (the
+                                    session is created if it does not exist)
+    POST /sessions/<id>/batch       Run a ;/&&-separated command list or a
+                                    multi-line script in one request, returns
+                                    {"results": [{"cmd", "type", "content"}], "cwd"}
+    POST /sessions/<id>/complete    Complete the partial command line in the
+                                    body, returns {"completions": [...]}
+    GET  /health                    Liveness check
+    GET  /metrics                   Timings and cache counters (Prometheus text)
+
+Responses are JSON ({"type", "content", "cwd"}) unless the client sends
+"Accept: text/plain", in which case only the terminal text is returned (a
+transcript of prompts and outputs for batches):
+
+    curl -H 'Accept: text/plain' -d 'cat about' localhost:8765/sessions/me/execute
+    curl -H 'Accept: text/plain' --data-binary @smoke.sh localhost:8765/sessions/me/batch
+
+Pages added, edited or removed on disk are picked up while serving (see
+watcher.py).
+
+Usage:
+    python server.py [--host 127.0.0.1] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+
+import metrics
+import watcher
+from commands import filesystem
+from engine import Session, transcript
+
+
+# Sessions kept in memory; the least recently used one is dropped beyond this
+MAX_SESSIONS = 10000
+
+# Largest request body accepted
+MAX_BODY_BYTES = 64 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class TerminalServer:
+    """Serve many concurrent terminal sessions from one process
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        max_sessions: Number of sessions kept in memory
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, max_sessions=MAX_SESSIONS):
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self._server = None
+
+    def get_session(self, session_id=None):
+        """Return the session with session_id, creating it when missing"""
+        with self._sessions_lock:
+            session = self.sessions.get(session_id) if session_id else None
+            if session is None:
+                session = Session(session_id)
+                self.sessions[session.id] = session
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+            else:
+                self.sessions.move_to_end(session_id)
+            return session
+
+    async def start(self):
+        """Start listening; the bound port is stored in self.port"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle_connection(self, reader, writer):
+        """Serve keep-alive HTTP/1.1 requests until the client disconnects"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, close=True)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = headers.get("content-length", "0") or "0"
+                if not length.isdigit():
+                    await self._respond(writer, 400, {"error": "invalid Content-Length"}, close=True)
+                    break
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "body too large"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                close = headers.get("connection", "").lower() == "close"
+                status, payload = await self.handle(method, path, headers, body)
+                await self._respond(writer, status, payload, close=close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, method, path, headers, body):
+        """Route a request, returning (status, payload) where payload is a dict or str"""
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+        if parts == ["health"]:
+            return 200, {"status": "ok", "sessions": len(self.sessions)}
+        if parts == ["metrics"]:
+            return 200, metrics.render_prometheus()
+        if parts == ["sessions"]:
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            return 200, {"id": self.get_session().id}
+        if len(parts) == 3 and parts[0] == "sessions" and parts[2] in ("execute", "batch", "complete"):
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            cmd = body.decode("utf-8", errors="replace")
+            if headers.get("content-type", "").startswith("application/json"):
+                try:
+                    cmd = json.loads(cmd)["cmd"]
+                except (ValueError, KeyError, TypeError):
+                    return 400, {"error": 'expected {"cmd": "..."}'}
+            session = self.get_session(parts[1])
+            if parts[2] == "complete":
+                # Trie lookups take microseconds, so they run on the event loop
+                completions = session.complete(cmd.strip("\r\n"))
+                if "text/plain" in headers.get("accept", ""):
+                    return 200, "\n".join(completions)
+                return 200, {"completions": completions}
+            if parts[2] == "batch":
+                outputs = await session.execute_batch_text(cmd)
+                if "text/plain" in headers.get("accept", ""):
+                    return 200, transcript((cmd, text) for cmd, _, text in outputs)
+                return 200, {"results": [{"cmd": cmd, "type": "text" if result[0] == "streamlit" else result[0],
+                                          "content": text} for cmd, result, text in outputs],
+                             "cwd": session.cwd}
+            result, text = await session.execute_text(cmd.strip("\r\n"))
+            if "text/plain" in headers.get("accept", ""):
+                return 200, text
+            return 200, {"type": "text" if result[0] == "streamlit" else result[0],
+                         "content": text, "cwd": session.cwd}
+        return 404, {"error": "not found"}
+
+    async def _respond(self, writer, status, payload, close=False):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; charset=utf-8"
+        else:
+            body = json.dumps(payload).encode("utf-8")
+            content_type = "application/json"
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve sigterm sessions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    watcher.watch(filesystem)
+    server = TerminalServer(args.host, args.port)
+    print(f"Serving sigterm on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
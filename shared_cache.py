@@ -0,0 +1,142 @@
+"""Host-wide cache shared by all worker processes, backed by SQLite in WAL mode
+
+Workers on the same host open the same database file. WAL mode lets any
+number of readers proceed while one writer commits, and leases make sure only
+one worker at a time refreshes a given key from upstream.
+
+The cache is an optimization only: database errors are counted and treated
+as a miss, so a worker falls back to fetching for itself.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import metrics
+from feed_service import CACHE_DIR
+
+
+# Database file shared by workers (set SIGTERM_SHARED_CACHE=off to disable)
+DEFAULT_PATH = os.environ.get("SIGTERM_SHARED_CACHE", os.path.join(CACHE_DIR, "shared.sqlite3"))
+
+# Seconds a worker may wait for another worker's write lock
+BUSY_TIMEOUT = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL);
+"""
+
+
+class SharedCache:
+    """JSON values and refresh leases stored in a SQLite file
+
+    Args:
+        path: Database file, created on first use
+        clock: Time source, replaceable in tests
+    """
+
+    def __init__(self, path=DEFAULT_PATH, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.owner = f"{os.getpid()}-{id(self)}"
+        self.stats = {"hits": 0, "misses": 0, "errors": 0}
+        self._local = threading.local()
+
+    def _connect(self):
+        """Return this thread's connection, creating the database on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        """Return (value, stored_at) for key, or None if absent"""
+        try:
+            row = self._connect().execute(
+                "SELECT value, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except (OSError, sqlite3.Error):
+            self.stats["errors"] += 1
+            return None
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, stored_at=None):
+        """Store a JSON-serializable value for key"""
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO entries (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), self.clock() if stored_at is None else stored_at),
+            )
+        except (OSError, sqlite3.Error):
+            self.stats["errors"] += 1
+
+    def touch(self, key, stored_at=None):
+        """Mark an existing entry as freshly validated without rewriting its value"""
+        try:
+            self._connect().execute(
+                "UPDATE entries SET stored_at = ? WHERE key = ?",
+                (self.clock() if stored_at is None else stored_at, key),
+            )
+        except (OSError, sqlite3.Error):
+            self.stats["errors"] += 1
+
+    def acquire_lease(self, key, ttl):
+        """Try to become the only worker refreshing key for ttl seconds
+
+        Returns:
+            bool: True if this worker holds the lease (also when the database
+            is unavailable, so the caller fetches for itself)
+        """
+        now = self.clock()
+        try:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute("SELECT owner, expires FROM leases WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[0] != self.owner and row[1] > now:
+                    return False
+                connection.execute(
+                    "INSERT OR REPLACE INTO leases (key, owner, expires) VALUES (?, ?, ?)",
+                    (key, self.owner, now + ttl),
+                )
+                return True
+            finally:
+                connection.execute("COMMIT")
+        except (OSError, sqlite3.Error):
+            self.stats["errors"] += 1
+            return True
+
+    def release_lease(self, key):
+        """Give up a lease held by this worker"""
+        try:
+            self._connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+        except (OSError, sqlite3.Error):
+            self.stats["errors"] += 1
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """Return the process-wide SharedCache, or None when disabled"""
+    global _default
+    if DEFAULT_PATH == "off":
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = SharedCache(DEFAULT_PATH)
+            metrics.register_cache("shared", _default.stats)
+        return _default
@@ -0,0 +1,78 @@
+"""Command line entry point for running the terminal without a browser
+
+Runs commands through one headless engine session, so cd and history carry
+over from one command to the next exactly as they do in the app. Outputs are
+printed as plain text (pages rendered like they are for text clients).
+
+Usage:
+    python sigterm.py run script.sh        Run commands from a file ("-" for stdin)
+    python sigterm.py run -c 'cd blog && ls'
+    python sigterm.py run -x -e --stats smoke.sh
+
+Exits with status 1 if any command failed (see commands.failed), 2 on
+usage or syntax errors.
+"""
+
+import argparse
+import sys
+import time
+
+from commands import failed, run_batch, split_batch
+from engine import Session, render_text
+
+
+def run(args):
+    """Run a script or command list, printing each output as it finishes"""
+    if args.command is not None:
+        script = args.command
+    elif args.script == "-":
+        script = sys.stdin.read()
+    else:
+        try:
+            with open(args.script, "r") as f:
+                script = f.read()
+        except OSError as e:
+            print(f"sigterm: {args.script}: {e.strerror or e}", file=sys.stderr)
+            return 2
+    try:
+        steps = split_batch(script)
+    except ValueError as e:
+        print(f"sigterm: {e}", file=sys.stderr)
+        return 2
+
+    # Scripts replay many commands back to back, so they are not rate limited
+    session = Session(rate_limits=None)
+    errors = count = 0
+    started = time.perf_counter()
+    for cmd, result in run_batch(steps, session.run, errexit=args.errexit):
+        count += 1
+        if args.xtrace:
+            print(f"+ {cmd}", file=sys.stderr)
+        text = render_text(result)
+        if text:
+            print(text)
+        errors += failed(cmd, result)
+    elapsed = time.perf_counter() - started
+
+    if args.stats:
+        rate = count / elapsed if elapsed > 0 else float("inf")
+        print(f"{count} commands ({errors} failed) in {elapsed:.3f}s, {rate:.0f} commands/s", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="sigterm", description="Run sigterm commands from the command line")
+    subcommands = parser.add_subparsers(dest="subcommand", required=True)
+    run_parser = subcommands.add_parser("run", help="run a script of commands in one session")
+    source = run_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("script", nargs="?", help="file with one command list per line, - for stdin")
+    source.add_argument("-c", dest="command", help="run this ;/&&-separated command list instead")
+    run_parser.add_argument("-e", dest="errexit", action="store_true", help="stop at the first failed command")
+    run_parser.add_argument("-x", dest="xtrace", action="store_true", help="print each command to stderr before its output")
+    run_parser.add_argument("--stats", action="store_true", help="print the command count and throughput to stderr")
+    args = parser.parse_args(argv)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Coalesce concurrent identical computations into one"""
+
+import threading
+
+import metrics
+
+
+class _Call:
+    """An in-flight computation and its outcome"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run fn once per key while callers with the same key wait for its result
+
+    Only concurrent calls are shared; once the computation finishes the next
+    call runs fn again (caching is left to the caller).
+
+    Args:
+        name: Label for the cache counters ("hits" are shared calls)
+    """
+
+    def __init__(self, name=None):
+        self.stats = {"hits": 0, "misses": 0}
+        self._calls = {}
+        self._lock = threading.Lock()
+        if name is not None:
+            metrics.register_cache(f"singleflight_{name}", self.stats)
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return fn(*args, **kwargs), sharing the call with concurrent callers of key
+
+        Raises:
+            Exception: Whatever fn raised, in every caller that shared the call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats["hits"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.stats["misses"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
@@ -0,0 +1,274 @@
+"""Persistent snapshot of the parsed site for fast cold starts
+
+One file holds everything a fresh process would otherwise rebuild: the
+pages directory tree (as a VirtualFS manifest), the contents of small text
+files and the last good copy of every feed (the parsed blog posts). It is
+loaded at import with a single read, so a restarted worker answers ls, cat
+and cd blog without scanning pages/ or touching the network.
+
+Layout (little endian):
+
+    magic        8 bytes   b"SIGTSNAP"
+    version      u16       FORMAT_VERSION, bumped when the payload changes
+    marshal      u16       marshal.version the payload was written with
+    checksum     u32       zlib.crc32 of the payload
+    length       u64       payload size in bytes
+    payload      marshal-encoded {"pages_dir", "vfs", "files", "feeds", "created"}
+
+marshal is binary and decodes at C speed; it is only used for files this
+process family writes itself. A snapshot with a different version, a bad
+checksum or from another pages directory is ignored, and everything in it is
+revalidated on use (directory mtimes for the tree, file mtime and size for
+contents), so a stale snapshot costs a rescan, never a wrong answer.
+
+The snapshot is rewritten atomically after every successful feed refresh
+and after prewarm. Set SIGTERM_SNAPSHOT=off to disable it.
+
+Usage:
+    python snapshot.py save
+    python snapshot.py info [path]
+"""
+
+import marshal
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+import content_store
+import feed_service
+import metrics
+from vfs import VirtualFS
+
+
+# Snapshot file (set SIGTERM_SNAPSHOT=off to disable)
+SNAPSHOT_PATH = os.environ.get("SIGTERM_SNAPSHOT", os.path.join(feed_service.CACHE_DIR, "site.snapshot"))
+if SNAPSHOT_PATH.lower() == "off":
+    SNAPSHOT_PATH = None
+
+MAGIC = b"SIGTSNAP"
+
+# Payload format version, bumped when its layout changes
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<8sHHIQ")
+
+_save_lock = threading.Lock()
+
+# Background saves that have been requested but not started: {path: Timer}
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is truncated, corrupt or from another format version"""
+
+
+def encode(state):
+    """Return the snapshot file contents for a state dict
+
+    Raises:
+        ValueError: If state holds values marshal cannot encode
+    """
+    payload = marshal.dumps(state)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, zlib.crc32(payload), len(payload)) + payload
+
+
+def decode(data):
+    """Return the state dict stored in snapshot file contents
+
+    Raises:
+        SnapshotError: If the data is not a valid snapshot of this version
+    """
+    if len(data) < HEADER.size:
+        raise SnapshotError("truncated header")
+    magic, version, marshal_version, checksum, length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not a snapshot file")
+    if version != FORMAT_VERSION or marshal_version != marshal.version:
+        raise SnapshotError(f"unsupported version {version}.{marshal_version}")
+    payload = memoryview(data)[HEADER.size:]
+    if len(payload) != length:
+        raise SnapshotError("truncated payload")
+    if zlib.crc32(payload) != checksum:
+        raise SnapshotError("checksum mismatch")
+    try:
+        state = marshal.loads(payload)
+    except (EOFError, ValueError, TypeError) as e:
+        raise SnapshotError(str(e))
+    if not isinstance(state, dict):
+        raise SnapshotError("unexpected payload")
+    return state
+
+
+def read(path, pages_dir=None):
+    """Load a snapshot, returning None if it is missing, invalid or for another pages_dir"""
+    try:
+        with metrics.timed("snapshot", "load"), open(path, "rb") as f:
+            state = decode(f.read())
+    except (OSError, SnapshotError):
+        return None
+    if pages_dir is not None and state.get("pages_dir") != os.path.abspath(pages_dir):
+        return None
+    return state
+
+
+def write(path, state):
+    """Atomically replace the snapshot at path
+
+    Raises:
+        OSError: If the file cannot be written
+        ValueError: If state holds values marshal cannot encode
+    """
+    data = encode(state)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def capture(fs, store=None):
+    """Return the state to snapshot for a filesystem, its text files and all feeds
+
+    Only the pages directory part of the tree is recorded (mounted sources
+    are re-mounted at startup anyway). Feeds whose data marshal cannot encode
+    are left out.
+    """
+    store = content_store.store if store is None else store
+    files = {}
+    for node in list(fs.index.values()):
+        if node.kind != "file" or node.source is not fs.source or node.path in files:
+            continue
+        try:
+            st = os.stat(node.path)
+            if st.st_size > store.mmap_threshold:
+                continue
+            content_type, text = store.read(node.path)
+        except OSError:
+            continue
+        # Recorded before the read, so an edit in between fails revalidation
+        files[node.path] = (st.st_mtime_ns, st.st_size, content_type, text)
+
+    feeds = {name: seeded for name, seeded in feed_service._seeds.items()}
+    for name, feed in list(feed_service._feeds.items()):
+        if feed.data is not None:
+            feeds[name] = (feed.fetched_at, feed.data)
+    for name, (_, data) in list(feeds.items()):
+        try:
+            marshal.dumps(data)
+        except ValueError:
+            del feeds[name]
+
+    return {
+        "pages_dir": os.path.abspath(fs.pages_dir),
+        "vfs": fs.manifest(),
+        "files": files,
+        "feeds": feeds,
+        "created": time.time(),
+    }
+
+
+def save(fs, path=None, store=None):
+    """Capture and write a snapshot, returning False if it could not be written"""
+    path = SNAPSHOT_PATH if path is None else path
+    if path is None or fs.pages_dir is None:
+        return False
+    with _save_lock, metrics.timed("snapshot", "save"):
+        try:
+            write(path, capture(fs, store))
+        except (OSError, ValueError):
+            return False
+    return True
+
+
+def restore(state, store=None):
+    """Seed the content store and feeds from a loaded snapshot"""
+    store = content_store.store if store is None else store
+    for path, (mtime_ns, size, content_type, text) in state["files"].items():
+        store.preload(path, mtime_ns, size, content_type, text)
+    for name, (fetched_at, data) in state["feeds"].items():
+        feed_service.seed(name, data, fetched_at)
+
+
+def load_site(pages_dir, manifest_path=None, path=None):
+    """Return the VirtualFS for pages_dir, starting from the snapshot when it is current
+
+    Falls back to the frozen manifest or a scan when there is no usable
+    snapshot. Also arranges for the snapshot to be rewritten in the background
+    whenever a feed refreshes.
+    """
+    path = SNAPSHOT_PATH if path is None else path
+    state = read(path, pages_dir) if path is not None else None
+    fs = VirtualFS(pages_dir, manifest_path, manifest=state["vfs"] if state is not None else None)
+    if state is not None:
+        restore(state)
+    if path is not None:
+        feed_service.listeners.append(lambda feed: save_in_background(fs, path))
+    return fs
+
+
+def save_in_background(fs, path=None, delay=0.0):
+    """Write a snapshot from a daemon thread after delay seconds
+
+    Requests made while a save is still pending are folded into it, so a
+    burst of changes costs one capture and one write.
+    """
+    path = SNAPSHOT_PATH if path is None else path
+    if path is None:
+        return
+    with _pending_lock:
+        if path in _pending:
+            return
+        timer = threading.Timer(delay, _save_pending, args=(fs, path))
+        timer.name = "snapshot-save"
+        timer.daemon = True
+        _pending[path] = timer
+    timer.start()
+
+
+def _save_pending(fs, path):
+    # Unregistered before capturing, so a change made during the save schedules another
+    with _pending_lock:
+        _pending.pop(path, None)
+    save(fs, path)
+
+
+def main(argv):
+    """python snapshot.py save | info [path]"""
+    command = argv[1] if len(argv) > 1 else None
+    path = argv[2] if len(argv) > 2 else SNAPSHOT_PATH
+    if command == "save" and path is not None:
+        from prewarm import prewarm
+
+        if not prewarm(snapshot_path=path)["snapshot"]:
+            print(f"could not write snapshot {path}", file=sys.stderr)
+            return 1
+        print(f"Saved snapshot to {path}")
+        return 0
+    if command == "info" and path is not None:
+        try:
+            with open(path, "rb") as f:
+                state = decode(f.read())
+        except (OSError, SnapshotError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 1
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(state["created"]))
+        print(f"{path}: written {created} for {state['pages_dir']}")
+        print(f"{len(state['vfs']['entries'])} entries, {len(state['files'])} files, "
+              f"feeds: {', '.join(sorted(state['feeds'])) or 'none'}")
+        return 0
+    print(main.__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
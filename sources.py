@@ -0,0 +1,302 @@
+"""Page sources: where the entries of the terminal tree and their contents come from
+
+A source lists its entries when it is mounted into the VirtualFS (feed
+sources again whenever their feed stores a new copy), and reads contents back
+on demand by the location it reported for each entry.
+
+    DirectorySource   a directory on disk (pages/ is mounted at home)
+    ArchiveSource     a read-only .zip or .tar bundle, members read lazily
+    FeedSource        text files generated from a feed's cached data (feed:NAME)
+"""
+
+import itertools
+import os
+import re
+import tarfile
+import threading
+import zipfile
+from functools import lru_cache
+
+import content_store
+import feed_service
+from content_store import content_type_for, PAGE_LINES
+from page_loader import load_page_module
+
+
+# .py files are directories (accessible via cd)
+PAGE_EXTENSIONS = (".py",)
+
+# .txt and .md files are text files (readable via cat)
+TEXT_EXTENSIONS = (".txt", ".md")
+
+# Archive file name suffixes recognised by open_source
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+# open_source prefix naming a feed, e.g. feed:blog
+FEED_PREFIX = "feed:"
+
+# Decoded archive members kept in memory per source
+ARCHIVE_CACHE_ENTRIES = 256
+
+
+def classify(name):
+    """Return the kind ("page" or "file") of a file name, None if it is not shown"""
+    ext = os.path.splitext(name)[1]
+    if ext in PAGE_EXTENSIONS:
+        return "page"
+    if ext in TEXT_EXTENSIONS:
+        return "file"
+    return None
+
+
+def visible(name):
+    """Names starting with . or _ are hidden from the tree"""
+    return not name.startswith((".", "_"))
+
+
+def scan_paths(paths):
+    """Yield scan() entries for "/"-separated file paths, deriving their directories"""
+    seen_dirs = set()
+    for path in sorted(paths):
+        parts = path.strip("/").split("/")
+        if not all(visible(part) for part in parts) or classify(parts[-1]) != "file":
+            continue
+        for depth in range(len(parts) - 1):
+            directory = "/".join(parts[:depth + 1])
+            if directory not in seen_dirs:
+                seen_dirs.add(directory)
+                yield "/".join(parts[:depth]), parts[depth], "dir", directory
+        yield "/".join(parts[:-1]), parts[-1], "file", path
+
+
+class PageSource:
+    """Base class for sources; subclasses implement scan() and read()
+
+    The line-oriented methods have generic implementations on top of read();
+    sources backed by real files override them with lazier versions.
+    """
+
+    def scan(self):
+        """Yield (parent, name, kind, location) for every visible entry
+
+        parent is the "/"-separated path of the containing directory relative
+        to the source ("" at the top), name is the entry's file name and kind
+        is "dir", "page" or "file". Directories come before their contents.
+        """
+        raise NotImplementedError
+
+    def read(self, location):
+        """Return (content_type, text) for a file entry
+
+        Raises:
+            OSError: If the entry cannot be read
+        """
+        raise NotImplementedError
+
+    def is_large(self, location):
+        """Return True if the entry should be shown a page at a time"""
+        return False
+
+    def iter_lines(self, location):
+        """Yield a file entry's lines without line endings"""
+        yield from self.read(location)[1].splitlines()
+
+    def read_lines(self, location, offset=0, limit=PAGE_LINES):
+        """Return (text, next_offset) for a page of lines, next_offset None at the end"""
+        lines = list(itertools.islice(self.iter_lines(location), offset, offset + limit + 1))
+        next_offset = offset + limit if len(lines) > limit else None
+        return "\n".join(lines[:limit]), next_offset
+
+    def load_module(self, location, name):
+        """Return the module of a page entry
+
+        Raises:
+            LookupError: If this source cannot run pages
+        """
+        raise LookupError(f"{name}: pages are not supported by {type(self).__name__}")
+
+
+class DirectorySource(PageSource):
+    """Entries of a directory on disk, read through the shared content store
+
+    Args:
+        root: Directory to list
+        store: ContentStore used for reads (the process-wide store when None)
+    """
+
+    def __init__(self, root, store=None):
+        self.root = root
+        self._store = store
+
+    @property
+    def store(self):
+        if self._store is not None:
+            return self._store
+        return content_store.store
+
+    def scan(self, directory=None, parent=""):
+        directory = self.root if directory is None else directory
+        with os.scandir(directory) as entries:
+            entries = sorted(entries, key=lambda e: e.name)
+        for entry in entries:
+            if not visible(entry.name):
+                continue
+            if entry.is_dir():
+                yield parent, entry.name, "dir", entry.path
+                yield from self.scan(entry.path, f"{parent}/{entry.name}" if parent else entry.name)
+            else:
+                kind = classify(entry.name)
+                if kind is not None:
+                    yield parent, entry.name, kind, entry.path
+
+    def read(self, location):
+        return self.store.read(location)
+
+    def is_large(self, location):
+        return self.store.is_large(location)
+
+    def iter_lines(self, location):
+        return self.store.iter_lines(location)
+
+    def read_lines(self, location, offset=0, limit=PAGE_LINES):
+        return self.store.read_lines(location, offset, limit)
+
+    def load_module(self, location, name):
+        stem = os.path.splitext(os.path.basename(location))[0]
+        return load_page_module(stem, os.path.dirname(location))
+
+
+class ArchiveSource(PageSource):
+    """Text entries of a .zip or .tar bundle, read by member without extracting
+
+    Opening a zip reads only its central directory, so a bundle of thousands
+    of pages mounts with one file open instead of a stat per page. Compressed
+    tarballs must be decompressed up to each member, so zip (or plain tar) is
+    preferred for large bundles. Python pages inside archives are not run.
+
+    Args:
+        path: Archive file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._archive = None
+        self._lock = threading.Lock()
+        self._read_member = lru_cache(maxsize=ARCHIVE_CACHE_ENTRIES)(self._read_uncached)
+
+    def _open(self):
+        if self._archive is None:
+            if self.path.endswith(".zip"):
+                self._archive = zipfile.ZipFile(self.path)
+            else:
+                self._archive = tarfile.open(self.path)
+        return self._archive
+
+    def _members(self):
+        """Return {name: member} for the regular files in the archive"""
+        archive = self._open()
+        if hasattr(archive, "infolist"):
+            return {info.filename: info for info in archive.infolist() if not info.is_dir()}
+        return {member.name: member for member in archive.getmembers() if member.isfile()}
+
+    def scan(self):
+        with self._lock:
+            members = self._members()
+        return scan_paths(members)
+
+    def _read_uncached(self, location):
+        with self._lock:
+            archive = self._open()
+            if hasattr(archive, "read"):
+                try:
+                    data = archive.read(location)
+                except KeyError:
+                    raise FileNotFoundError(location)
+            else:
+                try:
+                    data = archive.extractfile(location).read()
+                except (KeyError, AttributeError):
+                    raise FileNotFoundError(location)
+        return data.decode("utf-8", errors="replace")
+
+    def read(self, location):
+        return content_type_for(location), self._read_member(location)
+
+
+def post_files(posts):
+    """Render a list of posts ({"title", "url", "tags"}) as one markdown file each
+
+    Returns:
+        dict: {"<title-slug>.md": text}; data that is not a list of posts gives {}
+    """
+    files = {}
+    if not isinstance(posts, list):
+        return files
+    for post in posts:
+        if not isinstance(post, dict) or not post.get("title"):
+            continue
+        slug = "-".join(re.findall(r"[a-z0-9]+", post["title"].lower())) or "post"
+        name = f"{slug}.md"
+        for number in itertools.count(2):
+            if name not in files:
+                break
+            name = f"{slug}-{number}.md"
+        lines = [f"# {post['title']}"]
+        if post.get("url"):
+            lines += ["", post["url"]]
+        if post.get("tags"):
+            lines += ["", "Tags: " + ", ".join(post["tags"])]
+        files[name] = "\n".join(lines)
+    return files
+
+
+class FeedSource(PageSource):
+    """Text files generated from the cached copy of a remote feed
+
+    Scanning never fetches: the files reflect the feed's last good copy (see
+    feed_service.cached), and whoever mounts the source rescans it when the
+    feed refreshes.
+
+    Args:
+        name: Name of the feed (as passed to feed_service.get_feed)
+        render: Function mapping feed data to {relative path: text}, e.g.
+            {"2024/post-title.md": "..."}; called once per fetched copy
+    """
+
+    def __init__(self, name, render=post_files):
+        self.name = name
+        self.render = render
+        self._files = (None, {})
+        self._lock = threading.Lock()
+
+    def files(self):
+        """Return the rendered files for the feed's current data"""
+        data = feed_service.cached(self.name)
+        with self._lock:
+            if self._files[0] is not data:
+                self._files = (data, self.render(data) if data is not None else {})
+            return self._files[1]
+
+    def scan(self):
+        return scan_paths(self.files())
+
+    def read(self, location):
+        text = self.files().get(location)
+        if text is None:
+            raise FileNotFoundError(location)
+        return content_type_for(location), text
+
+
+def open_source(path):
+    """Return the source for a directory, an archive path or feed:NAME
+
+    Raises:
+        ValueError: If path is neither a directory, a supported archive nor a feed
+    """
+    if path.startswith(FEED_PREFIX):
+        return FeedSource(path[len(FEED_PREFIX):])
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    if path.endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path):
+        return ArchiveSource(path)
+    raise ValueError(f"{path}: not a directory, .zip/.tar archive or feed:NAME")
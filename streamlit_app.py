@@ -1,14 +1,56 @@
+import concurrent.futures
+import os
+import threading
+import time
+import uuid
 import streamlit as st
-from commands import process_command
+import metrics
+import page_runner
+import prewarm
+import watcher
+from commands import filesystem, process_command, check_batch_rate, check_rate, run_batch, split_batch
+from history import History
+from ratelimit import RateLimiter, RATE_LIMITS
+from render_cache import render_cache
+from workload import recorder
 
 st.set_page_config(page_title="Sigterm", layout="wide")
 
+
+@st.cache_resource
+def metrics_server(port):
+    """Start the /metrics endpoint once per process"""
+    return metrics.start_metrics_server(port)
+
+
+@st.cache_resource
+def prewarm_caches():
+    """Warm pages, files and feeds once per process without blocking the first render"""
+    thread = threading.Thread(target=prewarm.prewarm, name="sigterm-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def watch_pages():
+    """Pick up pages added, edited or removed on disk once per process"""
+    return watcher.watch(filesystem)
+
+
+prewarm_caches()
+watch_pages()
+
+if os.environ.get("SIGTERM_METRICS_PORT"):
+    metrics_server(int(os.environ["SIGTERM_METRICS_PORT"]))
+
 st.markdown("""
 <style>
     .main { background-color: #000000; color: #00FF00; }
     input { background-color: #0a0a0a !important; color: #00FF00 !important;
             border: 1px solid #00FF00 !important; font-family: 'Courier New', monospace !important; }
     .stCode { background-color: #0a0a0a !important; border: 1px solid #00FF00 !important; }
+    .terminal-output { background-color: #0a0a0a; border: 1px solid #00FF00; color: #00FF00;
+                       padding: 1em; font-family: 'Courier New', monospace; white-space: pre; overflow-x: auto; }
     #MainMenu { visibility: hidden; }
     footer { visibility: hidden; }
     [data-testid="stSidebar"] { display: none; }
@@ -19,41 +61,130 @@ st.markdown("""
 <h1><a href="?" target="_self" class="title-link">$ Sigterm</a></h1>
 """, unsafe_allow_html=True)
 
-if "commands" not in st.session_state:
-    st.session_state.commands = []
-    st.session_state.outputs = []
+if "history" not in st.session_state:
+    st.session_state.history = History()
     st.session_state.current_dir = "~"
+    st.session_state.limiter = RateLimiter(RATE_LIMITS) if RATE_LIMITS is not None else None
+    # Entries produced by the last submission (several for a command list or script)
+    st.session_state.batch_size = 1
+    # Identifies this browser session in the command log (SIGTERM_RECORD)
+    st.session_state.session_id = uuid.uuid4().hex
+
+def draw_body(st, future):
+    """Draw a finished page body"""
+    try:
+        draw = future.result()
+        if draw is not None:
+            draw(st)
+    except Exception as e:
+        st.error(f"Error rendering page: {str(e)}")
+
+
+def draw_when_ready(future, entry):
+    """Draw a page body now if it is ready, else poll for it without blocking the prompt"""
+    concurrent.futures.wait([future], timeout=page_runner.INLINE_WAIT)
+    if future.done():
+        draw_body(st, future)
+        return
+
+    # The deadline is kept per history entry so reruns share one budget
+    started = st.session_state.setdefault("render_started", {}).setdefault(id(entry), time.monotonic())
+
+    @st.fragment(run_every=0.5)
+    def poll():
+        if future.done():
+            st.session_state.render_started.pop(id(entry), None)
+            st.rerun()
+        elif time.monotonic() - started > page_runner.RENDER_TIMEOUT:
+            st.warning("Page timed out, please try again")
+        else:
+            st.caption("Loading…")
+
+    poll()
+
+
+def draw_entry(entry):
+    """Draw one history entry: its prompt line and output"""
+    st.markdown(f"<span class='terminal-prompt'>$ {entry.cmd}</span>", unsafe_allow_html=True)
+
+    with metrics.timed("render", entry.type):
+        if entry.type in ("text", "markdown"):
+            # Pre-rendered once per distinct output; reruns only look it up
+            html = render_cache.render_entry(entry)
+            if html is not None:
+                st.html(html)
+            elif entry.type == "text":
+                st.code(entry.content, language="bash")
+            else:
+                st.markdown(entry.content)
+        elif entry.type == "streamlit":
+            with st.container():
+                try:
+                    body = entry.content(st)
+                except Exception as e:
+                    st.error(f"Error rendering page: {str(e)}")
+                    body = None
+                if page_runner.is_pending(body):
+                    draw_when_ready(page_runner.as_future(body), entry)
+
+
+# Display only the last submission's commands and output
+for entry in list(st.session_state.history)[-st.session_state.batch_size:]:
+    draw_entry(entry)
 
-# Display only the last command and output
-if st.session_state.commands and st.session_state.outputs:
-    cmd = st.session_state.commands[-1]
-    output_data = st.session_state.outputs[-1]
 
-    st.markdown(f"<span class='terminal-prompt'>$ {cmd}</span>", unsafe_allow_html=True)
+def run_command(cmd, charge=True):
+    """Run one command line against the session state and record it in the history"""
+    if cmd == "clear":
+        st.session_state.history.clear()
+        return ("text", "", None)
+    started = time.perf_counter()
+    limiter = st.session_state.limiter
+    result = check_rate(limiter, cmd, st.session_state.current_dir) if charge and limiter is not None else None
+    if result is None:
+        result = process_command(cmd, st.session_state.current_dir)
+    if recorder is not None:
+        recorder.record(st.session_state.session_id, cmd, st.session_state.current_dir,
+                        time.perf_counter() - started)
+    content_type, content, new_dir = result
+    st.session_state.history.append(cmd, content_type, content)
+    # Update directory if changed
+    if new_dir is not None:
+        st.session_state.current_dir = new_dir
+    return result
+
+
+def run_script(script):
+    """Run a ;/&&-separated command list or script in one rerun"""
+    try:
+        steps = split_batch(script)
+    except ValueError as e:
+        st.session_state.history.append(script, "text", str(e))
+        st.session_state.batch_size = 1
+        return
+    # The whole submission is charged once, then its commands run uncharged
+    limiter = st.session_state.limiter
+    limited = check_batch_rate(limiter, steps, st.session_state.current_dir) if limiter is not None and steps else None
+    if limited is not None:
+        st.session_state.history.append(script, *limited[:2])
+        st.session_state.batch_size = 1
+        return
+    ran = sum(1 for cmd, result in run_batch(steps, lambda cmd: run_command(cmd, charge=False)) if cmd != "clear")
+    st.session_state.batch_size = max(1, min(ran, len(st.session_state.history)))
 
-    if output_data["type"] == "text":
-        st.code(output_data["content"], language="bash")
-    elif output_data["type"] == "markdown":
-        st.markdown(output_data["content"])
-    elif output_data["type"] == "streamlit":
-        with st.container():
-            try:
-                output_data["content"](st)
-            except Exception as e:
-                st.error(f"Error rendering page: {str(e)}")
 
 def submit_command():
     if st.session_state.input:
-        if st.session_state.input == "clear":
-            st.session_state.commands = []
-            st.session_state.outputs = []
-        else:
-            st.session_state.commands.append(st.session_state.input)
-            content_type, content, new_dir = process_command(st.session_state.input, st.session_state.current_dir)
-            st.session_state.outputs.append({"type": content_type, "content": content})
-            # Update directory if changed
-            if new_dir is not None:
-                st.session_state.current_dir = new_dir
+        run_script(st.session_state.input)
         st.session_state.input = ""
 
+
+def submit_script():
+    if st.session_state.script is not None:
+        run_script(st.session_state.script.getvalue().decode("utf-8", errors="replace"))
+
+
 st.text_input("$ ", key="input", placeholder="Type command (e.g. help)...", on_change=submit_command)
+
+with st.expander("Run a script"):
+    st.file_uploader("Commands, one per line", type=["sh", "txt"], key="script", on_change=submit_script)
@@ -1,9 +1,31 @@
 """Shared test fixtures and configuration"""
+import atexit
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
+# Tests must not read or write the site snapshot, shared cache or feed
+# snapshots of a real run
+os.environ.setdefault("SIGTERM_SNAPSHOT", "off")
+os.environ.setdefault("SIGTERM_SHARED_CACHE", "off")
+if "SIGTERM_CACHE_DIR" not in os.environ:
+    os.environ["SIGTERM_CACHE_DIR"] = tempfile.mkdtemp(prefix="sigterm-tests-")
+    atexit.register(shutil.rmtree, os.environ["SIGTERM_CACHE_DIR"], ignore_errors=True)
+
 # Add parent directory to path so we can import commands
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pytest
 from commands import process_command
+
+
+@pytest.fixture
+def offline_blog(monkeypatch):
+    """Serve fixed posts from the blog page so rendering it never touches the network"""
+    from page_loader import load_page_module
+
+    posts = [{"title": "Offline post", "url": "https://example.com/offline", "tags": ["test"]}]
+    monkeypatch.setattr(load_page_module("blog"), "fetch_blog_posts", lambda: posts)
+    return posts
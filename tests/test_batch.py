@@ -0,0 +1,137 @@
+"""Tests for running command lists and scripts in one pass"""
+import asyncio
+import json
+import pytest
+import sigterm
+from commands import failed, run_batch, split_batch
+from engine import Session, transcript
+from ratelimit import DEFAULT_RATE_LIMITS
+from server import TerminalServer
+from test_server import request
+
+
+class TestSplitBatch:
+    """Tests for parsing ; and && command lists"""
+
+    def test_separators_and_conditions(self):
+        """Test ; and && split a line and && marks the next command conditional"""
+        assert split_batch("ls; cd blog && ls;pwd") == [
+            ("ls", None), ("cd blog", None), ("ls", "&&"), ("pwd", None),
+        ]
+
+    def test_script_lines_and_comments(self):
+        """Test scripts split on lines and skip comments and blank lines"""
+        script = "#!/usr/bin/env sigterm\n# smoke test\n\nwhoami\n  cat about | head -1 ;\n"
+        assert split_batch(script) == [("whoami", None), ("cat about | head -1", None)]
+
+    def test_dangling_and(self):
+        """Test && without a command on both sides is a syntax error"""
+        for script in ("ls &&", "&& ls", "ls && ; pwd"):
+            with pytest.raises(ValueError):
+                split_batch(script)
+
+    def test_empty_commands_between_semicolons_are_skipped(self):
+        """Test empty commands between semicolons are dropped"""
+        assert split_batch("ls;; pwd;") == [("ls", None), ("pwd", None)]
+
+
+class TestRunBatch:
+    """Tests for && short-circuiting and failure detection"""
+
+    def test_failed(self):
+        """Test failures are told apart from output that only looks like an error"""
+        assert failed("cat nope", ("text", "cat: nope: No such file or directory", None))
+        assert failed("foo", ("text", "command not found: foo", None))
+        assert failed("ls | head -x", ("text", "head: invalid number of lines: '-x'", None))
+        assert not failed("echo cat: hi", ("text", "cat: hi", None))
+        assert not failed("pwd", ("text", "/home", None))
+
+    def test_and_skips_after_failure(self):
+        """Test a failure skips the rest of its && chain only"""
+        ran = [cmd for cmd, _ in run_batch(split_batch("cd nope && pwd && ls; whoami"), Session().run)]
+        assert ran == ["cd nope", "whoami"]
+
+    def test_errexit_stops_at_first_failure(self):
+        """Test errexit stops the batch at the first failure"""
+        ran = [cmd for cmd, _ in run_batch(split_batch("pwd; cat nope; whoami"), Session().run, errexit=True)]
+        assert ran == ["pwd", "cat nope"]
+
+
+class TestSessionBatch:
+    """Tests for batches sharing one session"""
+
+    def test_directory_and_history_carry_over(self):
+        """Test commands of a batch share the session's directory and history"""
+        session = Session(rate_limits=None)
+        results = session.run_batch("cd blog && pwd; cd ..")
+        assert [result[1] for _, result in results][1] == "/home/blog"
+        assert session.cwd == "~"
+        assert [entry.cmd for entry in session.history] == ["cd blog", "pwd", "cd .."]
+
+    def test_syntax_error_is_one_result(self):
+        """Test a batch that does not parse gives a single error result"""
+        assert Session().run_batch("ls &&") == [("ls &&", ("text", "syntax error near unexpected token `&&'", None))]
+
+    def test_batch_longer_than_burst_runs(self):
+        """Test a batch with more commands than any bucket holds runs to the end"""
+        session = Session(rate_limits=DEFAULT_RATE_LIMITS)
+        results = session.run_batch("; ".join(["ls"] * 15 + ["pwd"] * 25 + ["cd blog", "cd .."] * 4))
+        assert len(results) == 48
+        assert not any(failed(cmd, result) for cmd, result in results)
+
+    def test_batch_charged_once(self):
+        """Test a batch takes one token per class and is refused whole when a bucket is empty"""
+        session = Session(rate_limits={"default": (0.0, 1)})
+        assert len(session.run_batch("pwd; pwd; pwd")) == 3
+        [(cmd, result)] = session.run_batch("pwd; whoami")
+        assert cmd == "pwd; whoami"
+        assert result[1].startswith("rate limited")
+        assert len(session.history) == 3
+
+    def test_transcript(self):
+        """Test a transcript shows each command after a prompt"""
+        assert transcript([("pwd", "/home"), ("clear", "")]) == "$ pwd\n/home\n$ clear"
+
+
+class TestServerBatch:
+    """Tests for POST /sessions/<id>/batch"""
+
+    def test_batch_json_and_text(self, offline_blog):
+        """Test the batch endpoint answers in JSON or as a text transcript"""
+        async def run():
+            server = await TerminalServer(port=0).start()
+            try:
+                status, _, body = await request(server.port, "POST", "/sessions/b/batch", b"cd blog; pwd")
+                assert status == 200
+                payload = json.loads(body)
+                assert payload["cwd"] == "blog"
+                assert payload["results"][1] == {"cmd": "pwd", "type": "text", "content": "/home/blog"}
+                _, _, body = await request(server.port, "POST", "/sessions/b/batch", b"cd ..\nwhoami",
+                                           {"Accept": "text/plain"})
+                assert body.decode() == "$ cd ..\nabout.txt\nblog/\n$ whoami\nuser@sigterm"
+            finally:
+                await server.close()
+        asyncio.run(run())
+
+
+class TestCli:
+    """Tests for python sigterm.py run"""
+
+    def test_run_script(self, tmp_path, capsys):
+        """Test running a script file"""
+        script = tmp_path / "smoke.sh"
+        script.write_text("whoami\ncat about | head -1 && echo done\n")
+        assert sigterm.main(["run", str(script)]) == 0
+        out = capsys.readouterr().out.splitlines()
+        assert out[0] == "user@sigterm" and out[-1] == "done"
+
+    def test_failures_set_exit_status(self, capsys):
+        """Test a failing command sets the exit status and is traced"""
+        assert sigterm.main(["run", "-x", "--stats", "-c", "cat nope; pwd"]) == 1
+        err = capsys.readouterr().err
+        assert "+ cat nope" in err and "2 commands (1 failed)" in err
+
+    def test_syntax_error(self, capsys):
+        """Test a script that does not parse exits with status 2"""
+        assert sigterm.main(["run", "-c", "&& ls"]) == 2
+        assert "syntax error" in capsys.readouterr().err
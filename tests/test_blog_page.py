@@ -0,0 +1,125 @@
+"""Tests for the paginated blog page"""
+import pytest
+
+pytest.importorskip("bs4")
+
+import functools
+from page_loader import load_page
+from page_runner import render_page
+
+
+class FakeStreamlit:
+    """Records the Streamlit calls made by a page's render function"""
+
+    def __init__(self):
+        self.session_state = {}
+        self.calls = []
+        self.buttons = []
+
+    def markdown(self, body):
+        self.calls.append(("markdown", body))
+
+    def divider(self):
+        self.calls.append(("divider", None))
+
+    def caption(self, body):
+        self.calls.append(("caption", body))
+
+    def warning(self, body):
+        self.calls.append(("warning", body))
+
+    def spinner(self, text):
+        import contextlib
+        return contextlib.nullcontext()
+
+    def button(self, label, key=None, on_click=None):
+        self.buttons.append(on_click)
+        return False
+
+
+@pytest.fixture
+def blog(monkeypatch):
+    """The blog page module serving 45 synthetic posts"""
+    render = load_page("blog")[1]
+    module = render.__globals__
+    posts = [{"title": f"Post {i}", "url": f"https://example.com/{i}", "tags": ["t"]} for i in range(45)]
+    monkeypatch.setitem(module, "fetch_blog_posts", lambda: posts)
+    # Draw deferred bodies synchronously, as text clients do
+    return functools.partial(render_page, render)
+
+
+def rendered_posts(st):
+    """Return the single markdown block listing posts"""
+    blocks = [body for kind, body in st.calls if kind == "markdown" and body.startswith("**[")]
+    assert len(blocks) == 1
+    return blocks[0]
+
+
+class TestDeferredRender:
+    """Tests for drawing the posts after a cold fetch"""
+
+    def test_cold_feed_returns_pending_body(self, monkeypatch):
+        """Test a cold feed draws the header and defers the posts"""
+        render = load_page("blog")[1]
+        module = render.__globals__
+        monkeypatch.setattr(module["feed"], "data", None)
+        monkeypatch.setitem(module, "fetch_blog_posts", lambda: [{"title": "Late", "url": "u", "tags": []}])
+        st = FakeStreamlit()
+        pending = render(st)
+        assert [kind for kind, _ in st.calls] == ["markdown", "markdown", "divider"]
+        pending.result(timeout=5)(st)
+        assert rendered_posts(st) == "**[Late](u)**"
+
+    def test_warm_feed_draws_inline(self, monkeypatch):
+        """Test a warm feed draws the posts without deferring"""
+        render = load_page("blog")[1]
+        module = render.__globals__
+        monkeypatch.setattr(module["feed"], "data", [])
+        monkeypatch.setitem(module, "fetch_blog_posts", lambda: [{"title": "Now", "url": "u", "tags": []}])
+        st = FakeStreamlit()
+        assert render(st) is None
+        assert rendered_posts(st) == "**[Now](u)**"
+
+
+class TestBlogPagination:
+    """Tests for paginated and batched rendering"""
+
+    def test_first_page(self, blog):
+        """Test the default render shows one page in a single markdown block"""
+        st = FakeStreamlit()
+        blog(st)
+        block = rendered_posts(st)
+        assert block.count("**[Post") == 20
+        assert "Post 0" in block and "Post 20]" not in block
+        assert len(st.buttons) == 1
+
+    def test_page_and_limit(self, blog):
+        """Test --page and --limit select the posts shown"""
+        st = FakeStreamlit()
+        blog(st, page=3, limit=10)
+        block = rendered_posts(st)
+        assert block.startswith("**[Post 20]")
+        assert block.count("**[Post") == 10
+
+    def test_last_page_has_no_load_more(self, blog):
+        """Test the final page does not offer more posts"""
+        st = FakeStreamlit()
+        blog(st, page=5, limit=10)
+        assert rendered_posts(st).count("**[Post") == 5
+        assert st.buttons == []
+
+    def test_load_more_extends_page(self, blog):
+        """Test clicking load more renders another batch on the next run"""
+        st = FakeStreamlit()
+        blog(st, limit=10)
+        st.buttons[0]()
+        st.calls = []
+        blog(st, limit=10)
+        assert rendered_posts(st).count("**[Post") == 20
+
+    def test_no_posts_warning(self, blog, monkeypatch):
+        """Test a warning is shown when the feed is unavailable"""
+        monkeypatch.setitem(blog.args[0].__globals__, "fetch_blog_posts", lambda: None)
+        st = FakeStreamlit()
+        blog(st)
+        assert st.calls[-1][0] == "warning"
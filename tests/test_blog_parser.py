@@ -0,0 +1,72 @@
+"""Tests for the blog listing parser backends"""
+import pytest
+from blog_parser import available_backends, default_backend, parse_posts
+
+
+LISTING = """
+<html><body>
+<div class="quarto-listing">
+  <div class="quarto-post image-right" data-index="0">
+    <div class="metadata">
+      <h3 class="no-anchor listing-title"><a href="./posts/bayes.html">Bayesian <em>regression</em></a></h3>
+      <div class="listing-categories">
+        <div class="listing-category">bayes</div>
+        <div class="listing-category"> regression </div>
+      </div>
+    </div>
+  </div>
+  <div class="quarto-post">
+    <h3 class="listing-title"><a href="/other/ols.html">OLS &amp; friends</a></h3>
+  </div>
+  <div class="quarto-post">
+    <h3 class="listing-title">No link here</h3>
+  </div>
+  <div class="quarto-post">
+    <p>No title</p>
+  </div>
+  <div class="quarto-post">
+    <h3 class="listing-title"><a>Missing href</a></h3>
+    <div class="listing-categories"></div>
+  </div>
+</div>
+</body></html>
+"""
+
+EXPECTED = [
+    {
+        "title": "Bayesianregression",
+        "url": "https://example.com/site/posts/bayes.html",
+        "tags": ["bayes", "regression"],
+    },
+    {"title": "OLS & friends", "url": "https://example.com/other/ols.html", "tags": []},
+    {"title": "Missing href", "url": "#", "tags": []},
+]
+
+
+class TestBlogParser:
+    """Tests that every installed backend extracts the same posts"""
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_backend_matches_reference(self, backend):
+        """Test each backend extracts titles, absolute urls and tags"""
+        assert parse_posts(LISTING, base_url="https://example.com/site/", backend=backend) == EXPECTED
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_backend_accepts_bytes(self, backend):
+        """Test each backend accepts raw response bytes"""
+        posts = parse_posts(LISTING.encode(), base_url="https://example.com/site/", backend=backend)
+        assert posts == EXPECTED
+
+    def test_stream_backend_always_available(self):
+        """Test the standard library fallback is always installed"""
+        assert "stream" in available_backends()
+        assert default_backend() in available_backends()
+
+    def test_stream_chunk_boundaries(self, monkeypatch):
+        """Test posts split across feed() chunks are still extracted"""
+        monkeypatch.setattr("blog_parser.STREAM_CHUNK_SIZE", 7)
+        assert parse_posts(LISTING, base_url="https://example.com/site/", backend="stream") == EXPECTED
+
+    def test_empty_listing(self):
+        """Test a page without posts yields an empty list"""
+        assert parse_posts("<html></html>", backend="stream") == []
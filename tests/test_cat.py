@@ -42,3 +42,21 @@ class TestCatCommand:
         assert "Is a directory" in result_content
         assert "cd blog" in result_content
 
+    def test_cat_with_limit(self):
+        """Test cat --limit shows the first lines and a hint for more"""
+        result_type, result_content, new_dir = process_command("cat about.txt --limit 2")
+        assert result_type == "text"
+        lines = result_content.split("\n")
+        assert len(lines) == 3
+        assert "cat about.txt --offset 2" in lines[-1]
+
+    def test_cat_rejects_zero_limit(self):
+        """Test cat --limit 0 is an error rather than an empty page pointing at itself"""
+        result_type, result_content, new_dir = process_command("cat about.txt --limit 0")
+        assert result_content == "cat: option --limit requires a positive number"
+
+    def test_cat_invalid_option(self):
+        """Test cat with a non-numeric option value returns an error"""
+        result_type, result_content, new_dir = process_command("cat about.txt --offset x")
+        assert result_type == "text"
+        assert "requires a number" in result_content
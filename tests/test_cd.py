@@ -74,3 +74,24 @@ class TestCdCommand:
         # Should still load blog despite extra whitespace
         assert isinstance(result_type, str)
         assert result_type in ("streamlit", "text")
+
+    def test_cd_blog_with_page_options(self):
+        """Test cd blog --page N --limit N passes pagination to the page"""
+        result_type, result_content, new_dir = process_command("cd blog --page 2 --limit 5")
+        assert result_type == "streamlit"
+        assert result_content.keywords == {"page": 2, "limit": 5}
+        assert new_dir == "blog"
+
+    def test_cd_blog_rejects_zero_options(self):
+        """Test cd blog --limit 0 and --page 0 are errors"""
+        for option in ("--limit 0", "--page 0"):
+            result_type, result_content, new_dir = process_command(f"cd blog {option}")
+            assert result_content == f"cd: option {option.split()[0]} requires a positive number"
+            assert new_dir is None
+
+    def test_cd_invalid_option(self):
+        """Test cd with a non-numeric option value returns an error"""
+        result_type, result_content, new_dir = process_command("cd blog --page two")
+        assert result_type == "text"
+        assert "requires a positive number" in result_content
+        assert new_dir is None
@@ -0,0 +1,95 @@
+"""Tests for command and path completion"""
+import pytest
+import commands
+from completion import PrefixTrie, Completer, complete
+from engine import Session
+from vfs import VirtualFS
+
+
+class TestPrefixTrie:
+    """Tests for the prefix trie"""
+
+    def test_sorted_prefix_matches(self):
+        """Test matches come back sorted and misses are empty"""
+        trie = PrefixTrie()
+        for word in ["cd", "cat", "clear", "ls"]:
+            trie.insert(word)
+        assert trie.complete("c") == ["cat", "cd", "clear"]
+        assert trie.complete("x") == []
+        assert trie.size == 4
+
+    def test_limit(self):
+        """Test completion stops after limit matches"""
+        trie = PrefixTrie()
+        for i in range(100):
+            trie.insert(f"w{i:03}")
+        assert trie.complete("w", limit=3) == ["w000", "w001", "w002"]
+
+    def test_separator_stops_descent(self):
+        """Test matches stop at the separator until it is typed"""
+        trie = PrefixTrie(separator="/")
+        for word in ["blog", "blog/a", "bio"]:
+            trie.insert(word)
+        assert trie.complete("b") == ["bio", "blog"]
+        assert trie.complete("blog/") == ["blog/a"]
+
+
+@pytest.fixture(autouse=True)
+def no_usage():
+    """Start without recorded command usage, which affects ranking"""
+    commands.usage.clear()
+    yield
+    commands.usage.clear()
+
+
+class TestCompletion:
+    """Tests for completing command lines"""
+
+    def test_command_names(self):
+        """Test the first word completes to command names"""
+        assert complete("c") == ["cat", "cd", "clear"]
+
+    def test_hidden_commands_excluded(self):
+        """Test hidden commands are never offered"""
+        assert complete("stat") == []
+
+    def test_paths_with_directory_suffix(self):
+        """Test paths complete with a slash after directories"""
+        assert complete("cd ") == ["cd about.txt", "cd blog/"]
+        assert complete("cat ab") == ["cat about.txt"]
+
+    def test_relative_and_absolute_paths(self):
+        """Test relative and absolute path arguments"""
+        assert complete("cat ../ab", "blog") == ["cat ../about.txt"]
+        assert complete("cat /home/b") == ["cat /home/blog/"]
+        assert complete("cat /etc/") == []
+
+    def test_pipeline_stage(self):
+        """Test the command after a pipe completes to command names"""
+        assert complete("cat about | he") == ["cat about | head", "cat about | help"]
+
+    def test_ranked_by_use(self):
+        """Test commands used before rank first"""
+        commands.process_command("clear")
+        assert complete("c")[0] == "clear"
+
+    def test_cached_commands_counted(self):
+        """Test commands answered from the result cache still count as used"""
+        for _ in range(5):
+            commands.process_command("help")
+        commands.process_command("cat about | head -1")
+        assert complete("h") == ["help", "head"]
+
+    def test_tracks_filesystem_changes(self, tmp_path, monkeypatch):
+        """Test completion follows a replaced filesystem"""
+        (tmp_path / "notes.md").write_text("x")
+        completer = Completer()
+        assert completer.complete("cat n") == []
+        monkeypatch.setattr(commands, "filesystem", VirtualFS(str(tmp_path)))
+        assert completer.complete("cat n") == ["cat notes.md"]
+
+    def test_session_uses_cwd(self):
+        """Test a session completes paths from its directory"""
+        session = Session()
+        session.run("cd blog")
+        assert session.complete("ls ../b") == ["ls ../blog/"]
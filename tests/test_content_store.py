@@ -0,0 +1,72 @@
+"""Tests for the cat content store"""
+import os
+import pytest
+from content_store import ContentStore
+
+
+def touch_later(path):
+    """Move a file's mtime forward so a rewrite is always detected"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestContentStore:
+    """Tests for ContentStore caching and paging"""
+
+    def test_cached_read(self, tmp_path):
+        """Test an unchanged file is read from disk once"""
+        path = tmp_path / "about.txt"
+        path.write_text("hello")
+        store = ContentStore()
+        assert store.read(str(path)) == ("text", "hello")
+        assert store.read(str(path)) == ("text", "hello")
+        assert store.stats["hits"] == 1
+        assert store.stats["misses"] == 1
+
+    def test_markdown_type(self, tmp_path):
+        """Test .md files are returned as markdown"""
+        path = tmp_path / "notes.md"
+        path.write_text("# notes")
+        assert ContentStore().read(str(path)) == ("markdown", "# notes")
+
+    def test_modified_file_revalidated(self, tmp_path):
+        """Test a changed file is re-read"""
+        path = tmp_path / "about.txt"
+        path.write_text("old")
+        store = ContentStore()
+        store.read(str(path))
+        path.write_text("newer")
+        touch_later(path)
+        assert store.read(str(path)) == ("text", "newer")
+
+    def test_lru_eviction(self, tmp_path):
+        """Test least recently used entries are evicted over the byte budget"""
+        store = ContentStore(max_bytes=10)
+        for name in ("a", "b", "c"):
+            (tmp_path / name).write_text("x" * 4)
+        store.read(str(tmp_path / "a"))
+        store.read(str(tmp_path / "b"))
+        store.read(str(tmp_path / "a"))
+        store.read(str(tmp_path / "c"))
+        assert store.stats["evictions"] == 1
+        assert store.nbytes == 8
+        store.read(str(tmp_path / "a"))
+        assert store.stats["hits"] == 2
+
+    def test_large_file_not_cached(self, tmp_path):
+        """Test files over the mmap threshold are not kept in memory"""
+        path = tmp_path / "big.txt"
+        path.write_text("y" * 100)
+        store = ContentStore(mmap_threshold=10)
+        assert store.is_large(str(path))
+        store.read(str(path))
+        assert store.nbytes == 0
+
+    def test_read_lines_pages(self, tmp_path):
+        """Test paging through a file by line offsets"""
+        path = tmp_path / "lines.txt"
+        path.write_text("".join(f"line {i}\n" for i in range(5)))
+        store = ContentStore()
+        assert store.read_lines(str(path), 0, 2) == ("line 0\nline 1", 2)
+        assert store.read_lines(str(path), 3, 5) == ("line 3\nline 4", None)
+        assert store.read_lines(str(path), 10, 5) == ("", None)
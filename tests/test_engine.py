@@ -0,0 +1,75 @@
+"""Tests for the headless command engine"""
+import asyncio
+import pytest
+from engine import Session, TextStreamlit, render_text
+
+
+class TestSession:
+    """Tests for Session state handling"""
+
+    def test_run_tracks_directory(self):
+        """Test cd changes the session's working directory"""
+        session = Session()
+        session.run("cd ~/about.txt")
+        assert session.cwd == "~"
+        session.run("pwd")
+        assert session.history.last().content == "/home"
+
+    def test_history_and_clear(self):
+        """Test commands are recorded and clear empties the history"""
+        session = Session("s1")
+        session.run("whoami")
+        session.run("echo hi")
+        assert [entry.cmd for entry in session.history] == ["whoami", "echo hi"]
+        assert session.run("clear") == ("text", "", None)
+        assert len(session.history) == 0
+
+    def test_execute_async(self):
+        """Test execute runs commands concurrently from an event loop"""
+        sessions = [Session() for _ in range(20)]
+
+        async def run_all():
+            return await asyncio.gather(*(session.execute("ls") for session in sessions))
+
+        results = asyncio.run(run_all())
+        assert all(result == ("text", "about.txt\nblog/", None) for result in results)
+
+    def test_session_ids(self):
+        """Test sessions get unique ids unless one is given"""
+        assert Session().id != Session().id
+        assert Session("fixed").id == "fixed"
+
+
+class TestRenderText:
+    """Tests for rendering results for text-only clients"""
+
+    def test_text_result(self):
+        """Test text results are returned unchanged"""
+        assert render_text(("text", "hello", None)) == "hello"
+
+    def test_streamlit_result(self):
+        """Test streamlit pages are rendered through the text shim"""
+        def render(st):
+            st.markdown("# Title")
+            st.divider()
+            with st.spinner("wait"):
+                st.caption("done")
+            st.session_state.seen = True
+            st.plotly_chart(object())
+            st.button("Load more")
+
+        assert render_text(("streamlit", render, "blog")) == "# Title\n\n---\n\ndone"
+
+    def test_streamlit_render_error(self):
+        """Test page errors are reported as text"""
+        def render(st):
+            raise RuntimeError("boom")
+
+        assert render_text(("streamlit", render, "blog")) == "Error rendering page: boom"
+
+    def test_session_state_attributes(self):
+        """Test the shim's session_state supports attribute and key access"""
+        st = TextStreamlit()
+        st.session_state.count = 1
+        assert st.session_state["count"] == 1
+        assert st.session_state.get("missing", 2) == 2
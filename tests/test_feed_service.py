@@ -0,0 +1,149 @@
+"""Tests for the stale-while-revalidate feed service"""
+import json
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from feed_service import FeedService, NotModified
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serve the server's current body, or a 500 when it is None"""
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.body is None:
+            self.send_response(500)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    """Local HTTP server standing in for the upstream feed"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.body = json.dumps(["post 1"]).encode()
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class FakeClock:
+    """Manually advanced time source"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_feed(stub, clock, **kwargs):
+    url = f"http://127.0.0.1:{stub.server_address[1]}/index.html"
+
+    def fetch():
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return json.loads(response.read())
+
+    return FeedService("test", fetch, ttl=100, refresh_ahead=10, backoff=5, clock=clock, **kwargs)
+
+
+class TestFeedService:
+    """Tests for FeedService caching, refresh and backoff"""
+
+    def test_first_get_fetches(self, stub):
+        """Test the first get blocks on a fetch and later gets are cached"""
+        feed = make_feed(stub, FakeClock())
+        assert feed.get() == ["post 1"]
+        assert feed.get() == ["post 1"]
+        assert stub.requests == 1
+
+    def test_stale_copy_served_while_refreshing(self, stub):
+        """Test data near expiry is returned immediately and refreshed in the background"""
+        clock = FakeClock()
+        feed = make_feed(stub, clock)
+        feed.get()
+        stub.body = json.dumps(["post 2"]).encode()
+        clock.now += 95
+        assert feed.get() == ["post 1"]
+        for _ in range(100):
+            if feed.data == ["post 2"]:
+                break
+            threading.Event().wait(0.01)
+        assert feed.get() == ["post 2"]
+
+    def test_failures_back_off(self, stub):
+        """Test failed fetches are not retried until the backoff expires"""
+        clock = FakeClock()
+        stub.body = None
+        feed = make_feed(stub, clock)
+        assert feed.get() is None
+        assert feed.get() is None
+        assert stub.requests == 1
+        clock.now += 5
+        assert feed.get() is None
+        assert stub.requests == 2
+        assert feed.retry_at == clock.now + 10
+
+    def test_failure_keeps_last_good_copy(self, stub):
+        """Test an upstream error after a success keeps serving the old data"""
+        clock = FakeClock()
+        feed = make_feed(stub, clock)
+        feed.get()
+        stub.body = None
+        clock.now += 200
+        assert feed.refresh() is False
+        assert feed.get() == ["post 1"]
+
+    def test_snapshot_cold_start(self, stub, tmp_path):
+        """Test a new service starts from the snapshot without fetching"""
+        snapshot = str(tmp_path / "blog.json")
+        clock = FakeClock()
+        make_feed(stub, clock, snapshot_path=snapshot).get()
+        stub.body = None
+        restarted = make_feed(stub, clock, snapshot_path=snapshot)
+        assert restarted.get() == ["post 1"]
+        assert stub.requests == 1
+
+    def test_not_modified_keeps_copy_fresh(self):
+        """Test NotModified renews the current copy without replacing it"""
+        clock = FakeClock()
+        results = [["post 1"], NotModified()]
+
+        def fetch():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        feed = FeedService("test", fetch, ttl=100, refresh_ahead=10, clock=clock)
+        feed.get()
+        clock.now += 200
+        assert feed.refresh() is False
+        assert feed.data == ["post 1"]
+        assert feed.fetched_at == clock.now
+        assert feed.stats["not_modified"] == 1
+
+    def test_indexer_runs_once_per_refresh(self):
+        """Test the index is rebuilt on refresh and bumps the feed generation"""
+        import feed_service
+        built = []
+        clock = FakeClock()
+        feed = FeedService("test", lambda: ["post"], ttl=100, refresh_ahead=10,
+                           indexer=lambda data: built.append(data) or len(data), clock=clock)
+        generation = feed_service.generation
+        feed.get()
+        feed.get()
+        assert feed.index == 1
+        assert built == [["post"]]
+        assert feed_service.generation == generation + 1
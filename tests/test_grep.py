@@ -0,0 +1,82 @@
+"""Tests for the grep command and ls --tag"""
+from types import SimpleNamespace
+import pytest
+from commands import process_command, clear_result_cache
+from page_loader import load_page_module
+from post_index import PostIndex
+
+pytest.importorskip("bs4")
+
+
+POSTS = [
+    {"title": "Bayesian regression", "url": "https://example.com/a", "tags": ["bayes", "regression"]},
+    {"title": "Least squares", "url": "https://example.com/b", "tags": ["regression"]},
+]
+
+
+@pytest.fixture
+def blog_posts(monkeypatch):
+    """Serve fixed posts from the blog page without touching the network"""
+    module = load_page_module("blog")
+    monkeypatch.setattr(module, "fetch_blog_posts", lambda: POSTS)
+    monkeypatch.setattr(module, "feed", SimpleNamespace(index=PostIndex(POSTS)))
+    clear_result_cache()
+    yield module
+    clear_result_cache()
+
+
+class TestGrepCommand:
+    """Tests for grep over files and pages"""
+
+    def test_grep_file(self):
+        """Test grep prints matching lines of a text file"""
+        result_type, result_content, new_dir = process_command("grep Cambridge about.txt")
+        assert result_type == "text"
+        assert result_content.strip() == "Currently based in: Cambridge, UK"
+
+    def test_grep_blog(self, blog_posts):
+        """Test grep searches blog post titles"""
+        result_type, result_content, new_dir = process_command("grep bayes blog")
+        assert result_content == "Bayesian regression  https://example.com/a"
+
+    def test_grep_current_page(self, blog_posts):
+        """Test grep without a path searches the current page"""
+        result_type, result_content, new_dir = process_command("grep squares", current_dir="blog")
+        assert result_content == "Least squares  https://example.com/b"
+
+    def test_grep_no_pattern(self):
+        """Test grep without arguments shows usage"""
+        result_type, result_content, new_dir = process_command("grep")
+        assert "missing pattern" in result_content
+
+    def test_grep_directory(self):
+        """Test grep on the home directory is an error"""
+        result_type, result_content, new_dir = process_command("grep x ~")
+        assert "Is a directory" in result_content
+
+    def test_grep_missing_path(self):
+        """Test grep on an unknown path is an error"""
+        result_type, result_content, new_dir = process_command("grep x nowhere")
+        assert "No such file or directory" in result_content
+
+
+class TestLsTag:
+    """Tests for ls --tag on searchable pages"""
+
+    def test_ls_blog_tag(self, blog_posts):
+        """Test ls blog --tag lists posts with that tag"""
+        result_type, result_content, new_dir = process_command("ls blog --tag regression")
+        assert result_content.split("\n") == [
+            "Bayesian regression  https://example.com/a",
+            "Least squares  https://example.com/b",
+        ]
+
+    def test_ls_tag_unsupported(self):
+        """Test ls --tag on a plain directory is an error"""
+        result_type, result_content, new_dir = process_command("ls ~ --tag x")
+        assert "not supported" in result_content
+
+    def test_ls_tag_missing_value(self):
+        """Test ls --tag without a value is an error"""
+        result_type, result_content, new_dir = process_command("ls blog --tag")
+        assert "requires a value" in result_content
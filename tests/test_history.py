@@ -0,0 +1,87 @@
+"""Tests for the bounded session history"""
+import gc
+import pytest
+from content_store import ContentStore
+import metrics
+from history import History, INLINE_BYTES, history_bytes
+
+
+class TestHistory:
+    """Tests for History ring buffer behavior"""
+
+    def test_last_entry(self):
+        """Test the last appended command is returned"""
+        history = History(store=ContentStore())
+        assert history.last() is None
+        history.append("ls", "text", "about.txt")
+        history.append("pwd", "text", "/home")
+        assert history.last().cmd == "pwd"
+        assert history.last().content == "/home"
+
+    def test_capacity(self):
+        """Test the oldest entries are dropped beyond the cap"""
+        history = History(maxlen=3, store=ContentStore())
+        for i in range(5):
+            history.append(f"echo {i}", "text", str(i))
+        assert [entry.cmd for entry in history] == ["echo 2", "echo 3", "echo 4"]
+
+    def test_large_output_shared(self):
+        """Test large outputs are stored once across sessions"""
+        store = ContentStore()
+        big = "x" * (INLINE_BYTES + 1)
+        first, second = History(store=store), History(store=store)
+        first.append("cat big", "text", big)
+        second.append("cat big", "text", "".join(["x"] * (INLINE_BYTES + 1)))
+        assert first.last().content is second.last().content
+        assert len(store._blobs) == 1
+        assert first.nbytes() < len(big)
+
+    def test_references_released(self):
+        """Test evicted, cleared and dropped histories release shared outputs"""
+        store = ContentStore()
+        big = "y" * (INLINE_BYTES + 1)
+        history = History(maxlen=1, store=store)
+        history.append("cat big", "text", big)
+        history.append("pwd", "text", "/home")
+        assert store._blobs == {}
+        history.append("cat big", "text", big)
+        history.clear()
+        assert store._blobs == {}
+        history.append("cat big", "text", big)
+        del history
+        gc.collect()
+        assert store._blobs == {}
+
+    def test_callable_output(self):
+        """Test streamlit render functions are kept as-is"""
+        history = History(store=ContentStore())
+        render = lambda st: None
+        history.append("cd blog", "streamlit", render)
+        assert history.last().content is render
+        assert history.nbytes() > 0
+
+    def test_large_output_measured_in_bytes(self):
+        """Test multi-byte text is shared once its encoding passes INLINE_BYTES"""
+        history = History(store=ContentStore())
+        history.append("cat notes", "text", "\u00e9" * (INLINE_BYTES // 2 + 1))
+        assert history.last()._ref is not None
+        history.append("cat notes", "text", "\u00e9" * (INLINE_BYTES // 2))
+        assert history.last()._ref is None
+
+
+class TestHistoryGauges:
+    """Tests for the history memory gauges"""
+
+    def test_gauges_cover_live_sessions(self):
+        """Test the exported totals include every live session's history"""
+        gc.collect()
+        sessions, total, largest = history_bytes()
+        history = History(store=ContentStore())
+        history.append("echo hi", "text", "hi" * 100)
+        after = history_bytes()
+        assert after[0] == sessions + 1
+        assert after[1] == total + history.nbytes()
+        assert after[2] >= history.nbytes()
+        text = metrics.render_prometheus()
+        assert "# TYPE sigterm_history_bytes gauge" in text
+        assert "history_bytes_max" in metrics.summary()
@@ -0,0 +1,83 @@
+"""Tests for the shared HTTP client"""
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+pytest.importorskip("requests")
+
+from http_client import HttpClient
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    """Serve a gzipped body with an ETag, answering 304 when it matches"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = gzip.compress(self.server.body)
+        self.send_response(200)
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    """Local HTTP server with ETag support"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ConditionalHandler)
+    server.body = b"<html>posts</html>"
+    server.etag = '"v1"'
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestHttpClient:
+    """Tests for conditional fetching"""
+
+    def test_fetch_decodes_gzip(self, stub):
+        """Test a gzipped response body is returned decoded"""
+        client = HttpClient()
+        url = f"http://127.0.0.1:{stub.server_address[1]}/"
+        assert client.fetch(url) == b"<html>posts</html>"
+        assert "gzip" in stub.requests[0]["Accept-Encoding"]
+
+    def test_unchanged_resource_not_modified(self, stub):
+        """Test the second fetch sends the ETag and returns None on 304"""
+        client = HttpClient()
+        url = f"http://127.0.0.1:{stub.server_address[1]}/"
+        client.fetch(url)
+        assert client.fetch(url) is None
+        assert stub.requests[1]["If-None-Match"] == '"v1"'
+        assert client.stats["not_modified"] == 1
+
+    def test_changed_resource_downloaded(self, stub):
+        """Test a new ETag causes a full download"""
+        client = HttpClient()
+        url = f"http://127.0.0.1:{stub.server_address[1]}/"
+        client.fetch(url)
+        stub.etag = '"v2"'
+        stub.body = b"<html>new</html>"
+        assert client.fetch(url) == b"<html>new</html>"
+
+    def test_unconditional_fetch(self, stub):
+        """Test conditional=False always downloads the body"""
+        client = HttpClient()
+        url = f"http://127.0.0.1:{stub.server_address[1]}/"
+        client.fetch(url)
+        assert client.fetch(url, conditional=False) == b"<html>posts</html>"
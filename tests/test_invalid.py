@@ -19,6 +19,20 @@ class TestInvalidCommands:
         assert result_type == "text"
         assert "command not found" in result_content
 
+    def test_typo_suggests_command(self):
+        """Test a misspelled command suggests the closest command names"""
+        result_type, result_content, new_dir = process_command("hlep")
+        assert result_content == "command not found: hlep\nDid you mean: help?"
+
+    def test_path_suggests_cat_or_cd(self):
+        """Test typing a file or page name suggests how to open it"""
+        assert process_command("about")[1].endswith("Did you mean: cat about?")
+        assert process_command("blog")[1].endswith("Did you mean: cd blog?")
+
+    def test_no_suggestion(self):
+        """Test unrelated input gets no suggestion line"""
+        assert process_command("xyzzy")[1] == "command not found: xyzzy"
+
     def test_command_case_sensitive(self):
         """Test that commands are case sensitive"""
         result_type, result_content, new_dir = process_command("HELP")
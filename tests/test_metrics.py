@@ -0,0 +1,98 @@
+"""Tests for timing instrumentation and the stats command"""
+import urllib.request
+import pytest
+import metrics
+from commands import process_command, clear_result_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    """Start every test with empty histograms and result cache"""
+    metrics.reset()
+    clear_result_cache()
+    yield
+    metrics.reset()
+
+
+class TestTimed:
+    """Tests for the timed context manager and decorator"""
+
+    def test_context_manager(self):
+        """Test a timed block is recorded in its histogram"""
+        with metrics.timed("test", "block"):
+            pass
+        histogram = metrics.histograms[("test", "block")]
+        assert histogram.count == 1
+        assert sum(histogram.counts) == 1
+
+    def test_decorator(self):
+        """Test a decorated function is timed even when it raises"""
+        @metrics.timed("test", "func")
+        def fail():
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            fail()
+        assert metrics.histograms[("test", "func")].count == 1
+
+    def test_commands_are_timed(self):
+        """Test registered commands record their handler time"""
+        process_command("ls")
+        process_command("whoami")
+        assert metrics.histograms[("command", "ls")].count == 1
+        assert ("command", "whoami") in metrics.histograms
+
+    def test_cached_results_are_counted(self):
+        """Test commands served from the result cache are timed separately"""
+        for _ in range(3):
+            process_command("pwd")
+        process_command("ls | head -1")
+        process_command("ls | head -1")
+        assert metrics.histograms[("command", "pwd")].count == 1
+        assert metrics.histograms[("command_cached", "pwd")].count == 2
+        assert ("command_cached", "pipeline") not in metrics.histograms
+
+
+class TestExport:
+    """Tests for Prometheus export and the metrics endpoint"""
+
+    def test_prometheus_format(self):
+        """Test histograms export cumulative buckets, sum and count"""
+        metrics.observe("test", "op", 0.003)
+        metrics.observe("test", "op", 20)
+        text = metrics.render_prometheus()
+        assert 'sigterm_duration_seconds_bucket{kind="test",name="op",le="0.0025"} 0' in text
+        assert 'sigterm_duration_seconds_bucket{kind="test",name="op",le="0.005"} 1' in text
+        assert 'sigterm_duration_seconds_bucket{kind="test",name="op",le="+Inf"} 2' in text
+        assert 'sigterm_duration_seconds_count{kind="test",name="op"} 2' in text
+        assert 'sigterm_cache_events_total{cache="results",event="hits"}' in text
+
+    def test_metrics_endpoint(self):
+        """Test the standalone endpoint serves the Prometheus text"""
+        metrics.observe("test", "op", 0.001)
+        server = metrics.start_metrics_server(0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert b'name="op"' in response.read()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestStatsCommand:
+    """Tests for the hidden stats command"""
+
+    def test_stats_report(self):
+        """Test stats lists timed operations and cache hit ratios"""
+        process_command("cat about")
+        process_command("cat about")
+        result_type, result_content, new_dir = process_command("stats")
+        assert result_type == "text"
+        assert "command:cat" in result_content
+        assert "results" in result_content
+        assert new_dir is None
+
+    def test_stats_hidden_from_help(self):
+        """Test stats is not advertised by help"""
+        assert "stats" not in process_command("help")[1]
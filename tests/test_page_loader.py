@@ -0,0 +1,56 @@
+"""Tests for the page module registry in page_loader"""
+import os
+import pytest
+from page_loader import load_page, clear_page_cache, cache_stats
+
+
+PAGE_SOURCE = '''
+LOADS = []
+LOADS.append(1)
+
+def render(st):
+    return "{marker}"
+'''
+
+
+def write_page(directory, name, marker):
+    path = directory / f"{name}.py"
+    path.write_text(PAGE_SOURCE.format(marker=marker))
+    return path
+
+
+class TestPageCache:
+    """Tests for cached page module loading"""
+
+    def setup_method(self):
+        clear_page_cache()
+
+    def test_repeated_load_reuses_module(self, tmp_path):
+        """Test loading the same page twice imports it once"""
+        write_page(tmp_path, "cached", "v1")
+        first = load_page("cached", pages_dir=str(tmp_path))
+        second = load_page("cached", pages_dir=str(tmp_path))
+        assert first[0] == "streamlit"
+        assert first[1] is second[1]
+        assert cache_stats == {"hits": 1, "misses": 1}
+
+    def test_modified_page_is_reloaded(self, tmp_path):
+        """Test a page is re-imported when its mtime changes"""
+        path = write_page(tmp_path, "changing", "v1")
+        assert load_page("changing", pages_dir=str(tmp_path))[1](None) == "v1"
+        write_page(tmp_path, "changing", "v2")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert load_page("changing", pages_dir=str(tmp_path))[1](None) == "v2"
+        assert cache_stats["misses"] == 2
+
+    def test_broken_page_is_not_cached(self, tmp_path):
+        """Test a page that fails to import is retried on the next load"""
+        (tmp_path / "broken.py").write_text("raise RuntimeError('boom')\n")
+        assert load_page("broken", pages_dir=str(tmp_path)) == ("text", "Error loading page: boom")
+        assert load_page("broken", pages_dir=str(tmp_path)) == ("text", "Error loading page: boom")
+        assert cache_stats == {"hits": 0, "misses": 2}
+
+    def test_missing_page(self, tmp_path):
+        """Test loading a page that does not exist returns None"""
+        assert load_page("missing", pages_dir=str(tmp_path)) is None
@@ -0,0 +1,93 @@
+"""Tests for deferred page rendering"""
+import threading
+import pytest
+import page_runner
+from engine import TextStreamlit, render_text
+from page_runner import deferred, is_pending, as_future, render_page
+
+
+class TestDeferred:
+    """Tests for pending page bodies"""
+
+    def test_fetch_runs_on_pool_and_draw_in_caller(self):
+        """Test fetch runs on the render pool and the draw is left to the caller"""
+        threads = []
+
+        def fetch():
+            threads.append(threading.current_thread().name)
+            return 42
+
+        st = TextStreamlit()
+        draw = deferred(fetch, lambda st, value: st.write(f"value {value}")).result(timeout=5)
+        assert threads[0].startswith("sigterm-render")
+        draw(st)
+        assert st.getvalue() == "value 42"
+
+    def test_coroutine_fetch(self):
+        """Test a coroutine fetch function"""
+        async def fetch():
+            return "async"
+
+        st = TextStreamlit()
+        deferred(fetch, lambda st, value: st.write(value)).result(timeout=5)(st)
+        assert st.getvalue() == "async"
+
+    def test_awaitable_body(self):
+        """Test a coroutine returned by a page is pending and resolves to a draw"""
+        async def body():
+            return lambda st: st.write("from coroutine")
+
+        pending = body()
+        assert is_pending(pending)
+        st = TextStreamlit()
+        as_future(pending).result(timeout=5)(st)
+        assert st.getvalue() == "from coroutine"
+
+    def test_submit_runs_functions_and_coroutines_on_pool(self):
+        """Test submit runs plain and coroutine functions on the render pool"""
+        async def name():
+            return threading.current_thread().name
+
+        assert page_runner.submit(lambda x: x * 2, 21).result(timeout=5) == 42
+        assert page_runner.submit(name).result(timeout=5).startswith("sigterm-render")
+
+    def test_plain_return_is_not_pending(self):
+        """Test a page returning None has nothing pending"""
+        assert not is_pending(None)
+
+
+class TestRenderPage:
+    """Tests for drawing pages synchronously"""
+
+    def test_header_then_body(self):
+        """Test the header is drawn before the deferred body"""
+        def render(st, name="x"):
+            st.markdown("# Header")
+            return deferred(lambda: name, lambda st, value: st.write(value))
+
+        st = TextStreamlit()
+        render_page(render, st, name="body")
+        assert st.lines == ["# Header", "body"]
+
+    def test_timeout(self):
+        """Test a body slower than the timeout raises TimeoutError"""
+        release = threading.Event()
+
+        def render(st):
+            return deferred(lambda: release.wait(5), lambda st, value: None)
+
+        with pytest.raises(TimeoutError):
+            render_page(render, TextStreamlit(), timeout=0.05)
+        release.set()
+
+    def test_text_clients_report_timeout(self, monkeypatch):
+        """Test text clients show a timeout message after the header"""
+        release = threading.Event()
+        monkeypatch.setattr(page_runner, "RENDER_TIMEOUT", 0.05)
+
+        def render(st):
+            st.markdown("# Slow")
+            return deferred(lambda: release.wait(5), lambda st, value: None)
+
+        assert render_text(("streamlit", render, "slow")) == "# Slow\n\nPage timed out, please try again"
+        release.set()
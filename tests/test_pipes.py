@@ -0,0 +1,115 @@
+"""Tests for pipelines and the streaming head/tail/wc commands"""
+import pytest
+import commands
+import content_store
+from commands import process_command, clear_result_cache
+from content_store import ContentStore
+from vfs import VirtualFS
+
+
+@pytest.fixture
+def big_file(tmp_path, monkeypatch):
+    """A 10,000 line file served through the lazy (large file) path"""
+    (tmp_path / "big.txt").write_text("".join(f"line {i}\n" for i in range(10000)))
+    monkeypatch.setattr(commands, "filesystem", VirtualFS(str(tmp_path)))
+    store = ContentStore(mmap_threshold=1024)
+    monkeypatch.setattr(content_store, "store", store)
+    clear_result_cache()
+    yield store
+    clear_result_cache()
+
+
+class TestPipes:
+    """Tests for | between commands"""
+
+    def test_cat_into_head(self):
+        """Test head keeps the first lines of cat's output"""
+        content = process_command("cat about | head -2")[1]
+        assert content.splitlines() == process_command("cat about")[1].splitlines()[:2]
+
+    def test_ls_into_grep(self):
+        """Test grep filters a listing"""
+        assert process_command("ls | grep blog") == ("text", "blog/", None)
+
+    def test_three_stages(self):
+        """Test a pipeline of three commands"""
+        assert process_command("ls | head -5 | wc -l") == ("text", "2", None)
+
+    def test_echo_into_wc(self):
+        """Test wc counts lines, words and bytes of piped input"""
+        assert process_command("echo one two three | wc") == ("text", "1 3 14", None)
+
+    def test_directory_is_kept(self):
+        """Test a pipeline never changes the directory"""
+        assert process_command("ls | head -1", "blog")[2] is None
+
+    def test_empty_stage(self):
+        """Test an empty stage is a syntax error"""
+        assert process_command("ls | | head")[1] == "syntax error near unexpected token `|'"
+
+    def test_unknown_stage(self):
+        """Test an unknown command in a pipeline"""
+        assert process_command("ls | nope")[1] == "command not found: nope"
+
+    def test_page_output_cannot_be_piped(self):
+        """Test rendered pages cannot feed a pipeline"""
+        assert process_command("cd blog | head")[1] == "cd: output cannot be piped"
+
+    def test_missing_file(self):
+        """Test a failing first stage reports its own error"""
+        assert process_command("cat nothere | head")[1] == "cat: nothere: No such file or directory"
+
+    def test_grep_with_path_ignores_input(self):
+        """Test grep with a path reads the file instead of its input"""
+        assert process_command("ls | grep ABOUT about")[1] == process_command("grep ABOUT about")[1]
+
+    def test_head_reads_large_file_lazily(self, big_file, monkeypatch):
+        """Test head stops reading a large file after the lines it needs"""
+        consumed = []
+        iter_lines = big_file.iter_lines
+
+        def tracking(path):
+            for line in iter_lines(path):
+                consumed.append(line)
+                yield line
+
+        monkeypatch.setattr(big_file, "iter_lines", tracking)
+        assert process_command("cat big | head -5")[1] == "\n".join(f"line {i}" for i in range(5))
+        assert len(consumed) == 5
+
+    def test_tail_of_large_file(self, big_file):
+        """Test tail of a large file piped from cat"""
+        assert process_command("cat big.txt | tail -n 2")[1] == "line 9998\nline 9999"
+
+
+class TestStreamingCommands:
+    """Tests for head, tail and wc used on their own"""
+
+    def test_head_default_count(self, big_file):
+        """Test head prints ten lines by default"""
+        assert len(process_command("head big")[1].splitlines()) == 10
+
+    def test_tail_file(self, big_file):
+        """Test tail reads a file argument"""
+        assert process_command("tail -1 big")[1] == "line 9999"
+
+    def test_wc_flags(self, big_file):
+        """Test wc prints only the requested counts"""
+        assert process_command("wc -l -w big")[1] == "10000 20000"
+
+    def test_missing_file_argument(self):
+        """Test head without input or a file argument"""
+        assert process_command("head")[1] == "head: missing file argument"
+
+    def test_bad_count(self):
+        """Test a non-numeric -n is rejected"""
+        assert process_command("head -n x about")[1] == "head: option -n requires a number"
+
+    def test_directory(self):
+        """Test tail of a directory"""
+        assert process_command("tail blog")[1] == "tail: blog: Is a directory"
+
+    def test_listed_in_help(self):
+        """Test the streaming commands are listed in help"""
+        content = process_command("help")[1]
+        assert "head" in content and "tail" in content and "wc" in content
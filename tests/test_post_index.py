@@ -0,0 +1,48 @@
+"""Tests for the blog post tag and title indexes"""
+import pytest
+from post_index import PostIndex, tokenize
+
+
+POSTS = [
+    {"title": "Bayesian regression in PyMC", "url": "/a", "tags": ["bayes", "Regression"]},
+    {"title": "Ordinary least squares", "url": "/b", "tags": ["regression"]},
+    {"title": "Bayes factors explained", "url": "/c", "tags": ["bayes"]},
+]
+
+
+class TestPostIndex:
+    """Tests for PostIndex lookups"""
+
+    def test_tokenize(self):
+        """Test titles are split into lowercase words"""
+        assert tokenize("Bayes-factors, Explained!") == ["bayes", "factors", "explained"]
+
+    def test_by_tag(self):
+        """Test tag lookups are case-insensitive and keep feed order"""
+        index = PostIndex(POSTS)
+        assert [p["url"] for p in index.by_tag("regression")] == ["/a", "/b"]
+        assert [p["url"] for p in index.by_tag("BAYES")] == ["/a", "/c"]
+        assert index.by_tag("missing") == []
+
+    def test_search_prefix(self):
+        """Test search matches word prefixes in titles and tags"""
+        index = PostIndex(POSTS)
+        assert [p["url"] for p in index.search("bayes")] == ["/a", "/c"]
+        assert [p["url"] for p in index.search("squ")] == ["/b"]
+        assert [p["url"] for p in index.search("regress")] == ["/a", "/b"]
+
+    def test_search_all_terms(self):
+        """Test multi-word queries require every term"""
+        index = PostIndex(POSTS)
+        assert [p["url"] for p in index.search("bayes regression")] == ["/a"]
+        assert index.search("") == []
+
+    def test_results_memoized(self):
+        """Test repeated queries return the cached result"""
+        index = PostIndex(POSTS)
+        assert index.search("bayes") is index.search("Bayes")
+        assert index.by_tag("bayes") is index.by_tag("bayes")
+
+    def test_empty_feed(self):
+        """Test an index over no posts answers every query with nothing"""
+        assert PostIndex(None).search("bayes") == []
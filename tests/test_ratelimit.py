@@ -0,0 +1,143 @@
+"""Tests for request coalescing and per-session rate limiting"""
+import threading
+import time
+import pytest
+from engine import Session
+from commands import rate_classes
+from ratelimit import RateLimiter, TokenBucket, parse_limits, DEFAULT_RATE_LIMITS
+from singleflight import SingleFlight
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSingleFlight:
+    """Tests for sharing concurrent identical calls"""
+
+    def test_concurrent_calls_share_one_computation(self):
+        """Test concurrent calls for one key wait on a single computation"""
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return "done"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while flight.stats["hits"] + flight.stats["misses"] < 5:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert results == ["done"] * 5
+        assert len(calls) == 1
+        assert flight.stats == {"hits": 4, "misses": 1}
+
+    def test_sequential_calls_run_again(self):
+        """Test a finished call is not reused by the next one"""
+        flight = SingleFlight()
+        assert flight.do("k", lambda: 1) == 1
+        assert flight.do("k", lambda: 2) == 2
+
+    def test_error_reaches_caller(self):
+        """Test an exception is raised to the caller and not remembered"""
+        flight = SingleFlight()
+        with pytest.raises(ValueError):
+            flight.do("k", lambda: int("x"))
+        assert flight.do("k", lambda: 3) == 3
+
+
+class TestTokenBucket:
+    """Tests for the token bucket"""
+
+    def test_burst_then_refill(self):
+        """Test a bucket allows its burst and then refills over time"""
+        clock = Clock()
+        bucket = TokenBucket(rate=2, burst=3, clock=clock)
+        assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+        assert bucket.wait_time() == pytest.approx(0.5)
+        clock.now += 0.5
+        assert bucket.take()
+
+    def test_never_exceeds_burst(self):
+        """Test an idle bucket never holds more than its burst"""
+        clock = Clock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock)
+        clock.now += 100
+        assert [bucket.take() for _ in range(3)] == [True, True, False]
+
+
+class TestRateLimiter:
+    """Tests for per-class limits"""
+
+    def test_classes_are_independent(self):
+        """Test an empty class does not limit other classes"""
+        limiter = RateLimiter({"default": (1, 1), "page": (1, 1)}, clock=Clock())
+        assert limiter.acquire(["page"]) == 0
+        assert limiter.acquire(["page"]) > 0
+        assert limiter.acquire(["default"]) == 0
+
+    def test_no_tokens_taken_when_any_class_is_empty(self):
+        """Test a limited command takes no tokens from any class"""
+        limiter = RateLimiter({"default": (1, 2), "page": (1, 1)}, clock=Clock())
+        limiter.acquire(["page"])
+        assert limiter.acquire(["default", "page"]) > 0
+        assert limiter.buckets["default"].tokens == 2
+
+    def test_parse_limits(self):
+        """Test parsing SIGTERM_RATE_LIMITS specs"""
+        assert parse_limits("off") is None
+        limits = parse_limits("page=0.5:3, search=4")
+        assert limits["page"] == (0.5, 3)
+        assert limits["search"] == (4.0, 4)
+        assert limits["default"] == DEFAULT_RATE_LIMITS["default"]
+        with pytest.raises(ValueError):
+            parse_limits("page=fast")
+
+
+class TestSessionRateLimit:
+    """Tests for the limiter in front of process_command"""
+
+    def test_rate_limited_response(self):
+        """Test a limited command is answered without running it"""
+        session = Session(rate_limits={"default": (100, 100), "page": (0.001, 2)})
+        for _ in range(2):
+            assert session.run("cd blog")[2] == "blog"
+            session.run("cd ..")
+        result = session.run("cd blog")
+        assert result[1].startswith("rate limited: too many commands, try again in")
+        assert session.cwd == "~"
+        assert session.run("pwd")[1] == "/home"
+
+    def test_pipeline_charges_every_stage(self):
+        """Test each stage of a pipeline costs a token"""
+        session = Session(rate_limits={"default": (0.001, 3)})
+        assert session.run("ls | grep blog")[1] == "blog/"
+        assert session.run("ls | grep blog")[1].startswith("rate limited")
+
+    def test_classes_follow_target(self):
+        """Test commands are charged by what they target"""
+        assert rate_classes("ls") == ["default"]
+        assert rate_classes("ls --tag bayes blog") == ["search"]
+        assert rate_classes("cd blog") == ["page"]
+        assert rate_classes("cd ..", "blog") == rate_classes("cd ~", "blog") == ["default"]
+        assert rate_classes("grep x about.txt") == ["default"]
+        assert rate_classes("grep x blog") == ["search"]
+        assert rate_classes("grep x", "blog") == ["search"]
+        assert rate_classes("cat about | grep x", "blog") == ["default", "default"]
+
+    def test_unlimited_session(self):
+        """Test sessions without limits are never limited"""
+        session = Session(rate_limits=None)
+        assert session.limiter is None
+        assert not any(session.run("cd ~")[1].startswith("rate limited") for _ in range(50))
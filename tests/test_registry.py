@@ -0,0 +1,96 @@
+"""Tests for the command registry and result cache"""
+import pytest
+import commands
+from commands import process_command, register_command, registry, cache_stats, clear_result_cache
+
+
+@pytest.fixture
+def plugin():
+    """Register a temporary pure plugin command that counts its calls"""
+    calls = []
+
+    def cmd_count(args, current_dir):
+        calls.append((args, current_dir))
+        return ("text", f"{len(calls)}", None)
+
+    register_command("count", cmd_count, ("args", "current_dir"), "Count calls", pure=True)
+    yield calls
+    del registry["count"]
+    clear_result_cache()
+
+
+class TestRegistry:
+    """Tests for registering and dispatching commands"""
+
+    def test_plugin_command_dispatch(self, plugin):
+        """Test a registered command receives its declared arguments"""
+        result = process_command("count a b", current_dir="blog")
+        assert result == ("text", "1", None)
+        assert plugin == [("a b", "blog")]
+
+    def test_plugin_command_in_help(self, plugin):
+        """Test registered commands are listed by help"""
+        result_type, result_content, new_dir = process_command("help")
+        assert "count             Count calls" in result_content
+
+    def test_hidden_command_not_in_help(self):
+        """Test hidden commands are left out of help"""
+        register_command("secret", lambda: ("text", "", None), hidden=True)
+        try:
+            assert "secret" not in process_command("help")[1]
+        finally:
+            del registry["secret"]
+            clear_result_cache()
+
+
+class TestResultCache:
+    """Tests for caching of pure command results"""
+
+    def test_repeated_command_is_cached(self, plugin):
+        """Test a pure command runs once per (cmd, current_dir)"""
+        hits = cache_stats["hits"]
+        assert process_command("count") == process_command("count")
+        assert len(plugin) == 1
+        assert cache_stats["hits"] == hits + 1
+
+    def test_cache_keyed_by_directory(self, plugin):
+        """Test the same command in another directory is not served from cache"""
+        process_command("count")
+        process_command("count", current_dir="blog")
+        assert len(plugin) == 2
+
+    def test_filesystem_version_invalidates(self, plugin, monkeypatch):
+        """Test bumping the filesystem version invalidates cached results"""
+        process_command("count")
+        monkeypatch.setattr(commands.filesystem, "version", commands.filesystem.version + 1)
+        assert process_command("count") == ("text", "2", None)
+
+    def test_cat_sees_edits_without_version_change(self, tmp_path, monkeypatch):
+        """Test editing a file shows up in cat and pipelines though the tree is unchanged"""
+        from vfs import VirtualFS
+
+        (tmp_path / "about.txt").write_text("old")
+        monkeypatch.setattr(commands, "filesystem", VirtualFS(str(tmp_path)))
+        clear_result_cache()
+        assert process_command("cat about") == ("text", "old", None)
+        assert process_command("cat about | head -1") == ("text", "old", None)
+        (tmp_path / "about.txt").write_text("new text")
+        assert process_command("cat about") == ("text", "new text", None)
+        assert process_command("cat about | head -1") == ("text", "new text", None)
+        clear_result_cache()
+
+    def test_cache_bounded_by_bytes(self, monkeypatch):
+        """Test cached results are evicted once their total size passes the byte budget"""
+        register_command("big", lambda args: ("text", "x" * int(args), None), ("args",), pure=True)
+        monkeypatch.setattr(commands, "RESULT_CACHE_BYTES", 100)
+        try:
+            clear_result_cache()
+            for size in (40, 41, 42):
+                process_command(f"big {size}")
+            assert len(commands._result_cache) == 2
+            assert commands._result_cache_bytes == 83
+            process_command("big 500")
+            assert len(commands._result_cache) == 2
+        finally:
+            del registry["big"]
+            clear_result_cache()
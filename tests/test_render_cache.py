@@ -0,0 +1,69 @@
+"""Tests for the pre-rendered HTML cache"""
+import pytest
+from content_store import ContentStore
+from history import History
+from render_cache import RenderCache, render_text
+
+
+class TestRenderCache:
+    """Tests for rendering outputs once per content version"""
+
+    def test_text_is_escaped_pre_block(self):
+        """Test text renders as an escaped pre block"""
+        html = RenderCache().render("text", "<b> & ok")
+        assert html == '<pre class="terminal-output"><code>&lt;b&gt; &amp; ok</code></pre>'
+
+    def test_same_content_rendered_once(self, monkeypatch):
+        """Test the same output is rendered once and then reused"""
+        calls = []
+        monkeypatch.setitem(__import__("render_cache").RENDERERS, "text", lambda text: calls.append(text) or render_text(text))
+        cache = RenderCache()
+        first = cache.render("text", "hello")
+        assert cache.render("text", "hello") is first
+        assert calls == ["hello"]
+        assert cache.stats == {"hits": 1, "misses": 1, "evictions": 0}
+
+    def test_changed_content_gets_new_entry(self):
+        """Test different content or type gets a different entry"""
+        cache = RenderCache()
+        assert cache.render("text", "v1") != cache.render("text", "v2")
+        assert cache.key("text", "x") != cache.key("markdown", "x")
+
+    def test_byte_budget_evicts_oldest(self):
+        """Test the cache stays within its byte budget"""
+        cache = RenderCache(max_bytes=200)
+        for i in range(5):
+            cache.render("text", f"{i}" * 60)
+        assert cache.nbytes <= 200
+        assert cache.stats["evictions"] > 0
+
+    def test_unknown_type_is_not_rendered(self):
+        """Test output types without a renderer are skipped"""
+        assert RenderCache().render("streamlit", "x") is None
+
+    def test_history_entry_hashed_once(self):
+        """Test a history entry's cache key is computed once"""
+        history = History(store=ContentStore())
+        history.append("cat about", "text", "hi")
+        entry = history.last()
+        cache = RenderCache()
+        assert cache.render_entry(entry) == render_text("hi")
+        key = entry.render_key
+        cache.render_entry(entry)
+        assert entry.render_key is key
+        assert cache.stats["hits"] == 1
+
+
+class TestMarkdown:
+    """Tests for markdown pre-rendering"""
+
+    def test_markdown_to_html(self):
+        """Test markdown is rendered to HTML"""
+        pytest.importorskip("markdown")
+        assert "<strong>bold</strong>" in RenderCache().render("markdown", "**bold**")
+
+    def test_without_markdown_package(self, monkeypatch):
+        """Test markdown is left to Streamlit without the markdown package"""
+        import sys
+        monkeypatch.setitem(sys.modules, "markdown", None)
+        assert RenderCache().render("markdown", "**bold**") is None
@@ -0,0 +1,106 @@
+"""Tests for the asyncio HTTP terminal server"""
+import asyncio
+import json
+import pytest
+from server import TerminalServer
+
+
+async def request(port, method, path, body=b"", headers=None):
+    """Send one HTTP request and return (status, headers, body)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"{method} {path} HTTP/1.1", "Host: test", f"Content-Length: {len(body)}", "Connection: close"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, head.decode(), payload
+
+
+def with_server(test):
+    """Run an async test against a server on a free port"""
+    async def runner():
+        server = await TerminalServer(port=0).start()
+        try:
+            await test(server)
+        finally:
+            await server.close()
+    asyncio.run(runner())
+
+
+class TestTerminalServer:
+    """Tests for the HTTP API"""
+
+    def test_health(self):
+        """Test the health endpoint"""
+        async def test(server):
+            status, _, body = await request(server.port, "GET", "/health")
+            assert status == 200
+            assert json.loads(body)["status"] == "ok"
+        with_server(test)
+
+    def test_execute_json(self):
+        """Test executing a command returns type, content and cwd"""
+        async def test(server):
+            status, _, body = await request(server.port, "POST", "/sessions/me/execute", b"pwd")
+            assert status == 200
+            assert json.loads(body) == {"type": "text", "content": "/home", "cwd": "~"}
+        with_server(test)
+
+    def test_execute_plain_text(self):
+        """Test Accept: text/plain returns only terminal text"""
+        async def test(server):
+            status, head, body = await request(
+                server.port, "POST", "/sessions/me/execute", b'{"cmd": "whoami"}',
+                {"Accept": "text/plain", "Content-Type": "application/json"},
+            )
+            assert status == 200
+            assert "text/plain" in head
+            assert body == b"user@sigterm"
+        with_server(test)
+
+    def test_complete(self, offline_blog):
+        """Test completions use the session's directory"""
+        async def test(server):
+            await request(server.port, "POST", "/sessions/me/execute", b"cd blog")
+            status, _, body = await request(server.port, "POST", "/sessions/me/complete", b"cat ../ab")
+            assert status == 200
+            assert json.loads(body) == {"completions": ["cat ../about.txt"]}
+        with_server(test)
+
+    def test_sessions_keep_state(self, offline_blog):
+        """Test each session keeps its own working directory"""
+        async def test(server):
+            await request(server.port, "POST", "/sessions/a/execute", b"cd blog")
+            _, _, body_a = await request(server.port, "POST", "/sessions/a/execute", b"pwd")
+            _, _, body_b = await request(server.port, "POST", "/sessions/b/execute", b"pwd")
+            assert json.loads(body_b)["content"] == "/home"
+            assert json.loads(body_a)["content"] in ("/home/blog", "/home")
+        with_server(test)
+
+    def test_create_session(self):
+        """Test POST /sessions returns a new id"""
+        async def test(server):
+            status, _, body = await request(server.port, "POST", "/sessions")
+            assert status == 200
+            assert json.loads(body)["id"] in server.sessions
+        with_server(test)
+
+    def test_errors(self):
+        """Test unknown paths, wrong methods and bad JSON"""
+        async def test(server):
+            assert (await request(server.port, "GET", "/nope"))[0] == 404
+            assert (await request(server.port, "GET", "/sessions/a/execute"))[0] == 405
+            status, _, _ = await request(server.port, "POST", "/sessions/a/execute", b"{",
+                                         {"Content-Type": "application/json"})
+            assert status == 400
+        with_server(test)
+
+    def test_session_limit(self):
+        """Test the least recently used session is dropped beyond the cap"""
+        server = TerminalServer(max_sessions=2)
+        for session_id in ("a", "b", "a", "c"):
+            server.get_session(session_id)
+        assert list(server.sessions) == ["a", "c"]
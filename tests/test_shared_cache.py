@@ -0,0 +1,135 @@
+"""Tests for the host-wide shared cache and its use by feeds and prewarm"""
+import threading
+from types import SimpleNamespace
+import pytest
+from feed_service import FeedService
+from shared_cache import SharedCache
+from sources import DirectorySource
+from vfs import VirtualFS
+import prewarm
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def path(tmp_path):
+    """Path of a shared cache database in a temporary directory"""
+    return str(tmp_path / "shared.sqlite3")
+
+
+class TestSharedCache:
+    """Values and leases visible across cache instances (standing in for workers)"""
+
+    def test_set_and_get_across_instances(self, path):
+        """Test a value stored by one instance is read by another"""
+        SharedCache(path).set("feed:blog", [{"title": "A"}], stored_at=5.0)
+        assert SharedCache(path).get("feed:blog") == ([{"title": "A"}], 5.0)
+
+    def test_missing_key(self, path):
+        """Test a missing key returns None and counts a miss"""
+        cache = SharedCache(path)
+        assert cache.get("nope") is None
+        assert cache.stats["misses"] == 1
+
+    def test_touch_updates_timestamp(self, path):
+        """Test touch moves a value's stored time without changing it"""
+        cache = SharedCache(path)
+        cache.set("k", 1, stored_at=1.0)
+        cache.touch("k", stored_at=2.0)
+        assert cache.get("k") == (1, 2.0)
+
+    def test_lease_is_exclusive_until_released(self, path):
+        """Test only one instance holds a lease until it is released"""
+        first, second = SharedCache(path), SharedCache(path)
+        assert first.acquire_lease("k", 60)
+        assert not second.acquire_lease("k", 60)
+        first.release_lease("k")
+        assert second.acquire_lease("k", 60)
+
+    def test_expired_lease_can_be_taken_over(self, path):
+        """Test a lease past its timeout can be taken by another instance"""
+        clock = Clock()
+        first, second = SharedCache(path, clock=clock), SharedCache(path, clock=clock)
+        assert first.acquire_lease("k", 10)
+        clock.now += 11
+        assert second.acquire_lease("k", 10)
+
+    def test_unusable_database_falls_back(self, tmp_path):
+        """Test an unusable database degrades to misses and counts errors"""
+        cache = SharedCache(str(tmp_path))  # a directory, not a database file
+        assert cache.get("k") is None
+        cache.set("k", 1)
+        assert cache.acquire_lease("k", 10)
+        assert cache.stats["errors"] == 3
+
+
+class TestSharedFeed:
+    """Only one worker per host fetches a feed"""
+
+    def test_second_worker_adopts_shared_copy(self, path):
+        """Test workers after the first adopt its copy instead of fetching"""
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return ["post"]
+
+        workers = [FeedService("blog", fetch, shared=SharedCache(path)) for _ in range(3)]
+        assert [worker.get() for worker in workers] == [["post"]] * 3
+        assert len(calls) == 1
+        assert workers[1].stats["shared"] == 1
+
+    def test_stale_shared_copy_is_refetched(self, path):
+        """Test an expired shared copy is fetched again and replaced"""
+        clock = Clock()
+        SharedCache(path).set("feed:blog", ["old"], stored_at=clock.now - 7200)
+        feed = FeedService("blog", lambda: ["new"], shared=SharedCache(path, clock=clock), clock=clock)
+        assert feed.get() == ["new"]
+        assert SharedCache(path).get("feed:blog")[0] == ["new"]
+
+    def test_waits_for_worker_holding_lease(self, path):
+        """Test a worker without data waits for the lease holder's copy"""
+        holder = SharedCache(path)
+        holder.acquire_lease("feed:blog", 60)
+        feed = FeedService("blog", lambda: pytest.fail("should not fetch"), shared=SharedCache(path))
+
+        def finish():
+            holder.set("feed:blog", ["fetched elsewhere"])
+            holder.release_lease("feed:blog")
+
+        timer = threading.Timer(0.2, finish)
+        timer.start()
+        assert feed.get() == ["fetched elsewhere"]
+        timer.join()
+
+
+class TestPrewarm:
+    """Startup warming of pages and files"""
+
+    def test_warms_text_files(self, tmp_path):
+        """Test prewarm reads text files into the content store"""
+        (tmp_path / "about.txt").write_text("hi")
+        report = prewarm.prewarm(VirtualFS(str(tmp_path)))
+        assert report == {"pages": 0, "files": 1, "hooks": 0, "errors": [], "snapshot": False}
+
+    def test_calls_page_hooks(self, monkeypatch):
+        """Test prewarm calls every page's prewarm hook"""
+        calls = []
+        monkeypatch.setattr(DirectorySource, "load_module", lambda self, path, name: SimpleNamespace(prewarm=lambda: calls.append(name)))
+        report = prewarm.prewarm()
+        assert "blog" in calls
+        assert report["hooks"] == report["pages"]
+
+    def test_errors_are_reported(self, monkeypatch):
+        """Test pages failing to load are reported instead of raised"""
+        def broken(self, path, name):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(DirectorySource, "load_module", broken)
+        assert prewarm.prewarm()["errors"] == ["blog: boom"]
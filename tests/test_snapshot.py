@@ -0,0 +1,141 @@
+"""Tests for the persistent site snapshot"""
+import os
+import pytest
+import feed_service
+import snapshot
+from content_store import ContentStore
+from feed_service import FeedService
+from vfs import VirtualFS
+
+
+@pytest.fixture
+def pages(tmp_path):
+    """A small pages tree"""
+    root = tmp_path / "pages"
+    (root / "notes").mkdir(parents=True)
+    (root / "about.txt").write_text("about me")
+    (root / "notes" / "todo.md").write_text("# Todo")
+    (root / "blog.py").write_text("def render(st): pass")
+    return str(root)
+
+
+@pytest.fixture
+def feeds(monkeypatch):
+    """Isolated feed registry with a cached blog feed"""
+    monkeypatch.setattr(feed_service, "_feeds", {})
+    monkeypatch.setattr(feed_service, "_seeds", {})
+    monkeypatch.setattr(feed_service, "listeners", [])
+    feed = FeedService("blog", lambda: [{"title": "Hello", "tags": ["a"]}])
+    feed.refresh()
+    feed_service._feeds["blog"] = feed
+    return feed_service._feeds
+
+
+class TestFormat:
+    """Tests for encoding and validation"""
+
+    def test_round_trip(self):
+        """Test a state decodes to what was encoded"""
+        state = {"files": {"a": (1, 2, "text", "x")}, "feeds": {}}
+        assert snapshot.decode(snapshot.encode(state)) == state
+
+    def test_rejects_corruption(self):
+        """Test a changed byte fails the checksum"""
+        data = bytearray(snapshot.encode({"x": "payload"}))
+        data[-1] ^= 0xFF
+        with pytest.raises(snapshot.SnapshotError, match="checksum"):
+            snapshot.decode(bytes(data))
+
+    def test_rejects_truncation_and_other_files(self):
+        """Test truncated data and non-snapshot files are rejected"""
+        data = snapshot.encode({"x": "payload"})
+        with pytest.raises(snapshot.SnapshotError):
+            snapshot.decode(data[:-3])
+        with pytest.raises(snapshot.SnapshotError):
+            snapshot.decode(b"{}")
+
+    def test_rejects_other_format_version(self, monkeypatch):
+        """Test snapshots of another format version are rejected"""
+        data = snapshot.encode({})
+        monkeypatch.setattr(snapshot, "FORMAT_VERSION", snapshot.FORMAT_VERSION + 1)
+        with pytest.raises(snapshot.SnapshotError, match="version"):
+            snapshot.decode(data)
+
+
+class TestSaveAndLoad:
+    """Tests for writing a site and starting from it"""
+
+    def test_save_and_read(self, pages, feeds, tmp_path):
+        """Test a saved snapshot holds file contents and feeds and leaves no temporary files"""
+        path = str(tmp_path / "site.snapshot")
+        assert snapshot.save(VirtualFS(pages), path, ContentStore())
+        state = snapshot.read(path, pages)
+        assert state["files"][os.path.join(pages, "about.txt")][2:] == ("text", "about me")
+        assert state["feeds"]["blog"][1] == [{"title": "Hello", "tags": ["a"]}]
+        assert sorted(os.listdir(tmp_path)) == ["pages", "site.snapshot"]
+
+    def test_read_ignores_other_pages_dir_and_missing_file(self, pages, feeds, tmp_path):
+        """Test snapshots of another pages directory and missing files read as None"""
+        path = str(tmp_path / "site.snapshot")
+        snapshot.save(VirtualFS(pages), path, ContentStore())
+        assert snapshot.read(path, str(tmp_path)) is None
+        assert snapshot.read(str(tmp_path / "missing")) is None
+
+    def test_load_site_restores_tree_files_and_feeds(self, pages, feeds, tmp_path, monkeypatch):
+        """Test load_site restores the tree, file contents and feeds without rescanning"""
+        path = str(tmp_path / "site.snapshot")
+        snapshot.save(VirtualFS(pages), path, ContentStore())
+        feed_service._feeds.clear()
+        store = ContentStore()
+        monkeypatch.setattr(snapshot.content_store, "store", store)
+
+        fs = snapshot.load_site(pages, path=path)
+        assert fs.from_manifest
+        assert fs.root.listing == "about.txt\nblog/\nnotes/"
+        assert store.read(os.path.join(pages, "about.txt")) == ("text", "about me")
+        assert store.stats["hits"] == 1 and store.stats["misses"] == 0
+
+        offline = feed_service.get_feed("blog", lambda: int("offline"), snapshot_path=None, shared=None)
+        assert offline.get() == [{"title": "Hello", "tags": ["a"]}]
+
+    def test_stale_contents_are_reread(self, pages, feeds, tmp_path):
+        """Test files changed since the snapshot are read from disk"""
+        path = str(tmp_path / "site.snapshot")
+        snapshot.save(VirtualFS(pages), path, ContentStore())
+        about = os.path.join(pages, "about.txt")
+        with open(about, "w") as f:
+            f.write("changed text")
+        store = ContentStore()
+        snapshot.restore(snapshot.read(path), store)
+        assert store.read(about) == ("text", "changed text")
+
+    def test_new_directory_rescans(self, pages, feeds, tmp_path):
+        """Test a directory added since the snapshot forces a rescan"""
+        path = str(tmp_path / "site.snapshot")
+        snapshot.save(VirtualFS(pages), path, ContentStore())
+        os.mkdir(os.path.join(pages, "extra"))
+        fs = VirtualFS(pages, manifest=snapshot.read(path)["vfs"])
+        assert not fs.from_manifest
+        assert fs.lookup("extra") is not None
+
+    def test_refresh_rewrites_snapshot(self, pages, feeds, tmp_path, monkeypatch):
+        """Test a feed refresh writes the snapshot again"""
+        path = str(tmp_path / "site.snapshot")
+        monkeypatch.setattr(snapshot, "save_in_background", lambda fs, path: snapshot.save(fs, path, ContentStore()))
+        snapshot.load_site(pages, path=path)
+        feed = FeedService("news", lambda: ["headline"])
+        feed_service._feeds["news"] = feed
+        feed.refresh()
+        assert snapshot.read(path)["feeds"]["news"][1] == ["headline"]
+
+    def test_background_saves_coalesce(self, tmp_path, monkeypatch):
+        """Test saves requested together are written once"""
+        saved = []
+        monkeypatch.setattr(snapshot, "save", lambda fs, path: saved.append(path))
+        path = str(tmp_path / "site.snapshot")
+        for _ in range(3):
+            snapshot.save_in_background("fs", path, delay=0.05)
+        timer = snapshot._pending[path]
+        timer.join(timeout=5)
+        assert saved == [path]
+        assert path not in snapshot._pending
@@ -0,0 +1,181 @@
+"""Tests for page sources and mounting them into the virtual filesystem"""
+import tarfile
+import zipfile
+import pytest
+import commands
+from commands import process_command, clear_result_cache
+import feed_service
+from feed_service import FeedService
+from sources import ArchiveSource, DirectorySource, FeedSource, open_source, post_files
+from vfs import VirtualFS
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    """Zip bundle with nested, hidden and non-text members"""
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("intro.md", "# Intro\nwelcome")
+        zf.writestr("notes/one.txt", "alpha\nbeta\ngamma")
+        zf.writestr("notes/two.txt", "delta")
+        zf.writestr(".hidden.txt", "secret")
+        zf.writestr("page.py", "def render(st): pass")
+        zf.writestr("image.png", b"\x89PNG")
+    return str(path)
+
+
+@pytest.fixture
+def fs(tmp_path, bundle, monkeypatch):
+    """A pages tree with the bundle mounted at docs, installed as the terminal's filesystem"""
+    pages = tmp_path / "pages"
+    pages.mkdir()
+    (pages / "about.txt").write_text("about me")
+    fs = VirtualFS(str(pages))
+    fs.mount("docs", ArchiveSource(bundle))
+    monkeypatch.setattr(commands, "filesystem", fs)
+    clear_result_cache()
+    yield fs
+    clear_result_cache()
+
+
+class TestArchiveSource:
+    """Tests for zip and tar bundles"""
+
+    def test_scan_lists_text_members_and_directories(self, bundle):
+        """Test scan lists text members and their directories, skipping the rest"""
+        entries = list(ArchiveSource(bundle).scan())
+        assert entries == [
+            ("", "intro.md", "file", "intro.md"),
+            ("", "notes", "dir", "notes"),
+            ("notes", "one.txt", "file", "notes/one.txt"),
+            ("notes", "two.txt", "file", "notes/two.txt"),
+        ]
+
+    def test_members_read_lazily_and_cached(self, bundle):
+        """Test members are read on first use and then cached"""
+        source = ArchiveSource(bundle)
+        list(source.scan())
+        assert source._read_member.cache_info().currsize == 0
+        assert source.read("intro.md") == ("markdown", "# Intro\nwelcome")
+        source.read("intro.md")
+        assert source._read_member.cache_info().hits == 1
+
+    def test_missing_member(self, bundle):
+        """Test reading a missing member raises FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            ArchiveSource(bundle).read("nope.txt")
+
+    def test_tar_bundle(self, tmp_path):
+        """Test tar bundles are opened by open_source"""
+        member = tmp_path / "a.txt"
+        member.write_text("from tar")
+        path = tmp_path / "bundle.tar.gz"
+        with tarfile.open(path, "w:gz") as tf:
+            tf.add(member, arcname="docs/a.txt")
+        source = open_source(str(path))
+        assert [entry[1] for entry in source.scan()] == ["docs", "a.txt"]
+        assert source.read("docs/a.txt") == ("text", "from tar")
+
+    def test_paged_reads(self, bundle):
+        """Test reading a range of a member's lines"""
+        assert ArchiveSource(bundle).read_lines("notes/one.txt", 1, 1) == ("beta", 2)
+        assert ArchiveSource(bundle).read_lines("notes/one.txt", 2, 5) == ("gamma", None)
+
+
+class TestFeedSource:
+    """Tests for files generated from a feed"""
+
+    @pytest.fixture
+    def feed(self, monkeypatch):
+        """A registered feed that has not been fetched yet"""
+        feed = FeedService("posts", lambda: [{"title": "Hello, World!", "url": "https://example.com/h", "tags": ["a"]}])
+        monkeypatch.setitem(feed_service._feeds, "posts", feed)
+        return feed
+
+    def test_files_follow_feed_data(self, feed):
+        """Test a feed source lists one file per fetched post"""
+        source = FeedSource("posts")
+        assert list(source.scan()) == []
+        feed.refresh()
+        assert [entry[1] for entry in source.scan()] == ["hello-world.md"]
+        assert source.read("hello-world.md") == ("markdown", "# Hello, World!\n\nhttps://example.com/h\n\nTags: a")
+
+    def test_scan_never_fetches(self, monkeypatch):
+        """Test scanning an unfetched or unknown feed lists nothing"""
+        feed = FeedService("down", lambda: pytest.fail("should not fetch"))
+        monkeypatch.setitem(feed_service._feeds, "down", feed)
+        assert list(FeedSource("down").scan()) == []
+        assert list(FeedSource("unknown").scan()) == []
+
+    def test_post_files_dedupes_names(self):
+        """Test posts with the same title get distinct file names"""
+        posts = [{"title": "Same"}, {"title": "Same"}, {"url": "no title"}]
+        assert sorted(post_files(posts)) == ["same-2.md", "same.md"]
+        assert post_files({"not": "posts"}) == {}
+
+    def test_mounted_feed_rescanned_on_refresh(self, fs, feed):
+        """Test a mounted feed is rescanned when the feed refreshes"""
+        fs.mount("posts", open_source("feed:posts"))
+        assert fs.lookup("posts").listing == ".."
+        version = fs.version
+        feed.refresh()
+        assert fs.version > version
+        assert process_command("ls posts")[1] == "..\nhello-world.md"
+        assert process_command("cat posts/hello-world")[1].startswith("# Hello, World!")
+
+
+class TestMount:
+    """Tests for mounting sources into the tree"""
+
+    def test_mount_point_listed_and_browsable(self, fs):
+        """Test a mount point is listed and its contents resolve"""
+        assert fs.root.listing == "about.txt\ndocs/"
+        assert fs.lookup("docs").listing == "..\nintro.md\nnotes/"
+        assert fs.resolve("notes/one", "docs").name == "one.txt"
+
+    def test_mount_bumps_version(self, fs, bundle):
+        """Test mounting bumps the filesystem version and creates parents"""
+        version = fs.version
+        fs.mount("more/bundles", ArchiveSource(bundle))
+        assert fs.version == version + 1
+        assert fs.lookup("more").listing == "..\nbundles/"
+
+    def test_remount_replaces_entries(self, fs, tmp_path):
+        """Test mounting over a mount point replaces its entries"""
+        other = tmp_path / "other"
+        other.mkdir()
+        (other / "x.txt").write_text("x")
+        fs.mount("docs", DirectorySource(str(other)))
+        assert fs.lookup("docs/notes") is None
+        assert fs.lookup("docs").listing == "..\nx.txt"
+
+    def test_cannot_mount_over_file_or_home(self, fs, bundle):
+        """Test files and the home directory cannot be mount points"""
+        with pytest.raises(ValueError):
+            fs.mount("about.txt", ArchiveSource(bundle))
+        with pytest.raises(ValueError):
+            fs.mount("~", ArchiveSource(bundle))
+
+    def test_freeze_skips_mounted_sources(self, fs, tmp_path):
+        """Test frozen manifests only contain the pages directory"""
+        manifest = str(tmp_path / "manifest.json")
+        fs.freeze(manifest)
+        assert VirtualFS(fs.pages_dir, manifest).root.listing == "about.txt"
+
+
+class TestCommandsOnSources:
+    """Tests for commands reading mounted content"""
+
+    def test_cat_from_archive(self, fs):
+        """Test cat reads archive members"""
+        assert process_command("cat docs/notes/two") == ("text", "delta", None)
+        assert process_command("cat intro", "docs") == ("markdown", "# Intro\nwelcome", None)
+
+    def test_grep_and_pipes_on_archive(self, fs):
+        """Test grep and pipelines read archive members"""
+        assert process_command("grep ta docs/notes/one.txt")[1] == "beta"
+        assert process_command("cat docs/notes/one | tail -1")[1] == "gamma"
+
+    def test_cd_into_mounted_directory(self, fs):
+        """Test cd into a directory of a mounted archive"""
+        assert process_command("cd docs/notes") == ("text", "..\none.txt\ntwo.txt", "docs/notes")
@@ -0,0 +1,99 @@
+"""Tests for the virtual filesystem tree"""
+import pytest
+from vfs import VirtualFS, normalize
+
+
+@pytest.fixture
+def fs(tmp_path):
+    """Build a small nested pages tree"""
+    (tmp_path / "about.txt").write_text("about")
+    (tmp_path / "notes.md").write_text("# notes")
+    (tmp_path / "blog.py").write_text("def render(st):\n    pass\n")
+    (tmp_path / "_helpers.py").write_text("")
+    projects = tmp_path / "projects"
+    projects.mkdir()
+    (projects / "readme.txt").write_text("readme")
+    (projects / "demo.py").write_text("def render(st):\n    pass\n")
+    return VirtualFS(str(tmp_path))
+
+
+class TestNormalize:
+    """Tests for path normalization"""
+
+    def test_relative_paths(self):
+        """Test relative paths are joined to the current directory"""
+        assert normalize("blog") == "blog"
+        assert normalize("readme.txt", "projects") == "projects/readme.txt"
+        assert normalize("./a/../b", "projects") == "projects/b"
+
+    def test_absolute_paths(self):
+        """Test ~ and /home prefixes resolve from home"""
+        assert normalize("~", "blog") == ""
+        assert normalize("/home", "blog") == ""
+        assert normalize("/home/projects/demo", "blog") == "projects/demo"
+        assert normalize("~/about.txt", "projects") == "about.txt"
+
+    def test_paths_outside_home(self):
+        """Test paths escaping home do not resolve"""
+        assert normalize("..") is None
+        assert normalize("/etc") is None
+        assert normalize("../..", "projects") is None
+
+
+class TestVirtualFS:
+    """Tests for the VirtualFS tree and index"""
+
+    def test_root_listing(self, fs):
+        """Test the root listing is sorted and hides private files"""
+        assert fs.root.listing == "about.txt\nblog/\nnotes.md\nprojects/"
+
+    def test_nested_listing(self, fs):
+        """Test nested directories list their parent entry first"""
+        assert fs.lookup("projects").listing == "..\ndemo/\nreadme.txt"
+
+    def test_aliases(self, fs):
+        """Test files resolve without extension and pages with .py"""
+        assert fs.resolve("about") is fs.resolve("about.txt")
+        assert fs.resolve("blog.py") is fs.resolve("blog")
+        assert fs.resolve("demo", "projects").key == "projects/demo"
+
+    def test_node_kinds(self, fs):
+        """Test node kinds and cwd values"""
+        assert fs.resolve("notes").kind == "file"
+        assert fs.resolve("blog").kind == "page"
+        assert fs.resolve("projects").kind == "dir"
+        assert fs.resolve("..", "projects").cwd == "~"
+
+    def test_missing_path(self, fs):
+        """Test unknown paths resolve to None"""
+        assert fs.resolve("nonexistent") is None
+        assert fs.resolve("_helpers") is None
+
+
+class TestManifest:
+    """Tests for freezing the tree into a manifest"""
+
+    def test_manifest_round_trip(self, fs, tmp_path):
+        """Test a frozen manifest rebuilds the same tree without scanning"""
+        manifest = str(tmp_path.parent / f"{tmp_path.name}-manifest.json")
+        fs.freeze(manifest)
+        loaded = VirtualFS(fs.pages_dir, manifest)
+        assert loaded.from_manifest
+        assert sorted(loaded.index) == sorted(fs.index)
+        assert loaded.root.listing == fs.root.listing
+        assert loaded.resolve("about").path == fs.resolve("about").path
+
+    def test_stale_manifest_rescans(self, fs, tmp_path):
+        """Test adding a page after freezing falls back to a scan"""
+        manifest = str(tmp_path.parent / f"{tmp_path.name}-manifest.json")
+        fs.freeze(manifest)
+        (tmp_path / "projects" / "new.txt").write_text("new")
+        loaded = VirtualFS(fs.pages_dir, manifest)
+        assert not loaded.from_manifest
+        assert loaded.resolve("projects/new") is not None
+
+    def test_missing_manifest(self, fs, tmp_path):
+        """Test a missing manifest is ignored"""
+        loaded = VirtualFS(fs.pages_dir, str(tmp_path / "nope.json"))
+        assert not loaded.from_manifest
+        assert loaded.root.listing == fs.root.listing
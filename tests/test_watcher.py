@@ -0,0 +1,156 @@
+"""Tests for incremental filesystem updates and the pages watcher"""
+import os
+import pytest
+import commands
+from commands import process_command, clear_result_cache
+from completion import complete
+from vfs import VirtualFS
+from watcher import PollingWatcher
+
+
+@pytest.fixture
+def pages(tmp_path):
+    """A small pages tree"""
+    (tmp_path / "about.txt").write_text("about me")
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "todo.md").write_text("# Todo")
+    return tmp_path
+
+
+@pytest.fixture
+def fs(pages, monkeypatch):
+    """Filesystem over the pages tree, installed as the terminal's filesystem"""
+    fs = VirtualFS(str(pages))
+    monkeypatch.setattr(commands, "filesystem", fs)
+    clear_result_cache()
+    yield fs
+    clear_result_cache()
+
+
+class TestApply:
+    """Tests for VirtualFS.apply"""
+
+    def test_add_file_page_and_directory(self, fs, pages):
+        """Test adding a page, a file and a new directory tree"""
+        (pages / "blog.py").write_text("def render(st): pass")
+        (pages / "docs" / "api").mkdir(parents=True)
+        (pages / "docs" / "api" / "index.md").write_text("# API")
+        version = fs.version
+        assert fs.apply(added=[str(pages / "blog.py"), str(pages / "docs"), str(pages / "docs" / "api" / "index.md")])
+        assert fs.version == version + 1
+        assert fs.root.listing == "about.txt\nblog/\ndocs/\nnotes/"
+        assert fs.resolve("docs/api/index").name == "index.md"
+        assert fs.resolve("blog.py").kind == "page"
+
+    def test_remove_entries_and_aliases(self, fs, pages):
+        """Test removing entries drops them and their aliases"""
+        os.remove(pages / "about.txt")
+        assert fs.apply(removed=[str(pages / "about.txt"), str(pages / "notes")])
+        assert fs.root.listing == ""
+        assert fs.lookup("about") is None and fs.lookup("notes/todo.md") is None
+
+    def test_alias_moves_to_remaining_sibling(self, fs, pages):
+        """Test an alias moves to the sibling left after a removal"""
+        (pages / "about.md").write_text("# About")
+        fs.apply(added=[str(pages / "about.md")])
+        assert fs.lookup("about").name == "about.txt"
+        fs.apply(removed=[str(pages / "about.txt")])
+        assert fs.lookup("about").name == "about.md"
+
+    def test_modified_bumps_version_only_for_known_paths(self, fs, pages):
+        """Test only changes to known paths bump the version"""
+        version = fs.version
+        assert fs.apply(modified=[str(pages / "about.txt")])
+        assert not fs.apply(modified=[str(pages / "missing.txt")], added=[str(pages / "gone.txt")])
+        assert fs.version == version + 1
+
+    def test_hidden_and_unknown_files_are_ignored(self, fs, pages):
+        """Test hidden files and unknown file types are not added"""
+        (pages / "_draft.md").write_text("x")
+        (pages / "image.png").write_bytes(b"x")
+        assert not fs.apply(added=[str(pages / "_draft.md"), str(pages / "image.png")])
+
+    def test_changes_since(self, fs, pages):
+        """Test changes since a version, and None after a mount"""
+        version = fs.version
+        (pages / "new.txt").write_text("new")
+        fs.apply(added=[str(pages / "new.txt")], removed=[str(pages / "about.txt")])
+        assert sorted((op, node.key) for op, node in fs.changes_since(version)) == [("add", "new.txt"), ("remove", "about.txt")]
+        fs.mount("more", fs.source)
+        assert fs.changes_since(version) is None
+
+
+class TestPollingWatcher:
+    """Tests for picking up changes on disk"""
+
+    def test_poll_detects_changes(self, fs, pages):
+        """Test polling finds added, removed and modified files once"""
+        watcher = PollingWatcher(fs)
+        (pages / "new.md").write_text("# New")
+        os.remove(pages / "notes" / "todo.md")
+        (pages / "about.txt").write_text("about me, edited")
+        changes = watcher.poll()
+        assert changes == {
+            "added": [str(pages / "new.md")],
+            "removed": [str(pages / "notes" / "todo.md")],
+            "modified": [str(pages / "about.txt")],
+        }
+        assert fs.lookup("notes").listing == ".."
+        assert watcher.poll() == {"added": [], "removed": [], "modified": []}
+
+    def test_commands_see_changes(self, fs, pages):
+        """Test commands and completion see polled changes"""
+        watcher = PollingWatcher(fs)
+        assert process_command("cat about") == ("text", "about me", None)
+        (pages / "about.txt").write_text("rewritten")
+        (pages / "guide.md").write_text("# Guide")
+        watcher.poll()
+        assert process_command("cat about") == ("text", "rewritten", None)
+        assert process_command("ls") == ("text", "about.txt\nguide.md\nnotes/", None)
+        assert complete("cat gu") == ["cat guide.md"]
+
+    def test_completion_follows_removals(self, fs, pages):
+        """Test removed paths are no longer completed"""
+        watcher = PollingWatcher(fs)
+        assert complete("cat no") == ["cat notes/"]
+        os.remove(pages / "notes" / "todo.md")
+        os.rmdir(pages / "notes")
+        watcher.poll()
+        assert complete("cat no") == []
+
+
+class TestLargeDirectories:
+    """Tests for paged listings"""
+
+    @pytest.fixture
+    def big(self, fs, pages):
+        """Filesystem with a directory of 450 posts"""
+        (pages / "big").mkdir()
+        for i in range(450):
+            (pages / "big" / f"post{i:03d}.md").write_text("x")
+        fs.apply(added=[str(pages / "big")])
+        return fs
+
+    def test_ls_pages_large_directory(self, big):
+        """Test ls shows a large directory a page at a time"""
+        content = process_command("ls big")[1].splitlines()
+        assert content[:2] == ["..", "post000.md"]
+        assert content[-1] == "-- more: ls big --offset 200 --"
+        content = process_command("ls big --offset 400")[1].splitlines()
+        assert content[0] == "post400.md" and content[-1] == "post449.md"
+
+    def test_cd_shows_first_page(self, big):
+        """Test cd into a large directory lists its first page"""
+        result = process_command("cd big")
+        assert result[1].endswith("-- more: ls --offset 200 --")
+        assert process_command("ls --offset 200 --limit 2", "big")[1] == "post200.md\npost201.md\n-- more: ls . --offset 202 --"
+
+    def test_zero_limit_rejected(self, big):
+        """Test ls rejects --limit 0, also in a pipeline"""
+        assert process_command("ls big --limit 0")[1] == "ls: option --limit requires a positive number"
+        assert process_command("ls big --limit 0 | wc -l")[1] == "ls: option --limit requires a positive number"
+
+    def test_pipes_see_every_entry(self, big):
+        """Test pipelines read every entry, not only the first page"""
+        assert process_command("ls big | wc -l")[1] == "451"
+        assert process_command("ls big | grep post44")[1].count("\n") == 9
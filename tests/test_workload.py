@@ -0,0 +1,107 @@
+"""Tests for recording, generating and replaying workloads"""
+import io
+import json
+import pytest
+import workload
+from engine import Session
+from workload import Record, Recorder, assign, generate, parse_mix, read_log, replay, write_log
+
+
+class TestRecorder:
+    """Tests for the append-only command log"""
+
+    def test_sessions_record_commands(self, tmp_path):
+        """Test sessions log each command with its directory and latency"""
+        path = tmp_path / "commands.log"
+        session = Session("alice", rate_limits=None, recorder=Recorder(str(path)))
+        session.run("cd blog")
+        session.run("pwd")
+        records = read_log(str(path))
+        assert [(r.session, r.cwd, r.cmd) for r in records] == [("alice", "~", "cd blog"), ("alice", "blog", "pwd")]
+        assert all(r.latency >= 0 and r.timestamp > 0 for r in records)
+
+    def test_not_recorded_by_default(self):
+        """Test nothing is recorded unless SIGTERM_RECORD is set"""
+        assert Session().recorder is workload.recorder is None
+
+    def test_torn_lines_are_skipped(self, tmp_path):
+        """Test a partly written last line is skipped when reading"""
+        path = tmp_path / "commands.log"
+        Recorder(str(path)).record("s", "ls", "~", 0.002, timestamp=1.0)
+        with open(path, "a") as f:
+            f.write('[2.0,"s","~",0.1,"pw')
+        assert read_log(str(path)) == [Record(1.0, "s", "~", 0.002, "ls")]
+
+    def test_write_errors_are_counted(self, tmp_path):
+        """Test a log that cannot be written counts errors instead of raising"""
+        recorder = Recorder(str(tmp_path / "missing" / "commands.log"))
+        recorder.record("s", "ls", "~", 0.0)
+        assert recorder.stats == {"records": 0, "errors": 1}
+
+
+class TestGenerate:
+    """Tests for the synthetic workload generator"""
+
+    def test_deterministic_for_a_seed(self):
+        """Test the same seed generates the same workload"""
+        assert generate(seed=4, sessions=5, commands=20) == generate(seed=4, sessions=5, commands=20)
+        assert generate(seed=4, sessions=5, commands=20) != generate(seed=5, sessions=5, commands=20)
+
+    def test_follows_mix(self):
+        """Test generated commands follow the mix weights in time order"""
+        records = generate({"ls": 9, "pwd": 1}, sessions=20, commands=100, seed=1)
+        assert len(records) == 2000
+        assert len({r.session for r in records}) == 20
+        assert 0.85 < sum(r.cmd == "ls" for r in records) / len(records) < 0.95
+        assert records == sorted(records, key=lambda r: r.timestamp)
+
+    def test_parse_mix(self):
+        """Test parsing command=weight mixes"""
+        assert parse_mix("ls=5, cat about=2,echo a=b=1,pwd") == {"ls": 5, "cat about": 2, "echo a=b": 1, "pwd": 1}
+        with pytest.raises(ValueError):
+            parse_mix("ls=often")
+
+    def test_log_round_trip(self, tmp_path):
+        """Test generated records read back from a written log"""
+        records = generate(sessions=2, commands=3, seed=2)
+        buffer = io.StringIO()
+        write_log(records, buffer)
+        path = tmp_path / "synthetic.log"
+        path.write_text(buffer.getvalue())
+        assert read_log(str(path)) == records
+
+
+class TestReplay:
+    """Tests for replaying logs with virtual sessions"""
+
+    def test_assign_scales_sessions(self):
+        """Test recorded sessions are split or merged into the requested number"""
+        records = [Record(float(i), f"s{i % 3}", None, 0.0, "pwd") for i in range(6)]
+        assert len(assign(records)) == 3
+        assert [len(stream) for stream in assign(records, 5)] == [2, 2, 2, 2, 2]
+        merged = assign(records, 2)
+        assert [len(stream) for stream in merged] == [4, 2]
+        assert [r.timestamp for r in merged[0]] == [0.0, 2.0, 3.0, 5.0]
+
+    def test_replay_runs_every_command(self):
+        """Test replay runs every command and counts errors and latency"""
+        records = generate({"ls": 1, "cd blog": 1, "cd ..": 1, "nope": 1}, sessions=4, commands=25, seed=3)
+        results = replay(records, sessions=8, speed=0)
+        assert results["sessions"] == 8 and results["commands"] == 200
+        assert 0 < results["errors"] < 200
+        assert results["latency"]["n"] == 200
+
+    def test_replay_keeps_recorded_pace(self):
+        """Test replay waits between commands as recorded, scaled by speed"""
+        records = [Record(100.0, "s", "~", 0.0, "pwd"), Record(100.2, "s", "blog", 0.0, "pwd")]
+        results = replay(records, speed=2)
+        assert 0.09 < results["seconds"] < 1
+        assert results["errors"] == 0
+
+    def test_cli(self, tmp_path, capsys):
+        """Test generating a workload and replaying it from the command line"""
+        log = tmp_path / "synthetic.log"
+        assert workload.main(["generate", "--sessions", "2", "--commands", "5", "--mix", "pwd"]) == 0
+        log.write_text(capsys.readouterr().out)
+        assert workload.main(["replay", str(log), "--speed", "0"]) == 0
+        assert json.loads(capsys.readouterr().out)["commands"] == 10
@@ -0,0 +1,480 @@
+"""In-memory virtual filesystem assembled from mounted page sources
+
+The pages directory is mounted at home and scanned at import. A frozen
+manifest (python vfs.py freeze) lets a process skip that scan: it is used
+whenever the modification times of all directories it lists still match.
+Further sources (archives, feeds, other directories) can be mounted at any
+path with VirtualFS.mount(), and VirtualFS.apply() updates single entries as
+files appear, change or disappear on disk (see watcher.py).
+"""
+
+import bisect
+import json
+import os
+import sys
+import threading
+from collections import deque
+from functools import lru_cache
+
+from content_store import PAGE_LINES
+from sources import DirectorySource, PAGE_EXTENSIONS, TEXT_EXTENSIONS, classify, visible  # noqa: F401 (re-exported)
+
+
+# Absolute path the terminal shows for the home directory
+HOME = "/home"
+
+# Manifest format version, bumped when the layout changes
+MANIFEST_VERSION = 1
+
+# Entry additions and removals remembered for VirtualFS.changes_since()
+JOURNAL_SIZE = 4096
+
+
+class Node:
+    """A file, directory or page in the virtual filesystem
+
+    Attributes:
+        name: Entry name as shown by ls (e.g. "about.txt", "blog")
+        kind: "dir", "page" or "file"
+        key: Normalized path relative to home ("" for home itself)
+        path: Location of the entry within its source (a path on disk for
+            directory sources), None for the home directory and mount points
+        parent: Parent node, None for the home directory
+        source: PageSource the entry's contents are read from
+        children: Child nodes keyed by name
+        names: Child names in sorted order, kept sorted as entries come and go
+        alias: Alternative name also indexed for this entry (about for
+            about.txt, blog.py for the blog page), None if there is none
+    """
+
+    def __init__(self, name, kind, key, path=None, parent=None, source=None):
+        self.name = name
+        self.kind = kind
+        self.key = key
+        self.path = path
+        self.parent = parent
+        self.source = source
+        self.children = {}
+        self.names = []
+        self.alias = None
+        self._listing = None
+
+    @property
+    def listing(self):
+        """ls output for this node, built on first use after its entries change"""
+        if not self.is_dir:
+            return self.name
+        listing = self._listing
+        if listing is None:
+            listing = self._listing = "\n".join(self.iter_labels())
+        return listing
+
+    def iter_labels(self):
+        """Yield the lines of ls output: .. (below home) then entries in name order"""
+        if not self.is_dir:
+            yield self.name
+            return
+        if self.parent is not None:
+            yield ".."
+        children = self.children
+        for name in list(self.names):
+            child = children.get(name)
+            if child is not None:
+                yield child.label
+
+    def list_page(self, offset=0, limit=PAGE_LINES):
+        """Return (text, next_offset) for a page of entries, next_offset None at the end
+
+        Offsets count entries; .. heads the first page.
+        """
+        names = self.names[offset:offset + limit]
+        labels = [child.label for child in map(self.children.get, names) if child is not None]
+        if offset == 0 and self.parent is not None:
+            labels.insert(0, "..")
+        next_offset = offset + limit if offset + limit < len(self.names) else None
+        return "\n".join(labels), next_offset
+
+    @property
+    def is_dir(self):
+        """Pages and directories can be entered with cd"""
+        return self.kind != "file"
+
+    @property
+    def label(self):
+        """Entry as it appears in a directory listing"""
+        return f"{self.name}/" if self.is_dir else self.name
+
+    @property
+    def cwd(self):
+        """Value used for current_dir when this node is the working directory"""
+        return self.key or "~"
+
+    @property
+    def stem(self):
+        """Name without its file extension"""
+        return os.path.splitext(self.name)[0] if self.kind == "file" else self.name
+
+
+@lru_cache(maxsize=4096)
+def normalize(target, current_dir="~"):
+    """Resolve a path typed by the user to a key relative to home
+
+    Args:
+        target: Absolute (/home/..., ~/...) or relative path, may contain . and ..
+        current_dir: Current directory context (~ for root, or directory key)
+
+    Returns:
+        str: Normalized key ("" for home), or None if the path leaves home
+    """
+    if target == "~" or target.startswith("~/"):
+        parts, rest = [], target[2:]
+    elif target == HOME or target.startswith(HOME + "/"):
+        parts, rest = [], target[len(HOME) + 1:]
+    elif target.startswith("/"):
+        return None
+    else:
+        parts = [] if current_dir in ("~", "") else current_dir.split("/")
+        rest = target
+
+    for part in rest.split("/"):
+        if part in ("", "."):
+            continue
+        if part == "..":
+            if not parts:
+                return None
+            parts.pop()
+        else:
+            parts.append(part)
+    return "/".join(parts)
+
+
+class VirtualFS:
+    """Node tree with a flat path index for constant-time lookups
+
+    Args:
+        pages_dir: Directory mounted at home (None for an empty tree)
+        manifest_path: Frozen manifest to load instead of scanning, if still current
+        manifest: Already loaded manifest (see manifest()), tried before manifest_path
+    """
+
+    def __init__(self, pages_dir=None, manifest_path=None, manifest=None):
+        self.pages_dir = pages_dir
+        self.source = DirectorySource(pages_dir) if pages_dir is not None else None
+        self.root = Node("~", "dir", "")
+        self.index = {"": self.root}
+        # Bumped whenever the tree changes so callers can invalidate caches
+        self.version = 0
+        self.from_manifest = False
+        # {mount point key: source} for sources mounted after construction
+        self.mounts = {}
+        # (version, "add" or "remove", node) for incremental consumers; it
+        # covers every change after version _journal_start
+        self._journal = deque()
+        self._journal_start = 0
+        # Serializes changes; readers use the index without locking
+        self._lock = threading.Lock()
+        if pages_dir is not None:
+            if manifest is not None and self._restore(manifest):
+                self.from_manifest = True
+            elif manifest_path is not None and self._load_manifest(manifest_path):
+                self.from_manifest = True
+            else:
+                self._attach(self.root, self.source)
+
+    def mount(self, key, source):
+        """Attach a source's entries under key, replacing anything mounted there
+
+        Missing directories on the way to key are created. Returns the mount
+        point node.
+
+        Raises:
+            ValueError: If key is home or an existing file or page
+        """
+        key = normalize(key, "~")
+        if not key:
+            raise ValueError("cannot mount over home")
+        with self._lock:
+            node = self.index.get(key)
+            if node is not None and node.kind != "dir":
+                raise ValueError(f"{key}: not a directory")
+            if node is None:
+                parent = self.root
+                for part in key.split("/"):
+                    parent = self.index.get(f"{parent.key}/{part}" if parent.key else part) or \
+                        self._add(parent, part, "dir", None)
+                node = parent
+            self._detach(node)
+            self._attach(node, source)
+            self.mounts[key] = source
+            self.version += 1
+            # Too many changes to journal one by one
+            self._journal.clear()
+            self._journal_start = self.version
+        return self.index[key]
+
+    def apply(self, added=(), removed=(), modified=()):
+        """Update the tree for paths under pages_dir that changed on disk
+
+        Work is proportional to the number of changed paths: entries are added
+        to or removed from their directory's sorted names and index, and only
+        an added directory is scanned (its own subtree). Paths that are not
+        shown in the tree are ignored.
+
+        Args:
+            added: Paths of new files and directories
+            removed: Paths that no longer exist
+            modified: Paths of files whose contents changed
+
+        Returns:
+            bool: True if the tree or a file in it changed (version is bumped)
+        """
+        with self._lock:
+            version = self.version + 1
+            changed = False
+            for path in removed:
+                node = self._node_at(path)
+                if node is not None:
+                    self._remove(node, version)
+                    changed = True
+            for path in sorted(added):
+                changed = self._add_path(path, version) or changed
+            # Contents are revalidated by mtime on read; cached results are
+            # keyed on the version, so bumping it is all a modification needs
+            changed = changed or any(self._node_at(path) is not None for path in modified)
+            if changed:
+                self.version = version
+            return changed
+
+    def changes_since(self, version):
+        """Return [("add" or "remove", node)] made after version, None if not all are known"""
+        if version < self._journal_start:
+            return None
+        return [(op, node) for changed, op, node in list(self._journal) if changed > version]
+
+    def _record(self, version, op, node):
+        if len(self._journal) >= JOURNAL_SIZE:
+            self._journal_start = self._journal.popleft()[0]
+        self._journal.append((version, op, node))
+
+    def _node_at(self, path):
+        """Return the pages directory node for a path on disk, None if it is not in the tree"""
+        if self.pages_dir is None:
+            return None
+        relpath = os.path.relpath(path, self.pages_dir)
+        if relpath == "." or relpath.startswith(".."):
+            return None
+        parent_key, _, name = relpath.replace(os.sep, "/").rpartition("/")
+        parent = self.index.get(parent_key)
+        if parent is None or parent.key != parent_key:
+            return None
+        for candidate in (name, os.path.splitext(name)[0]):
+            node = parent.children.get(candidate)
+            if node is not None and node.path == path and node.source is self.source:
+                return node
+        return None
+
+    def _add_path(self, path, version):
+        """Add a new file or directory (with its contents) from the pages directory"""
+        relpath = os.path.relpath(path, self.pages_dir)
+        if relpath == "." or relpath.startswith(".."):
+            return False
+        parts = relpath.split(os.sep)
+        if not all(visible(part) for part in parts) or not os.path.exists(path):
+            return False
+        parent = self.index.get("/".join(parts[:-1]))
+        if parent is None:
+            # Parent directory is new too; adding it scans this path as well
+            return os.path.isdir(os.path.dirname(path)) and self._add_path(os.path.dirname(path), version)
+        # Mounted sources own the directories they were mounted at
+        if parent.kind != "dir" or (parent is not self.root and parent.source is not self.source):
+            return False
+        name = parts[-1]
+        if os.path.isdir(path):
+            node = self._add(parent, name, "dir", path, source=self.source)
+            if node is not None:
+                self._record(version, "add", node)
+                for entry in self._attach(node, self.source, self.source.scan(path)):
+                    self._record(version, "add", entry)
+        else:
+            kind = classify(name)
+            if kind == "page":
+                node = self._add(parent, os.path.splitext(name)[0], "page", path, alias=name, source=self.source)
+            elif kind == "file":
+                node = self._add(parent, name, "file", path, alias=os.path.splitext(name)[0], source=self.source)
+            else:
+                node = None
+            if node is not None:
+                self._record(version, "add", node)
+        return node is not None
+
+    def _remove(self, node, version):
+        """Remove node and its descendants from the tree"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            stack.extend(current.children.values())
+            self._unindex(current)
+            self._record(version, "remove", current)
+        parent = node.parent
+        del parent.children[node.name]
+        del parent.names[bisect.bisect_left(parent.names, node.name)]
+        parent._listing = None
+        self._repoint(parent, node.name)
+        if node.alias is not None:
+            self._repoint(parent, node.alias)
+
+    def _unindex(self, node):
+        """Drop the index entries (key and alias) that point at node"""
+        if self.index.get(node.key) is node:
+            del self.index[node.key]
+        if node.alias is not None:
+            alias_key = f"{node.parent.key}/{node.alias}" if node.parent.key else node.alias
+            if self.index.get(alias_key) is node:
+                del self.index[alias_key]
+
+    def _repoint(self, parent, name):
+        """Give a freed name in parent to a sibling using it as its alias (about -> about.md)"""
+        key = f"{parent.key}/{name}" if parent.key else name
+        if key in self.index:
+            return
+        # Files are aliased by their stem, pages by their file name
+        for candidate in [name + ext for ext in TEXT_EXTENSIONS] + [os.path.splitext(name)[0]]:
+            sibling = parent.children.get(candidate)
+            if sibling is not None and sibling.alias == name:
+                self.index[key] = sibling
+                return
+
+    def _attach(self, node, source, entries=None):
+        """Add every entry a source lists (or the given scan entries) beneath node
+
+        Returns:
+            list: The nodes added
+        """
+        added = []
+        for parent, name, kind, location in source.scan() if entries is None else entries:
+            parent_key = "/".join(filter(None, (node.key, parent)))
+            if kind == "page":
+                stem = os.path.splitext(name)[0]
+                child = self._add(self.index[parent_key], stem, "page", location, alias=name, source=source)
+            elif kind == "file":
+                alias = os.path.splitext(name)[0]
+                child = self._add(self.index[parent_key], name, "file", location, alias=alias, source=source)
+            else:
+                child = self._add(self.index[parent_key], name, "dir", location, source=source)
+            if child is not None:
+                added.append(child)
+        return added
+
+    def _detach(self, node):
+        """Remove all descendants of node (and their aliases) from the tree"""
+        stack = list(node.children.values())
+        while stack:
+            current = stack.pop()
+            stack.extend(current.children.values())
+            self._unindex(current)
+        node.children.clear()
+        node.names.clear()
+        node._listing = None
+
+    def _load_manifest(self, manifest_path):
+        """Build the tree from a frozen manifest, returning False if it is stale"""
+        try:
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return self._restore(manifest)
+
+    def _restore(self, manifest):
+        """Build the tree from a manifest dict, returning False if it is stale"""
+        try:
+            if manifest.get("version") != MANIFEST_VERSION:
+                return False
+            for relpath, mtime in manifest["dirs"].items():
+                if os.stat(os.path.join(self.pages_dir, relpath)).st_mtime_ns != mtime:
+                    return False
+        except (OSError, ValueError, KeyError, AttributeError):
+            return False
+
+        for parent_key, name, kind, relpath in manifest["entries"]:
+            path = os.path.join(self.pages_dir, relpath)
+            if kind == "page":
+                alias = os.path.basename(relpath)
+            elif kind == "file":
+                alias = os.path.splitext(name)[0]
+            else:
+                alias = None
+            self._add(self.index[parent_key], name, kind, path, alias=alias, source=self.source)
+        return True
+
+    def manifest(self):
+        """Return the pages directory part of the tree as a JSON-compatible dict"""
+        dirs = {".": os.stat(self.pages_dir).st_mtime_ns}
+        entries = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for child in list(node.children.values()):
+                if child.source is not self.source:
+                    continue
+                relpath = os.path.relpath(child.path, self.pages_dir)
+                entries.append([node.key, child.name, child.kind, relpath])
+                if child.kind == "dir":
+                    dirs[relpath] = os.stat(child.path).st_mtime_ns
+                    stack.append(child)
+        return {"version": MANIFEST_VERSION, "dirs": dirs, "entries": entries}
+
+    def freeze(self, manifest_path):
+        """Write the pages directory part of the tree to a manifest file"""
+        with open(manifest_path, "w") as f:
+            json.dump(self.manifest(), f)
+
+    def _add(self, parent, name, kind, path, alias=None, source=None):
+        """Attach a node to parent and register it (and its alias) in the index
+
+        An entry's own name takes precedence over another entry's alias.
+        Returns None if parent already has an entry with that name.
+        """
+        key = f"{parent.key}/{name}" if parent.key else name
+        existing = self.index.get(key)
+        if existing is not None and existing.key == key:
+            return None
+        node = Node(name, kind, key, path, parent, source)
+        node.alias = alias
+        parent.children[name] = node
+        bisect.insort(parent.names, name)
+        parent._listing = None
+        self.index[key] = node
+        if alias is not None:
+            alias_key = f"{parent.key}/{alias}" if parent.key else alias
+            self.index.setdefault(alias_key, node)
+        return node
+
+    def lookup(self, key):
+        """Return the node for a normalized key or current_dir value"""
+        return self.index.get("" if key == "~" else key)
+
+    def resolve(self, target, current_dir="~"):
+        """Return the node a user-typed path refers to, or None"""
+        key = normalize(target, current_dir)
+        if key is None:
+            return None
+        return self.index.get(key)
+
+
+def main(argv):
+    """Freeze a pages directory: python vfs.py freeze [pages_dir] [manifest_path]"""
+    if len(argv) < 2 or argv[1] != "freeze":
+        print(main.__doc__)
+        return 2
+    here = os.path.dirname(os.path.abspath(__file__))
+    pages_dir = argv[2] if len(argv) > 2 else os.path.join(here, "pages")
+    manifest_path = argv[3] if len(argv) > 3 else os.path.join(here, "pages_manifest.json")
+    fs = VirtualFS(pages_dir)
+    fs.freeze(manifest_path)
+    print(f"Froze {len(fs.index) - 1} paths from {pages_dir} into {manifest_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,146 @@
+"""Keep the virtual filesystem in sync with the pages directory while running
+
+A background thread polls the pages directory and applies what changed to
+the VirtualFS one entry at a time (VirtualFS.apply), so new pages appear,
+deleted ones disappear and edits show up without a restart or rescan of
+the tree. Cached contents of removed or edited files are dropped and the
+site snapshot is rewritten at most once every SNAPSHOT_DELAY seconds, so a
+burst of edits costs one rewrite rather than one per change.
+
+Each poll lists the directories and stats the files that are shown in the
+tree (a few milliseconds per thousand files); applying the changes costs time
+proportional to the number of changed paths. Set SIGTERM_WATCH to the poll
+interval in seconds, or to off to disable watching.
+"""
+
+import os
+import threading
+
+import content_store
+import metrics
+import snapshot
+from sources import classify, visible
+
+
+# Seconds between polls, None when watching is disabled
+WATCH_INTERVAL = os.environ.get("SIGTERM_WATCH", "2")
+WATCH_INTERVAL = None if WATCH_INTERVAL.lower() == "off" else float(WATCH_INTERVAL)
+
+# Seconds between a change and the snapshot rewrite it triggers; changes in
+# between are written together
+SNAPSHOT_DELAY = 30.0
+
+
+class PollingWatcher:
+    """Detect added, removed and modified entries of a VirtualFS's pages directory
+
+    Args:
+        fs: VirtualFS whose pages directory is watched
+        interval: Seconds between polls of the background thread
+        on_change: Function called with no arguments after changes were applied
+    """
+
+    def __init__(self, fs, interval=2.0, on_change=None):
+        self.fs = fs
+        self.interval = interval
+        self.on_change = on_change
+        self.stats = {"polls": 0, "changes": 0}
+        # {path: (is_dir, mtime_ns, size)}; directories carry no mtime or size
+        self._state = self._walk()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _walk(self):
+        """Return the signature of every entry that is (or would be) shown in the tree"""
+        state = {}
+        stack = [self.fs.pages_dir]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    entries = list(entries)
+            except OSError:
+                continue
+            for entry in entries:
+                if not visible(entry.name):
+                    continue
+                try:
+                    if entry.is_dir():
+                        state[entry.path] = (True, None, None)
+                        stack.append(entry.path)
+                    elif classify(entry.name) is not None:
+                        st = entry.stat()
+                        state[entry.path] = (False, st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+        return state
+
+    def poll(self):
+        """Check the pages directory once and apply any changes
+
+        Returns:
+            dict: {"added": [...], "removed": [...], "modified": [...]} paths
+        """
+        with metrics.timed("watch", "poll"):
+            current = self._walk()
+        previous, self._state = self._state, current
+        self.stats["polls"] += 1
+
+        added, removed, modified = [], [], []
+        for path, signature in current.items():
+            old = previous.get(path)
+            if old is None:
+                added.append(path)
+            elif old[0] != signature[0]:
+                # Replaced a file with a directory or the other way round
+                removed.append(path)
+                added.append(path)
+            elif old != signature:
+                modified.append(path)
+        removed.extend(path for path in previous if path not in current)
+
+        changes = {"added": added, "removed": removed, "modified": modified}
+        if added or removed or modified:
+            self.apply(changes)
+        return changes
+
+    def apply(self, changes):
+        """Apply changed paths to the filesystem and drop stale cached contents"""
+        with metrics.timed("watch", "apply"):
+            changed = self.fs.apply(changes["added"], changes["removed"], changes["modified"])
+            for path in changes["removed"] + changes["modified"]:
+                content_store.store.discard(path)
+        if changed:
+            self.stats["changes"] += 1
+            if self.on_change is not None:
+                self.on_change()
+
+    def start(self):
+        """Poll in a daemon thread until stop() is called"""
+        def run():
+            while not self._stop.wait(self.interval):
+                try:
+                    self.poll()
+                except Exception:
+                    # A failed poll is retried at the next interval
+                    continue
+
+        self._thread = threading.Thread(target=run, name="sigterm-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def watch(fs, interval=None):
+    """Start watching fs's pages directory, returning the watcher (None if disabled)
+
+    interval defaults to WATCH_INTERVAL.
+    """
+    interval = WATCH_INTERVAL if interval is None else interval
+    if interval is None or fs.pages_dir is None:
+        return None
+    return PollingWatcher(fs, interval,
+                          on_change=lambda: snapshot.save_in_background(fs, delay=SNAPSHOT_DELAY)).start()
@@ -0,0 +1,296 @@
+"""Record, generate and replay command workloads for capacity planning
+
+Recording is opt-in: with SIGTERM_RECORD=path set, every command run by the
+app or an engine session is appended to path as one JSON array per line:
+
+    [timestamp, session, cwd, latency_ms, cmd]
+
+Each record is written with a single O_APPEND write, so several worker
+processes can share one log. Logs can also be generated from a weighted
+command mix with a fixed seed, and either kind is replayed against the
+engine by N virtual sessions at the recorded pace, sped up, or as fast as
+possible (--speed 0).
+
+Usage:
+    python workload.py generate --sessions 50 --commands 200 --mix "ls=5,cat about=3,cd blog=1" --seed 7 > synthetic.log
+    python workload.py replay recorded.log [--sessions 200] [--speed 10]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from ratelimit import RATE_LIMITS
+
+
+# Log file commands are recorded to (unset to disable recording)
+RECORD_PATH = os.environ.get("SIGTERM_RECORD")
+
+# Weighted command mix used by generate() when none is given
+DEFAULT_MIX = {
+    "help": 1, "ls": 6, "cat about": 4, "cd blog": 3, "cd ..": 3,
+    "pwd": 2, "whoami": 1, "grep regression blog": 1, "echo hi": 1,
+}
+
+Record = namedtuple("Record", "timestamp session cwd latency cmd")
+
+
+class Recorder:
+    """Append-only command log
+
+    Write errors are counted and otherwise ignored so recording can never
+    break a session.
+
+    Args:
+        path: Log file, created on first use
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.stats = {"records": 0, "errors": 0}
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def record(self, session, cmd, cwd, latency, timestamp=None):
+        """Append one command: session id, command line, directory it ran in, seconds taken"""
+        timestamp = time.time() if timestamp is None else timestamp
+        line = json.dumps([round(timestamp, 6), session, cwd, round(latency * 1000, 3), cmd],
+                          separators=(",", ":"), ensure_ascii=False)
+        data = (line + "\n").encode("utf-8")
+        with self._lock:
+            try:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                os.write(self._fd, data)
+                self.stats["records"] += 1
+            except OSError:
+                self.stats["errors"] += 1
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+# Recorder shared by all sessions in this process, None unless SIGTERM_RECORD is set
+recorder = Recorder(RECORD_PATH) if RECORD_PATH else None
+
+
+def read_log(path):
+    """Return the Records in a log, skipping malformed lines (e.g. a torn last write)"""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                timestamp, session, cwd, latency, cmd = json.loads(line)
+                records.append(Record(float(timestamp), str(session), cwd, float(latency) / 1000, cmd))
+            except (ValueError, TypeError):
+                continue
+    return records
+
+
+def write_log(records, f):
+    """Write Records to an open text file in the log format"""
+    for record in records:
+        f.write(json.dumps([round(record.timestamp, 6), record.session, record.cwd,
+                            round(record.latency * 1000, 3), record.cmd],
+                           separators=(",", ":"), ensure_ascii=False) + "\n")
+
+
+def parse_mix(spec):
+    """Parse "cmd=weight,..." into a mix dict (weight defaults to 1)
+
+    Raises:
+        ValueError: If a weight is not a positive number
+    """
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        cmd, sep, weight = item.rpartition("=")
+        if not sep:
+            cmd, weight = item, "1"
+        try:
+            mix[cmd.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"invalid mix entry {item!r}, expected cmd=weight")
+        if mix[cmd.strip()] <= 0:
+            raise ValueError(f"invalid mix entry {item!r}, weight must be positive")
+    return mix
+
+
+def generate(mix=None, sessions=10, commands=100, think=2.0, ramp=10.0, seed=0, start=0.0):
+    """Build a synthetic log; the same arguments always give the same workload
+
+    Args:
+        mix: {cmd: weight} drawn from independently for every command
+        sessions: Number of virtual users
+        commands: Commands per user
+        think: Mean seconds between a user's commands (exponentially distributed)
+        ramp: Users start at random times within the first ramp seconds
+        seed: Random seed
+        start: Timestamp of the start of the workload
+
+    Returns:
+        list: Records sorted by timestamp (cwd None and latency 0)
+    """
+    mix = DEFAULT_MIX if mix is None else mix
+    rng = random.Random(seed)
+    cmds, weights = list(mix), list(mix.values())
+    records = []
+    for index in range(sessions):
+        session = f"synthetic-{index}"
+        timestamp = start + rng.uniform(0, ramp)
+        for cmd in rng.choices(cmds, weights, k=commands):
+            records.append(Record(round(timestamp, 6), session, None, 0.0, cmd))
+            timestamp += rng.expovariate(1 / think) if think > 0 else 0
+    records.sort(key=lambda record: record.timestamp)
+    return records
+
+
+def assign(records, sessions=None):
+    """Split records into per-virtual-session command streams
+
+    Recorded sessions keep their own order. With fewer virtual sessions than
+    recorded ones, several recordings are merged by timestamp into one
+    virtual session; with more, recordings are reused round robin.
+
+    Returns:
+        list: One list of Records per virtual session
+    """
+    streams = {}
+    for record in records:
+        streams.setdefault(record.session, []).append(record)
+    streams = list(streams.values())
+    if not streams:
+        return []
+    sessions = len(streams) if sessions is None else sessions
+    if sessions >= len(streams):
+        return [streams[index % len(streams)] for index in range(sessions)]
+    merged = [[] for _ in range(sessions)]
+    for index, stream in enumerate(streams):
+        merged[index % sessions].extend(stream)
+    return [sorted(stream, key=lambda record: record.timestamp) for stream in merged]
+
+
+def percentiles(samples):
+    """Return n, p50, p90, p99 and max of samples in milliseconds"""
+    samples = sorted(samples)
+    if not samples:
+        return {"n": 0}
+
+    def pct(p):
+        return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 3)
+
+    return {"n": len(samples), "p50_ms": pct(0.50), "p90_ms": pct(0.90), "p99_ms": pct(0.99),
+            "max_ms": round(samples[-1] * 1000, 3)}
+
+
+def replay(records, sessions=None, speed=1.0, rate_limits=None):
+    """Run records against the engine with parallel virtual sessions
+
+    Args:
+        records: Records from read_log() or generate()
+        sessions: Number of virtual sessions (one per recorded session when None)
+        speed: Time compression factor (2 = twice as fast as recorded), 0 to
+            run every command as soon as the previous one of its session ends
+        rate_limits: Session rate limits, None to measure raw capacity
+
+    Returns:
+        dict: Totals with latency and schedule lag percentiles; lag is how late
+        commands started compared with the scaled recording, so a growing lag
+        means the engine cannot keep up with the offered load
+    """
+    from commands import failed
+    from engine import Session
+
+    streams = assign(records, sessions)
+    origin = min((record.timestamp for record in records), default=0.0)
+    latencies, lags = [], []
+    totals = {"commands": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def run_stream(index, stream, started):
+        session = Session(f"replay-{index}", rate_limits=rate_limits, recorder=None)
+        for record in stream:
+            lag = 0.0
+            if speed > 0:
+                due = started + (record.timestamp - origin) / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    lag = -delay
+            if record.cwd is not None:
+                session.cwd = record.cwd
+            begin = time.perf_counter()
+            result = session.run(record.cmd)
+            elapsed = time.perf_counter() - begin
+            with lock:
+                latencies.append(elapsed)
+                lags.append(lag)
+                totals["commands"] += 1
+                totals["errors"] += failed(record.cmd, result)
+
+    started = time.perf_counter()
+    if streams:
+        with ThreadPoolExecutor(max_workers=len(streams), thread_name_prefix="sigterm-replay") as pool:
+            for future in [pool.submit(run_stream, index, stream, started) for index, stream in enumerate(streams)]:
+                future.result()
+    seconds = time.perf_counter() - started
+    return {
+        "sessions": len(streams),
+        "commands": totals["commands"],
+        "errors": totals["errors"],
+        "speed": speed,
+        "seconds": round(seconds, 4),
+        "commands_per_s": round(totals["commands"] / seconds, 1) if seconds > 0 else None,
+        "latency": percentiles(latencies),
+        "lag": percentiles(lags),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate or replay sigterm command workloads")
+    subcommands = parser.add_subparsers(dest="subcommand", required=True)
+
+    gen = subcommands.add_parser("generate", help="write a synthetic log to stdout")
+    gen.add_argument("--mix", help='weighted commands, e.g. "ls=5,cat about=3" (default: a typical mix)')
+    gen.add_argument("--sessions", type=int, default=10)
+    gen.add_argument("--commands", type=int, default=100, help="commands per session")
+    gen.add_argument("--think", type=float, default=2.0, help="mean seconds between a session's commands")
+    gen.add_argument("--ramp", type=float, default=10.0, help="seconds over which sessions start")
+    gen.add_argument("--seed", type=int, default=0)
+
+    rep = subcommands.add_parser("replay", help="run a log against the engine and report latencies")
+    rep.add_argument("log")
+    rep.add_argument("--sessions", type=int, help="virtual sessions (default: one per recorded session)")
+    rep.add_argument("--speed", type=float, default=1.0, help="time compression factor, 0 for no pacing")
+    rep.add_argument("--rate-limits", action="store_true", help="apply the configured session rate limits")
+
+    args = parser.parse_args(argv)
+    if args.subcommand == "generate":
+        try:
+            mix = parse_mix(args.mix) if args.mix else None
+        except ValueError as e:
+            parser.error(str(e))
+        write_log(generate(mix, args.sessions, args.commands, args.think, args.ramp, args.seed), sys.stdout)
+        return 0
+
+    try:
+        records = read_log(args.log)
+    except OSError as e:
+        print(f"{args.log}: {e.strerror or e}", file=sys.stderr)
+        return 2
+    results = replay(records, args.sessions, args.speed, RATE_LIMITS if args.rate_limits else None)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())